@@ -32,6 +32,14 @@ nuke.pluginAddPath(f"{nuke_root}/toolsets")
 nuke.pluginAddPath(f"{nuke_root}/icons")
 nuke.pluginAddPath(f"{nuke_root}/bah_gizmos")
 
+# Map server paths of every file Nuke opens (migrated servers, this OS's mounts, fallback roots),
+# registered here so render nodes get it too
+try:
+    from scripts.core.path_mapper import get_path_mapper
+    nuke.addFilenameFilter(get_path_mapper())
+except (ImportError, OSError, KeyError) as e:
+    nuke.tprint(f"Path mapping disabled: {e}")
+
 # Add cerebro to Python path
 cerebro_path = f"{nuke_root}/cerebro"
 if cerebro_path not in sys.path:
@@ -57,7 +57,8 @@ studioTools.addCommand("Import Template", "tools.import_tools.import_template()"
 studioTools.addCommand("Import From Write", "tools.import_tools.import_from_selected_write()", "alt+R")
 studioTools.addCommand("Delete Animation", "tools.workflow_tools.delete_animation()", "alt+A")
 studioTools.addCommand("Reload Read Nodes", "tools.workflow_tools.reload_read_nodes()", "alt+D")
-studioTools.addCommand("Update Old Server Path", "tools.utils.update_old_paths()", "alt+E")
+studioTools.addCommand("Validate Frames", "tools.workflow_tools.validate_frames()")
+studioTools.addCommand("Update Old Server Path", "tools.utils.update_old_paths(force=True)", "alt+E")
 #
 # # Update read paths from old server location to new
 nuke.addOnScriptLoad(tools.update_old_paths)
@@ -0,0 +1,6 @@
+"""
+Cinderella Benchmarks
+
+Synthetic render trees, a latency injecting filesystem wrapper and timing scripts
+for the pipeline code. Nothing here is loaded by Nuke.
+"""
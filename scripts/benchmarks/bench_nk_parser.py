@@ -0,0 +1,94 @@
+# SPDX-License-Identifier: Apache-2.0
+# bench_nk_parser.py - .nk parser throughput benchmark
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+#
+#     python -m scripts.benchmarks.bench_nk_parser templates/template_comp.nk --out nk.json
+
+import os
+import sys
+import json
+import platform
+import argparse
+import tracemalloc
+from datetime import datetime
+
+from .timing import time_runs
+from ..core.nk_parser import parse_nk, iter_nodes, iter_statements
+
+
+def _peak_memory(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _read(path):
+    with open(path, 'r', encoding='utf-8', errors='surrogateescape', newline='') as f:
+        return f.read()
+
+
+def bench_script(path, repeat):
+    size = os.path.getsize(path)
+    original = _read(path)
+
+    def statements():
+        with open(path, 'r', encoding='utf-8', errors='surrogateescape', newline='') as f:
+            return sum(1 for _ in iter_statements(f))
+
+    results = []
+    for target, func in (("iter_statements", statements),
+                         ("iter_nodes", lambda: sum(1 for _ in iter_nodes(path))),
+                         ("parse_nk", lambda: parse_nk(path))):
+        best, mean, result = time_runs(func, repeat)
+        entry = {
+            "target": target,
+            "script": os.path.basename(path),
+            "bytes": size,
+            "seconds": best,
+            "mean_seconds": mean,
+            "mb_per_second": size / best / (1024 * 1024) if best else None,
+            "peak_memory_kb": _peak_memory(func) // 1024,
+        }
+        if target == "parse_nk":
+            entry["nodes"] = len(result)
+            entry["edges"] = sum(1 for _ in result.edges())
+            entry["round_trip"] = result.to_string() == original
+        results.append(entry)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the headless .nk parser")
+    parser.add_argument("scripts", nargs="+", help=".nk files to parse")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", help="Write results JSON here")
+    args = parser.parse_args(argv)
+
+    results = []
+    for path in args.scripts:
+        for result in bench_script(path, args.repeat):
+            results.append(result)
+            line = (f"{result['script']:30s} {result['target']:16s} {result['seconds']:8.4f}s "
+                    f"{result['mb_per_second']:7.2f} MB/s  peak {result['peak_memory_kb']} KB")
+            if "nodes" in result:
+                line += f"  {result['nodes']} nodes, {result['edges']} edges, round trip {'ok' if result['round_trip'] else 'FAILED'}"
+            print(line)
+
+    if args.out:
+        report = {
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "results": results,
+        }
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {args.out}")
+    return 0 if all(r.get("round_trip", True) for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
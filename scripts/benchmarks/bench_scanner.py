@@ -0,0 +1,199 @@
+# SPDX-License-Identifier: Apache-2.0
+# bench_scanner.py - Shot scanner benchmarks
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+#
+# Generate a tree once, then compare runs:
+#     python -m scripts.benchmarks.bench_scanner --root /tmp/bench --generate --out before.json
+#     python -m scripts.benchmarks.bench_scanner --root /tmp/bench --out after.json --compare before.json
+
+import os
+import sys
+import json
+import platform
+import argparse
+from datetime import datetime
+
+from .render_tree import generate_render_tree
+from .latency_fs import injected_latency
+from .timing import time_runs
+from ..core.shot_scanner import ShotScanner, fast_check_renders
+from ..core.shot_index import ShotIndex
+
+
+def _load_worker():
+    """ShotScannerWorker needs Qt and Nuke, the headless ShotScanner it wraps is timed otherwise."""
+    try:
+        from ..shot_manager.shot_manager_panel import ShotScannerWorker
+        return ShotScannerWorker
+    except ImportError:
+        return None
+
+
+def bench_scan(render_root, workers, latency, repeat, previous_tree=None, comp_root=None):
+    worker_class = _load_worker()
+
+    def run():
+        if worker_class is not None:
+            results = {}
+            worker = worker_class(render_root, max_workers=workers, previous_tree=previous_tree, comp_path=comp_root)
+            worker.finished.connect(lambda shots, tree, records: results.update(shots=shots, tree=tree))
+            worker.run()
+            return results["shots"], results["tree"]
+        scanner = ShotScanner(render_root, max_workers=workers, previous_tree=previous_tree, comp_path=comp_root)
+        return scanner.scan(), scanner.tree
+
+    with injected_latency(latency) as calls:
+        best, mean, (shots, tree) = time_runs(run, repeat)
+
+    return {
+        "target": "ShotScannerWorker.run" if worker_class else "ShotScanner.scan",
+        "workers": workers,
+        "latency_ms": latency * 1000,
+        "incremental": bool(previous_tree),
+        "records": bool(comp_root),
+        "seconds": best,
+        "mean_seconds": mean,
+        "fs_calls": calls.total // repeat,
+        "shots": len(shots),
+    }, shots, tree
+
+
+def bench_fast_check(render_root, shots, latency, repeat):
+    render_roots = [os.path.join(render_root, *shot.split("_"), "render") for shot in shots]
+
+    with injected_latency(latency) as calls:
+        best, mean, found = time_runs(lambda: sum(fast_check_renders(root) for root in render_roots), repeat)
+
+    return {
+        "target": "fast_check_renders",
+        "latency_ms": latency * 1000,
+        "seconds": best,
+        "mean_seconds": mean,
+        "per_call_ms": best / max(1, len(render_roots)) * 1000,
+        "fs_calls": calls.total // repeat,
+        "shots": found,
+    }
+
+
+def bench_shot_index(shots, repeat):
+    """Builds the index and walks it end to end the way the navigation buttons do."""
+    def run():
+        index = ShotIndex(shots)
+        position, steps = 0, 0
+        while position is not None:
+            ep, sq, _ = index.parts(position)
+            index.shots(ep, sq)
+            position = index.next_index(position)
+            steps += 1
+        return index, steps
+
+    best, mean, (index, steps) = time_runs(run, repeat)
+    return {
+        "target": "ShotIndex",
+        "seconds": best,
+        "mean_seconds": mean,
+        "shots": len(index),
+        "episodes": len(index.episodes()),
+        "steps": steps,
+    }
+
+
+def _result_key(result):
+    return (result["target"], result.get("workers"), result.get("latency_ms"),
+            result.get("incremental"), result.get("records"))
+
+
+def compare(results, previous_path):
+    with open(previous_path, 'r') as f:
+        previous = {_result_key(r): r for r in json.load(f)["results"]}
+
+    print(f"\nCompared to {previous_path}:")
+    for result in results:
+        old = previous.get(_result_key(result))
+        if not old:
+            continue
+        ratio = old["seconds"] / result["seconds"] if result["seconds"] else float("inf")
+        print(f"  {_describe(result):60s} {old['seconds']:8.3f}s -> {result['seconds']:8.3f}s  ({ratio:.2f}x)")
+
+
+def _describe(result):
+    parts = [result["target"]]
+    if "workers" in result:
+        parts.append(f"workers={result['workers']}")
+    if "latency_ms" in result:
+        parts.append(f"latency={result['latency_ms']:g}ms")
+    if result.get("incremental"):
+        parts.append("incremental")
+    if result.get("records"):
+        parts.append("records")
+    return " ".join(parts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the Shot Manager scanner on a synthetic tree")
+    parser.add_argument("--root", required=True, help="Tree root (contains render/ and comp/)")
+    parser.add_argument("--generate", action="store_true", help="Generate the tree first")
+    parser.add_argument("--shots", type=int, default=500)
+    parser.add_argument("--layers", type=int, default=5)
+    parser.add_argument("--frames", type=int, default=10)
+    parser.add_argument("--workers", default="1,8,16", help="Comma separated worker counts")
+    parser.add_argument("--latency-ms", default="0,5", help="Comma separated injected latencies")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", help="Write results JSON here")
+    parser.add_argument("--compare", help="Previous results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    if args.generate:
+        generate_render_tree(args.root, shots=args.shots, layers=args.layers, frames=args.frames)
+
+    render_root = os.path.join(args.root, "render")
+    comp_root = os.path.join(args.root, "comp")
+    workers_list = [int(w) for w in args.workers.split(",")]
+    latencies = [float(ms) / 1000 for ms in args.latency_ms.split(",")]
+    results = []
+
+    reference = None
+    for latency in latencies:
+        for workers in workers_list:
+            result, shots, tree = bench_scan(render_root, workers, latency, args.repeat)
+            if reference is None:
+                reference = shots
+            result["matches_serial"] = shots == reference
+            results.append(result)
+            print(f"{_describe(result):60s} {result['seconds']:8.3f}s  {result['fs_calls']} fs calls")
+
+            result, _, _ = bench_scan(render_root, workers, latency, args.repeat, previous_tree=tree)
+            results.append(result)
+            print(f"{_describe(result):60s} {result['seconds']:8.3f}s  {result['fs_calls']} fs calls")
+
+        result, _, _ = bench_scan(render_root, max(workers_list), latency, args.repeat, comp_root=comp_root)
+        results.append(result)
+        print(f"{_describe(result):60s} {result['seconds']:8.3f}s  {result['fs_calls']} fs calls")
+
+        result = bench_fast_check(render_root, reference, latency, args.repeat)
+        results.append(result)
+        print(f"{_describe(result):60s} {result['seconds']:8.3f}s  {result['per_call_ms']:.2f}ms per shot")
+
+    result = bench_shot_index(reference, args.repeat)
+    results.append(result)
+    print(f"{_describe(result):60s} {result['seconds']:8.5f}s")
+
+    if args.out:
+        report = {
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "root": args.root,
+            "results": results,
+        }
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {args.out}")
+
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
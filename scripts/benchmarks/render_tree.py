@@ -0,0 +1,98 @@
+# SPDX-License-Identifier: Apache-2.0
+# render_tree.py - Synthetic render/comp tree generator for benchmarks
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+#
+#     python -m scripts.benchmarks.render_tree /tmp/cinderella_bench --shots 2000
+
+import os
+import sys
+import random
+import argparse
+
+
+def _touch(path, size=0):
+    with open(path, 'wb') as f:
+        if size:
+            # Sparse file, reports the requested size without using the disk space
+            f.truncate(size)
+
+
+def generate_render_tree(root, episodes=4, sequences=10, shots=50, layers=5, versions=2,
+                         frames=10, frame_size=0, empty_ratio=0.05, comp=True, seed=0):
+    """
+    Builds root/render/epXX/sqXXX/shXXX/render/<layer>_vNN/<layer>_vNN.####.exr and,
+    with comp=True, matching root/comp/.../comp/{nk,mov,mov/.thumb} and
+    light_precomp/nk folders. `shots` is the total shot count, spread over
+    episodes * sequences. empty_ratio of the shots get layer folders without frames.
+    Returns {"render": path, "comp": path, "shots": [names with EXRs]}.
+    """
+    rng = random.Random(seed)
+    render_root = os.path.join(root, "render")
+    comp_root = os.path.join(root, "comp")
+    shots_per_sequence = max(1, shots // max(1, episodes * sequences))
+    rendered = []
+
+    for ep in range(1, episodes + 1):
+        for sq in range(1, sequences + 1):
+            for sh in range(1, shots_per_sequence + 1):
+                ep_name, sq_name, sh_name = f"ep{ep:02d}", f"sq{sq:03d}", f"sh{sh * 10:03d}"
+                shot_name = f"{ep_name}_{sq_name}_{sh_name}"
+                render_dir = os.path.join(render_root, ep_name, sq_name, sh_name, "render")
+                has_frames = rng.random() >= empty_ratio
+
+                for layer in range(layers):
+                    for version in range(1, versions + 1):
+                        layer_dir_name = f"layer{layer:02d}_v{version:02d}"
+                        layer_dir = os.path.join(render_dir, layer_dir_name)
+                        os.makedirs(layer_dir, exist_ok=True)
+                        if not has_frames:
+                            continue
+                        for frame in range(1001, 1001 + frames):
+                            _touch(os.path.join(layer_dir, f"{layer_dir_name}.{frame:04d}.exr"), frame_size)
+
+                if has_frames:
+                    rendered.append(shot_name)
+
+                if not comp:
+                    continue
+
+                shot_comp = os.path.join(comp_root, ep_name, sq_name, sh_name)
+                nk_dir = os.path.join(shot_comp, "comp", "nk")
+                thumb_dir = os.path.join(shot_comp, "comp", "mov", ".thumb")
+                precomp_dir = os.path.join(shot_comp, "light_precomp", "nk")
+                for directory in (nk_dir, thumb_dir, precomp_dir):
+                    os.makedirs(directory, exist_ok=True)
+                for version in range(1, versions + 1):
+                    _touch(os.path.join(nk_dir, f"{shot_name}_v{version:02d}.nk"))
+                    _touch(os.path.join(precomp_dir, f"{shot_name}_precomp_v{version:02d}.nk"))
+                    _touch(os.path.join(shot_comp, "comp", "mov", f"{shot_name}_v{version:02d}.mov"))
+                    _touch(os.path.join(thumb_dir, f"{shot_name}_v{version:02d}_thumb.jpg"))
+
+    rendered.sort()
+    return {"render": render_root, "comp": comp_root, "shots": rendered}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic ep/sq/sh/render tree")
+    parser.add_argument("root")
+    parser.add_argument("--episodes", type=int, default=4)
+    parser.add_argument("--sequences", type=int, default=10, help="Sequences per episode")
+    parser.add_argument("--shots", type=int, default=2000, help="Total number of shots")
+    parser.add_argument("--layers", type=int, default=5)
+    parser.add_argument("--versions", type=int, default=2)
+    parser.add_argument("--frames", type=int, default=10)
+    parser.add_argument("--frame-size", type=int, default=0, help="Bytes per EXR (sparse)")
+    parser.add_argument("--empty-ratio", type=float, default=0.05)
+    parser.add_argument("--no-comp", action="store_true", help="Skip the comp side folders")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    tree = generate_render_tree(args.root, args.episodes, args.sequences, args.shots, args.layers,
+                                args.versions, args.frames, args.frame_size, args.empty_ratio,
+                                comp=not args.no_comp, seed=args.seed)
+    print(f"Generated {len(tree['shots'])} rendered shots under {args.root}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,16 @@
+# SPDX-License-Identifier: Apache-2.0
+# timing.py - Repeated timing shared by the benchmarks
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+
+import time
+
+
+def time_runs(func, repeat):
+    """Runs func repeat times. Returns (best seconds, mean seconds, result of the last run)."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), sum(timings) / len(timings), result
@@ -3,13 +3,16 @@
 # Copyright © 2025 Maxim Maximov. All rights reserved.
 
 import os
-import subprocess
 import sys
 import json
 import re
 import threading
 import nuke
 from pathlib import Path
+from ..core.thumbnails import probe_ffmpeg, make_movie_thumbnails, thumbnails_up_to_date, thumbnail_paths
+from ..core.thumbnail_atlas import update_shot_atlas
+from ..core.version_resolver import get_version_resolver, MOV_VERSION_PATTERN
+from ..core.path_templates import PathTemplates
 
 try:
     project_root = Path(__file__).parents[1]
@@ -29,6 +32,8 @@ except ImportError:
     nuke.tprint("Warning: Could not import config, using fallback paths")
     config = {}
 
+TEMPLATES = PathTemplates.from_config(config)
+
 try:
     import am_basepref
 
@@ -90,26 +95,8 @@ def get_current_shot_context():
 
 
 def get_shot_paths(shot_name):
-    match = re.match(r'ep(\d+)_sq(\d+)_sh(\d+)', shot_name)
-    if not match:
-        return None
-
-    ep, sq, sh = match.groups()
-
-    shot_comp_path = f"{comp_path}/ep{ep}/sq{sq}/sh{sh}/comp"
-    shot_precomp_path = f"{comp_path}/ep{ep}/sq{sq}/sh{sh}/light_precomp"
-
-    return {
-        "ep": ep,
-        "sq": sq,
-        "sh": sh,
-        "comp_dir": shot_comp_path,
-        "precomp_dir": shot_precomp_path,
-        "nk_dir": f"{shot_comp_path}/nk",
-        "exr_dir": f"{shot_comp_path}/exr",
-        "mov_dir": f"{shot_comp_path}/mov",
-        "thumb_dir": f"{shot_comp_path}/.thumb"
-    }
+    """Comp folders of a shot from the project path templates, None if the name isn't a shot."""
+    return TEMPLATES.shot_paths(shot_name)
 
 
 def find_latest_mov(shot_name):
@@ -122,35 +109,26 @@ def find_latest_mov(shot_name):
         print(f"Movie directory not found: {mov_dir}")
         return None
 
-    try:
-        mov_files = [f for f in os.listdir(mov_dir) if f.lower().endswith('.mov')]
-        if not mov_files:
-            print(f"No .mov files found in {mov_dir}")
-            return None
-
-        # Extract version numbers and sort by highest version
-        versioned_movs = []
-        for mov_file in mov_files:
-            if mov_file.endswith('_preview.mov'):
-                nuke.warning("Old non-versioned '_preview' movs are not supported for publish")
-            version_match = re.search(r'_v(\d+)\.mov', mov_file, re.IGNORECASE)
-            if version_match:
-                version = int(version_match.group(1))
-                versioned_movs.append((version, mov_file))
-
-        versioned_movs.sort(key=lambda x: x[0], reverse=True)
-        if not versioned_movs:
-            nuke.tprint(f"No versioned .mov files found in {mov_dir}")
-            return None
+    versions = get_version_resolver()
+    # A movie rendered moments ago has to be found, don't trust a listing from before it
+    versions.invalidate(mov_dir)
+    mov_files = [f for f in versions.names(mov_dir) if f.lower().endswith('.mov')]
+    if not mov_files:
+        print(f"No .mov files found in {mov_dir}")
+        return None
 
-        latest_mov = f"{mov_dir}/{versioned_movs[0][1]}"
-        print(latest_mov)
-        return latest_mov
+    if any(f.endswith('_preview.mov') for f in mov_files):
+        nuke.warning("Old non-versioned '_preview' movs are not supported for publish")
 
-    except Exception as e:
-        nuke.error(f"Error finding movie files: {e}")
+    latest = versions.latest(mov_dir, '.mov', MOV_VERSION_PATTERN, versioned_only=True)
+    if not latest:
+        nuke.tprint(f"No versioned .mov files found in {mov_dir}")
         return None
 
+    latest_mov = f"{mov_dir}/{latest[0]}"
+    print(latest_mov)
+    return latest_mov
+
 
 def construct_cerebro_task_url(shot_name):
     match = re.match(r'ep(\d+)_sq(\d+)_sh(\d+)', shot_name)
@@ -206,81 +184,41 @@ def cerebro_database_connect():
         return None
 
 
+_ffmpeg_available = None
+
+
 def make_thumbnails(filepath):
+    """Returns the first, middle and last frame thumbnails of the movie, creating them if needed."""
+    global _ffmpeg_available
+
     nuke.tprint(f"Source filepath: {filepath} - exists: {os.path.exists(filepath)}")
     if not os.path.exists(filepath):
         nuke.tprint("Source file does not exist")
         return []
 
-    filename = os.path.splitext(os.path.basename(filepath))[0]
-    thumb_dir = f"{os.path.dirname(filepath)}/.thumb"
-    thumb_path = f"{thumb_dir}/{filename}_thumb.jpg"
-
-    if os.path.exists(thumb_path):
-        nuke.tprint(f"Thumbnail already exists: {thumb_path}")
-        return [thumb_path]
-    if not os.path.exists(thumb_dir):
-        os.makedirs(thumb_dir)
-        nuke.tprint(f"Created thumbnail directory: {thumb_dir}")
+    if thumbnails_up_to_date(filepath, TEMPLATES):
+        nuke.tprint(f"Thumbnails already exist for: {filepath}")
+        return list(thumbnail_paths(filepath, TEMPLATES).values())
 
-    nuke.tprint(f"Thumbnail will be saved to: {thumb_path}")
-
-    try:
-        ffmpeg_result = subprocess.run(['ffmpeg', '-version'],
-                                       capture_output=True, text=True)
-        if ffmpeg_result.returncode != 0:
-            nuke.tprint("ffmpeg not found in PATH")
-            return []
-
-        duration_cmd = [
-            'ffprobe', '-v', 'error', '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1', filepath
-        ]
-        duration_result = subprocess.run(duration_cmd, capture_output=True, text=True)
-        if duration_result.returncode != 0:
-            nuke.tprint("Could not get video duration, using 50% seek")
-            seek_time = "50%"
-        else:
-            try:
-                duration = float(duration_result.stdout.strip())
-                middle_time = duration / 2
-                seek_time = str(middle_time)
-                nuke.tprint(f"Video duration: {duration}s, seeking to middle: {middle_time}s")
-            except (ValueError, TypeError):
-                nuke.tprint("Could not parse duration, using 50% seek")
-                seek_time = "50%"
-
-        cmd = [
-            'ffmpeg', '-hide_banner', '-loglevel', 'error', '-i', filepath,
-            '-vf', 'scale=1024:429:force_original_aspect_ratio=decrease',
-            '-ss', seek_time,
-            '-vframes', '1',
-            '-y',
-            thumb_path
-        ]
-
-        result = subprocess.run(cmd, capture_output=True, text=True)
-
-        nuke.tprint(f"ffmpeg exit code: {result.returncode}")
-        if result.stderr:
-            nuke.tprint(f"ffmpeg stderr: {result.stderr}")
-        if result.stdout:
-            nuke.tprint(f"ffmpeg stdout: {result.stdout}")
-
-        if os.path.exists(thumb_path):
-            nuke.tprint(f"Thumbnail created successfully: {thumb_path}")
-            return [thumb_path]
-        else:
-            nuke.tprint("Thumbnail file was not created")
-            return []
-
-    except FileNotFoundError:
+    # ffmpeg is looked up once per session rather than before every movie
+    if _ffmpeg_available is None:
+        _ffmpeg_available = probe_ffmpeg()
+    if not _ffmpeg_available:
         nuke.tprint("ffmpeg/ffprobe not found. Please ensure ffmpeg is installed and in PATH.")
         return []
+
+    try:
+        thumbnails = make_movie_thumbnails(filepath, force=True, templates=TEMPLATES)
     except Exception as e:
         nuke.tprint(f"Error running ffmpeg: {e}")
         return []
 
+    if thumbnails:
+        nuke.tprint(f"Thumbnails created successfully: {thumbnails}")
+    else:
+        nuke.tprint("Thumbnail files were not created")
+    return thumbnails
+
 
 def _background_publish(shot_name, description, comment, work_time):
     """Performs all blocking I/O in a background thread."""
@@ -306,6 +244,11 @@ def _background_publish(shot_name, description, comment, work_time):
 
         nuke.tprint("Generating thumbnails...")
         thumbnails = make_thumbnails(mov_path)
+        if thumbnails:
+            try:
+                update_shot_atlas(comp_path, shot_name, templates=TEMPLATES)
+            except (OSError, RuntimeError) as e:
+                nuke.tprint(f"Could not update sequence thumbnail atlas: {e}")
 
         # For further functionality expansion this can be a list of people to choose from in Nuke in modal dialogue
         ## users = config.get('cerebro').get('users')
@@ -0,0 +1,6 @@
+"""
+Cinderella Core
+
+Headless pipeline helpers shared by the Nuke tools and the command line utilities.
+Modules in this package must not import nuke or Qt.
+"""
@@ -0,0 +1,179 @@
+# SPDX-License-Identifier: Apache-2.0
+# channel_manifest.py - Per-layer AOV manifests from EXR headers, without Nuke
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+#
+# Reads the headers of every frame of a sequence on a thread pool and reports
+# the AOVs it carries, so tools know a layer's channels without creating a Read:
+#     python -m scripts.core.channel_manifest --shot ep01_sq010_sh010
+#     python -m scripts.core.channel_manifest --pattern //server/.../beauty.%04d.exr --range 1001-1100
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .exr_header import ExrError, read_exr_header, exr_layers
+from .frame_validator import frame_path
+from .path_templates import get_path_templates
+from .sequences import list_sequences, latest_layer_sequences
+
+DEFAULT_MANIFEST_WORKERS = 16
+HEADER_CACHE_SIZE = 4096  # frames, a few sequences' worth
+
+_header_cache = OrderedDict()  # path -> (size, mtime, summary), LRU
+_header_cache_lock = threading.Lock()
+
+
+def frame_summary(path):
+    """
+    Header summary of one frame, memoised per size and mtime for the last HEADER_CACHE_SIZE frames:
+    {"layers": {layer: [channel]}, "parts", "data_window", "display_window", "compression", "pixel_types", "custom"}.
+    """
+    stat = os.stat(path)
+    with _header_cache_lock:
+        cached = _header_cache.get(path)
+        if cached is not None:
+            _header_cache.move_to_end(path)
+    if cached is not None and cached[0] == stat.st_size and cached[1] == stat.st_mtime:
+        return cached[2]
+
+    parts = read_exr_header(path)
+    first = parts[0]
+    summary = {
+        "layers": exr_layers(parts),
+        "parts": [part.name for part in parts if part.name],
+        "data_window": list(first.data_window) if first.data_window else None,
+        "display_window": list(first.display_window) if first.display_window else None,
+        "compression": first.compression,
+        "pixel_types": sorted({channel[1] for part in parts for channel in part.channels}),
+        "custom": {name: value for name, value in first.custom().items() if isinstance(value, (str, int, float))},
+    }
+    with _header_cache_lock:
+        _header_cache[path] = (stat.st_size, stat.st_mtime, summary)
+        _header_cache.move_to_end(path)
+        while len(_header_cache) > HEADER_CACHE_SIZE:
+            _header_cache.popitem(last=False)
+    return summary
+
+
+def clear_manifest_cache():
+    with _header_cache_lock:
+        _header_cache.clear()
+
+
+def build_manifest(pattern, frames, max_workers=DEFAULT_MANIFEST_WORKERS):
+    """
+    Reads the header of every frame in frames (an iterable of frame numbers) of pattern in parallel.
+    Returns the manifest of the sequence, the summary of its first readable frame plus:
+        frames     - number of frames read
+        varying    - frames whose layers, channels or data window differ from that frame
+        unreadable - [(frame, error)] for missing frames and broken headers
+    """
+    started = time.perf_counter()
+    frames = list(frames)
+
+    def read(frame):
+        try:
+            return frame, frame_summary(frame_path(pattern, frame)), None
+        except (OSError, ExrError) as e:
+            return frame, None, str(e)
+
+    manifest = {"pattern": pattern, "layers": {}, "frames": len(frames), "varying": [], "unreadable": []}
+    if not frames:
+        return manifest
+
+    reference = None
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(frames)))) as pool:
+        for frame, summary, error in pool.map(read, frames):
+            if summary is None:
+                manifest["unreadable"].append((frame, error))
+            elif reference is None:
+                reference = summary
+                manifest.update(summary)
+            elif summary["layers"] != reference["layers"] or summary["data_window"] != reference["data_window"]:
+                manifest["varying"].append(frame)
+    manifest["seconds"] = time.perf_counter() - started
+    return manifest
+
+
+def directory_layers(directory):
+    """
+    {layer: [channel]} of the EXR sequence in directory from the header of its first frame,
+    or None if there is no readable EXR. Cheap enough to call while scanning.
+    """
+    sequences = list_sequences(directory, (".exr",))
+    if not sequences:
+        return None
+    sequence = sequences[-1]
+    name = sequence.name(sequence.first) if sequence.is_sequence else sequence.head
+    try:
+        return frame_summary(f"{directory}/{name}")["layers"]
+    except (OSError, ExrError):
+        return None
+
+
+def layer_manifests(shot_render_path, every=1, max_workers=DEFAULT_MANIFEST_WORKERS):
+    """{render layer: manifest} for the latest version of every render layer of a shot, reading every n-th frame."""
+    manifests = {}
+    for layer, dir_name, sequence in latest_layer_sequences(shot_render_path):
+        pattern = f"{shot_render_path}/{dir_name}/{sequence.pattern}"
+        frames = sequence.frames[::max(1, every)] if sequence.is_sequence else [0]
+        manifest = build_manifest(pattern, frames, max_workers)
+        manifest["dir_name"] = dir_name
+        manifests[layer] = manifest
+    return manifests
+
+
+def format_manifest(manifests):
+    """Readable listing of {name: manifest}, one block per render layer."""
+    lines = []
+    for name, manifest in manifests.items():
+        lines.append(f"{name}: {len(manifest['layers'])} layers, {manifest['frames']} frames read, "
+                     f"{manifest.get('compression', '?')}, data window {manifest.get('data_window')}")
+        for layer, channels in sorted(manifest["layers"].items()):
+            lines.append(f"    {layer}: {', '.join(channels)}")
+        if manifest["varying"]:
+            lines.append(f"    channels or data window differ on frames {manifest['varying']}")
+        for frame, error in manifest["unreadable"]:
+            lines.append(f"    unreadable {frame}: {error}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List the AOVs of rendered EXR sequences from their headers")
+    parser.add_argument("--project", default="cinderella")
+    parser.add_argument("--shot", help="Every render layer of a shot, e.g. ep01_sq010_sh010")
+    parser.add_argument("--pattern", help="Sequence path with %%04d or ####")
+    parser.add_argument("--range", help="Frame range of --pattern, e.g. 1001-1100")
+    parser.add_argument("--every", type=int, default=1, help="Read every n-th frame only")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MANIFEST_WORKERS)
+    parser.add_argument("--json", help="Write the manifests as JSON here")
+    args = parser.parse_args(argv)
+
+    if args.shot:
+        templates = get_path_templates(args.project)
+        context = templates.shot_context(args.shot)
+        if not context:
+            parser.error(f"invalid shot name: {args.shot}")
+        render_dir = templates.format("render_dir", **context)
+        manifests = layer_manifests(render_dir, args.every, args.workers)
+    elif args.pattern and args.range:
+        first, _, last = args.range.partition("-")
+        frames = range(int(first), int(last or first) + 1, max(1, args.every))
+        manifests = {os.path.basename(args.pattern): build_manifest(args.pattern, frames, args.workers)}
+    else:
+        parser.error("give --shot or --pattern with --range")
+
+    print(format_manifest(manifests) or "No sequences found")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(manifests, f, indent=2)
+    return 0 if all(not manifest["unreadable"] for manifest in manifests.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
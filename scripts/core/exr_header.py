@@ -0,0 +1,339 @@
+# SPDX-License-Identifier: Apache-2.0
+# exr_header.py - OpenEXR header and offset table reading without decoding pixels
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+#
+# Works on anything with find() and the buffer protocol, an mmap of the file
+# only pages in the header and the offset table. read_exr_header(path) reads
+# just the header bytes and decodes them into one ExrPart per part:
+#     [part.layers() for part in read_exr_header(path)]  ->  [{"rgba": ["R", "G", "B", "A"], ...}]
+
+import struct
+
+MAGIC = b'\x76\x2f\x31\x01'  # 20000630, little endian
+
+TILED_FLAG = 0x200
+LONG_NAMES_FLAG = 0x400
+NON_IMAGE_FLAG = 0x800  # deep data
+MULTIPART_FLAG = 0x1000
+
+COMPRESSION_NAMES = ("none", "rle", "zips", "zip", "piz", "pxr24", "b44", "b44a", "dwaa", "dwab")
+LINES_PER_BLOCK = (1, 1, 1, 16, 32, 16, 32, 32, 32, 256)
+PIXEL_TYPES = ("uint", "half", "float")
+LINE_ORDERS = ("increasing_y", "decreasing_y", "random_y")
+ENVMAPS = ("latlong", "cube")
+
+HEADER_READ_SIZE = 64 * 1024  # a typical beauty header with AOVs and metadata fits in a few KB
+
+# Fixed size attribute types, decoded as a single value or a tuple
+ATTRIBUTE_FORMATS = {
+    "int": '<i', "float": '<f', "double": '<d',
+    "box2i": '<4i', "box2f": '<4f',
+    "v2i": '<2i', "v2f": '<2f', "v2d": '<2d', "v3i": '<3i', "v3f": '<3f', "v3d": '<3d',
+    "m33f": '<9f', "m33d": '<9d', "m44f": '<16f', "m44d": '<16d',
+    "rational": '<iI', "timecode": '<II', "keycode": '<7i', "tiledesc": '<IIB', "chromaticities": '<8f',
+}
+
+# Nuke puts undotted channels into these layers
+BASE_CHANNEL_LAYERS = {"R": "rgba", "G": "rgba", "B": "rgba", "A": "rgba", "Z": "depth"}
+
+
+class ExrError(ValueError):
+    """The bytes are not a (complete) OpenEXR header."""
+
+
+class TruncatedExrError(ExrError):
+    """The header continues past the end of the bytes, more of the file may complete it."""
+
+
+def _cstring(buf, position, limit):
+    end = buf.find(b'\0', position, min(len(buf), position + limit + 1))
+    if end < 0:
+        if position + limit >= len(buf):
+            raise TruncatedExrError("truncated header")
+        raise ExrError("attribute name too long")
+    return bytes(buf[position:end]).decode('latin-1'), end + 1
+
+
+def read_headers(buf):
+    """
+    Parses the version field and the header(s). Returns (flags, headers, end), headers
+    holds one {attribute name: (type name, raw value bytes)} per part and end is the
+    offset of the first offset table.
+    """
+    if len(buf) < 8 or bytes(buf[:4]) != MAGIC:
+        raise ExrError("bad magic number")
+    version, = struct.unpack_from('<I', buf, 4)
+    flags = version & 0xffffff00
+    if version & 0xff != 2:
+        raise ExrError(f"unsupported version {version & 0xff}")
+
+    limit = 255 if flags & LONG_NAMES_FLAG else 31
+    position, headers = 8, []
+    while True:
+        header = {}
+        while True:
+            if position >= len(buf):
+                raise TruncatedExrError("truncated header")
+            if buf[position] == 0:
+                position += 1
+                break
+            name, position = _cstring(buf, position, limit)
+            type_name, position = _cstring(buf, position, limit)
+            if position + 4 > len(buf):
+                raise TruncatedExrError("truncated header")
+            size, = struct.unpack_from('<i', buf, position)
+            position += 4
+            if size < 0:
+                raise ExrError(f"bad size of attribute {name}")
+            if position + size > len(buf):
+                raise TruncatedExrError("truncated header")
+            header[name] = (type_name, bytes(buf[position:position + size]))
+            position += size
+        if not header:
+            # The empty header closing the header list of a multi-part file
+            break
+        headers.append(header)
+        if not flags & MULTIPART_FLAG:
+            break
+        if position >= len(buf):
+            raise TruncatedExrError("truncated header")
+        if buf[position] == 0:
+            position += 1
+            break
+    if not headers:
+        raise ExrError("no header")
+    return flags, headers, position
+
+
+def _attribute(header, name, fmt):
+    value = header.get(name)
+    if value is None:
+        return None
+    return struct.unpack_from(fmt, value[1])
+
+
+def data_window(header):
+    """(xmin, ymin, xmax, ymax), both corners inclusive."""
+    window = _attribute(header, "dataWindow", '<4i')
+    if window is None:
+        raise ExrError("no dataWindow")
+    return window
+
+
+def compression(header):
+    value = _attribute(header, "compression", '<B')
+    return value[0] if value else 0
+
+
+def _level_sizes(size, levels, round_up):
+    sizes = []
+    for level in range(levels):
+        scaled = size >> level
+        if round_up and scaled << level != size:
+            scaled += 1
+        sizes.append(max(1, scaled))
+    return sizes
+
+
+def _level_count(size, round_up):
+    levels, length = 1, size
+    while length > 1:
+        length = (length + 1) // 2 if round_up else length // 2
+        levels += 1
+    return levels
+
+
+def chunk_count(header, flags):
+    """Number of entries in the offset table of a part."""
+    count = _attribute(header, "chunkCount", '<i')
+    if count is not None:
+        return count[0]
+
+    xmin, ymin, xmax, ymax = data_window(header)
+    width, height = xmax - xmin + 1, ymax - ymin + 1
+    tiled = header.get("type", (None, b""))[1].rstrip(b'\0') in (b"tiledimage", b"deeptile") or \
+        (flags & TILED_FLAG and "tiles" in header)
+    if not tiled:
+        lines = LINES_PER_BLOCK[compression(header)] if compression(header) < len(LINES_PER_BLOCK) else 1
+        return (height + lines - 1) // lines
+
+    tile_width, tile_height, mode = _attribute(header, "tiles", '<IIB')
+    level_mode, round_up = mode & 0x0f, bool(mode >> 4)
+    if level_mode == 0:  # ONE_LEVEL
+        widths, heights = [width], [height]
+    else:
+        levels_x, levels_y = _level_count(width, round_up), _level_count(height, round_up)
+        if level_mode == 1:  # MIPMAP_LEVELS
+            levels_x = levels_y = max(levels_x, levels_y)
+        widths = _level_sizes(width, levels_x, round_up)
+        heights = _level_sizes(height, levels_y, round_up)
+
+    def tiles(w, h):
+        return ((w + tile_width - 1) // tile_width) * ((h + tile_height - 1) // tile_height)
+
+    if level_mode == 2:  # RIPMAP_LEVELS
+        return sum(tiles(w, h) for w in widths for h in heights)
+    return sum(tiles(w, h) for w, h in zip(widths, heights))
+
+
+def read_offset_tables(buf, flags, headers, position):
+    """Returns ([offsets of each part], end of the offset tables)."""
+    tables = []
+    for header in headers:
+        count = chunk_count(header, flags)
+        end = position + 8 * count
+        if count < 0 or end > len(buf):
+            raise ExrError("truncated offset table")
+        tables.append(struct.unpack_from(f'<{count}Q', buf, position))
+        position = end
+    return tables, position
+
+
+def parse_channels(raw):
+    """Decodes a chlist attribute into [(name, pixel type, x sampling, y sampling)]."""
+    channels, position = [], 0
+    while position < len(raw) and raw[position] != 0:
+        end = raw.find(b'\0', position)
+        if end < 0 or end + 17 > len(raw):
+            raise ExrError("bad channel list")
+        pixel_type, _, x_sampling, y_sampling = struct.unpack_from('<iB3xii', raw, end + 1)
+        name = raw[position:end].decode('utf-8', 'replace')
+        channels.append((name, PIXEL_TYPES[pixel_type] if 0 <= pixel_type < 3 else str(pixel_type),
+                         x_sampling, y_sampling))
+        position = end + 17
+    return channels
+
+
+def _named(names, raw):
+    return names[raw[0]] if raw and raw[0] < len(names) else (raw[0] if raw else None)
+
+
+def decode_attribute(type_name, raw):
+    """Python value of an attribute: numbers, tuples, strings and lists. Unknown types stay bytes."""
+    fmt = ATTRIBUTE_FORMATS.get(type_name)
+    if fmt is not None:
+        if len(raw) < struct.calcsize(fmt):
+            raise ExrError(f"bad {type_name} attribute")
+        value = struct.unpack_from(fmt, raw)
+        return value[0] if len(value) == 1 else value
+    if type_name == "string":
+        return raw.decode('utf-8', 'replace')
+    if type_name == "chlist":
+        return parse_channels(raw)
+    if type_name == "compression":
+        return _named(COMPRESSION_NAMES, raw)
+    if type_name == "lineOrder":
+        return _named(LINE_ORDERS, raw)
+    if type_name == "envmap":
+        return _named(ENVMAPS, raw)
+    if type_name in ("floatvector", "doublevector"):
+        fmt = 'f' if type_name == "floatvector" else 'd'
+        return list(struct.unpack_from(f'<{len(raw) // struct.calcsize(fmt)}{fmt}', raw))
+    if type_name == "stringvector":
+        strings, position = [], 0
+        while position + 4 <= len(raw):
+            size, = struct.unpack_from('<i', raw, position)
+            strings.append(raw[position + 4:position + 4 + size].decode('utf-8', 'replace'))
+            position += 4 + size
+        return strings
+    if type_name == "preview":
+        # Only the size, the RGBA8 pixels are of no use here
+        return struct.unpack_from('<II', raw) if len(raw) >= 8 else None
+    return raw
+
+
+def channel_layer(channel, part_name=None):
+    """(layer, channel) as Nuke names them: diffuse.R -> (diffuse, R), R -> (rgba, R), a.b.R -> (a_b, R)."""
+    layer, _, name = channel.rpartition('.')
+    if layer:
+        return layer.replace('.', '_'), name
+    return part_name or BASE_CHANNEL_LAYERS.get(channel, "other"), channel
+
+
+class ExrPart(object):
+    """
+    One part of an EXR: the decoded header attributes plus shortcuts for the
+    standard ones. Everything that isn't a required attribute is in custom().
+    """
+    __slots__ = ("attributes", "types")
+
+    STANDARD_ATTRIBUTES = frozenset(("channels", "compression", "dataWindow", "displayWindow", "lineOrder",
+                                     "pixelAspectRatio", "screenWindowCenter", "screenWindowWidth", "tiles",
+                                     "name", "type", "version", "chunkCount"))
+
+    def __init__(self, header):
+        self.attributes = {}
+        self.types = {}
+        for name, (type_name, raw) in header.items():
+            self.attributes[name] = decode_attribute(type_name, raw)
+            self.types[name] = type_name
+
+    def __repr__(self):
+        return f"<ExrPart {self.name or self.type}, {len(self.channels)} channels>"
+
+    @property
+    def name(self):
+        return self.attributes.get("name")
+
+    @property
+    def type(self):
+        return self.attributes.get("type", "scanlineimage")
+
+    @property
+    def channels(self):
+        """[(name, pixel type, x sampling, y sampling)] in file order (sorted by name)."""
+        return self.attributes.get("channels", [])
+
+    @property
+    def data_window(self):
+        return self.attributes.get("dataWindow")
+
+    @property
+    def display_window(self):
+        return self.attributes.get("displayWindow")
+
+    @property
+    def compression(self):
+        return self.attributes.get("compression", "none")
+
+    def custom(self):
+        """Attributes that aren't part of the required header (renderer metadata, camera matrices, ...)."""
+        return {name: value for name, value in self.attributes.items() if name not in self.STANDARD_ATTRIBUTES}
+
+    def layers(self, multipart=False):
+        """{layer: [channel]} named like Nuke does, undotted channels of a multi-part file go to the part name."""
+        layers = {}
+        part_name = self.name if multipart else None
+        for channel in self.channels:
+            layer, name = channel_layer(channel[0], part_name)
+            layers.setdefault(layer, []).append(name)
+        return layers
+
+
+def read_exr_header(path, read_size=HEADER_READ_SIZE):
+    """
+    Reads only the header bytes of the EXR at path and returns [ExrPart], one per part.
+    Starts with read_size bytes and reads more only for a header that doesn't fit.
+    """
+    with open(path, 'rb') as f:
+        buf = f.read(read_size)
+        while True:
+            try:
+                flags, headers, _ = read_headers(buf)
+                break
+            except TruncatedExrError:
+                more = f.read(max(len(buf), read_size))
+                if not more:
+                    raise
+                buf += more
+    return [ExrPart(header) for header in headers]
+
+
+def exr_layers(parts):
+    """{layer: [channel]} over all parts of an EXR, the channels a Read node of it would have."""
+    layers = {}
+    for part in parts:
+        for layer, channels in part.layers(multipart=len(parts) > 1).items():
+            existing = layers.setdefault(layer, [])
+            existing.extend(channel for channel in channels if channel not in existing)
+    return layers
@@ -0,0 +1,274 @@
+# SPDX-License-Identifier: Apache-2.0
+# frame_validator.py - Missing, empty and truncated frame detection for sequences
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+#
+# Stats every frame of a sequence on a thread pool and checks EXR structure
+# (magic number, header, offset table, last chunk) through mmap, no pixels decoded:
+#     python -m scripts.core.frame_validator --shot ep01_sq010_sh010
+#     python -m scripts.core.frame_validator --pattern //server/.../beauty.%04d.exr --range 1001-1100
+
+import os
+import re
+import sys
+import json
+import mmap
+import time
+import struct
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .exr_header import ExrError, read_headers, read_offset_tables, MULTIPART_FLAG, NON_IMAGE_FLAG, TILED_FLAG
+from .path_templates import get_path_templates
+from .sequences import latest_layer_sequences
+
+DEFAULT_VALIDATE_WORKERS = 16
+DEFAULT_CHECK_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".nuke", "frame_check_cache.json")
+CHECK_CACHE_VERSION = 1
+CHECK_CACHE_MAX_ENTRIES = 200000  # about 20 MB of JSON
+CHECK_CACHE_MAX_AGE_DAYS = 30  # results not used for this long are dropped on save
+
+FRAME_OK = "ok"
+FRAME_MISSING = "missing"
+FRAME_EMPTY = "empty"
+FRAME_CORRUPT = "corrupt"
+
+HASH_PATTERN = re.compile(r'#+')
+PRINTF_PATTERN = re.compile(r'%(0?)(\d*)d')
+
+
+def check_exr(path):
+    """Returns None if the EXR at path is structurally complete, otherwise what is wrong with it."""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        size = len(buf)
+        try:
+            flags, headers, position = read_headers(buf)
+            tables, table_end = read_offset_tables(buf, flags, headers, position)
+        except ExrError as e:
+            return str(e)
+
+        last = 0
+        for offsets in tables:
+            for offset in offsets:
+                if offset == 0:
+                    return "incomplete, unwritten chunk in offset table"
+                if offset < table_end or offset >= size:
+                    return "truncated, chunk offset beyond end of file"
+                last = max(last, offset)
+
+        if last and not flags & NON_IMAGE_FLAG:
+            # The last chunk in the file has to end inside it: [part] y|tile coords, data size, data
+            prefix = 4 if flags & MULTIPART_FLAG else 0
+            tiled = flags & TILED_FLAG or any(h.get("type", ("", b""))[1].startswith(b"tiled") for h in headers)
+            coords = 16 if tiled else 4
+            if last + prefix + coords + 4 > size:
+                return "truncated, last chunk header cut off"
+            data_size, = struct.unpack_from('<i', buf, last + prefix + coords)
+            if data_size < 0 or last + prefix + coords + 4 + data_size > size:
+                return "truncated, last chunk cut off"
+    return None
+
+
+class FrameCheckCache(object):
+    """
+    Check results keyed by path and only valid for the size and mtime they were made at.
+    Saving keeps the max_entries most recently used results that were used in the last max_age_days.
+    """
+
+    def __init__(self, max_entries=CHECK_CACHE_MAX_ENTRIES, max_age_days=CHECK_CACHE_MAX_AGE_DAYS):
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self._results = {}  # path -> [size, mtime, status, detail, last used]
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def get(self, path, size, mtime):
+        with self._lock:
+            cached = self._results.get(path)
+            if cached is None or cached[0] != size or cached[1] != mtime:
+                return None
+            cached[4] = time.time()
+        return cached[2], cached[3]
+
+    def put(self, path, size, mtime, status, detail):
+        with self._lock:
+            self._results[path] = [size, mtime, status, detail, time.time()]
+            self._dirty = True
+
+    def _pruned(self):
+        oldest = time.time() - self.max_age_days * 86400
+        results = [(path, result) for path, result in self._results.items() if result[4] >= oldest]
+        if len(results) > self.max_entries:
+            results.sort(key=lambda item: item[1][4], reverse=True)
+            del results[self.max_entries:]
+        return dict(results)
+
+    def load(self, path=DEFAULT_CHECK_CACHE_PATH):
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == CHECK_CACHE_VERSION:
+            with self._lock:
+                self._results.update(data.get("results", {}))
+
+    def save(self, path=DEFAULT_CHECK_CACHE_PATH):
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._lock:
+            self._results = self._pruned()
+            data = {"version": CHECK_CACHE_VERSION, "results": dict(self._results)}
+            self._dirty = False
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+
+_default_cache = FrameCheckCache()
+
+
+def get_check_cache():
+    """The cache shared by all checks in this session."""
+    return _default_cache
+
+
+def check_frame(path, cache=None):
+    """Returns (status, detail) of one frame, detail explains a corrupt frame."""
+    cache = cache or _default_cache
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return FRAME_MISSING, None
+    if stat.st_size == 0:
+        return FRAME_EMPTY, None
+
+    cached = cache.get(path, stat.st_size, stat.st_mtime)
+    if cached is not None:
+        return cached
+
+    detail = None
+    if path.lower().endswith(".exr"):
+        try:
+            detail = check_exr(path)
+        except (OSError, ValueError) as e:
+            detail = f"unreadable: {e}"
+    result = (FRAME_CORRUPT if detail else FRAME_OK, detail)
+    cache.put(path, stat.st_size, stat.st_mtime, *result)
+    return result
+
+
+def frame_path(pattern, frame):
+    """Path of one frame of head.%04d.exr or head.####.exr."""
+    if PRINTF_PATTERN.search(pattern):
+        return PRINTF_PATTERN.sub(lambda m: f"{frame:0{m.group(2) or 1}d}", pattern, count=1)
+    return HASH_PATTERN.sub(lambda m: f"{frame:0{len(m.group())}d}", pattern, count=1)
+
+
+def validate_sequence(pattern, first, last, max_workers=DEFAULT_VALIDATE_WORKERS, cache=None):
+    """
+    Checks frames first..last of pattern. Returns a report:
+    {"pattern", "first", "last", "frames", "ok", "missing": [frame], "empty": [frame],
+     "corrupt": [(frame, detail)], "seconds"}.
+    """
+    started = time.perf_counter()
+    frames = list(range(first, last + 1))
+
+    def check(frame):
+        return frame, check_frame(frame_path(pattern, frame), cache)
+
+    report = {"pattern": pattern, "first": first, "last": last, "frames": len(frames),
+              "ok": 0, "missing": [], "empty": [], "corrupt": []}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(frames)))) as pool:
+        for frame, (status, detail) in pool.map(check, frames):
+            if status == FRAME_OK:
+                report["ok"] += 1
+            elif status == FRAME_CORRUPT:
+                report["corrupt"].append((frame, detail))
+            else:
+                report[status].append(frame)
+    report["seconds"] = time.perf_counter() - started
+    return report
+
+
+def validate_render_folder(shot_render_path, max_workers=DEFAULT_VALIDATE_WORKERS, cache=None):
+    """Validates the EXR sequence in the latest version of every render layer of a shot, over its own frame range."""
+    reports = []
+    for layer, dir_name, sequence in latest_layer_sequences(shot_render_path):
+        pattern = f"{shot_render_path}/{dir_name}/{sequence.pattern}"
+        report = validate_sequence(pattern, sequence.first, sequence.last, max_workers, cache)
+        report["layer"] = layer
+        reports.append(report)
+    return reports
+
+
+def is_complete(report):
+    return not (report["missing"] or report["empty"] or report["corrupt"])
+
+
+def _frame_list(frames):
+    """1001-1003, 1007 for [1001, 1002, 1003, 1007]."""
+    ranges = []
+    for frame in frames:
+        if ranges and frame == ranges[-1][1] + 1:
+            ranges[-1][1] = frame
+        else:
+            ranges.append([frame, frame])
+    return ", ".join(f"{a}-{b}" if a != b else str(a) for a, b in ranges)
+
+
+def format_report(reports):
+    """Readable summary of validate_sequence reports, one block per sequence."""
+    lines = []
+    for report in reports:
+        name = report.get("layer") or os.path.basename(report["pattern"])
+        if is_complete(report):
+            lines.append(f"{name}: {report['frames']} frames OK ({report['first']}-{report['last']})")
+            continue
+        lines.append(f"{name}: {report['ok']} of {report['frames']} frames OK ({report['first']}-{report['last']})")
+        if report["missing"]:
+            lines.append(f"    missing: {_frame_list(report['missing'])}")
+        if report["empty"]:
+            lines.append(f"    zero bytes: {_frame_list(report['empty'])}")
+        for frame, detail in report["corrupt"]:
+            lines.append(f"    corrupt {frame}: {detail}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find missing, empty and truncated frames")
+    parser.add_argument("--project", default="cinderella")
+    parser.add_argument("--shot", help="Validate every render layer of a shot, e.g. ep01_sq010_sh010")
+    parser.add_argument("--pattern", help="Sequence path with %%04d or ####")
+    parser.add_argument("--range", help="Frame range of --pattern, e.g. 1001-1100")
+    parser.add_argument("--workers", type=int, default=DEFAULT_VALIDATE_WORKERS)
+    parser.add_argument("--json", help="Write the reports as JSON here")
+    args = parser.parse_args(argv)
+
+    cache = get_check_cache()
+    cache.load()
+    if args.shot:
+        templates = get_path_templates(args.project)
+        context = templates.shot_context(args.shot)
+        if not context:
+            parser.error(f"invalid shot name: {args.shot}")
+        render_dir = templates.format("render_dir", **context)
+        reports = validate_render_folder(render_dir, args.workers, cache)
+    elif args.pattern and args.range:
+        first, _, last = args.range.partition("-")
+        reports = [validate_sequence(args.pattern, int(first), int(last or first), args.workers, cache)]
+    else:
+        parser.error("give --shot or --pattern with --range")
+    cache.save()
+
+    print(format_report(reports) or "No sequences found")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(reports, f, indent=2)
+    return 0 if all(is_complete(report) for report in reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,404 @@
+# SPDX-License-Identifier: Apache-2.0
+# nk_parser.py - Headless .nk script parser with a node graph model
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+#
+# Reads Nuke scripts without Nuke. The file is read line by line and cut into
+# statements (node blocks and stack commands), the stack commands are replayed
+# to connect the nodes:
+#     script = parse_nk("ep01_sq010_sh0010_v003.nk")
+#     for node in script.nodes_by_class("Write"):
+#         print(node.full_name, node.value("file"), [n.name for n in node.inputs if n])
+#
+# Every statement keeps its original text, a script that is written back
+# unchanged is byte for byte identical. Only edited nodes are re-serialized,
+# and in those only the edited knobs.
+
+import os
+import re
+
+NODE_START_PATTERN = re.compile(r'^([ \t]*)(?:clone (\S+) )?([\w.]+) \{[ \t]*\r?\n?$')
+CLONE_REF_PATTERN = re.compile(r'^([ \t]*)clone \$(\w+) \{[ \t]*\r?\n?$')
+SET_PATTERN = re.compile(r'^set (\S+) \[stack (\d+)\]')
+SPECIAL_CHARS = re.compile(r'[{}"\\]')
+NEEDS_QUOTES = re.compile(r'[\s"\\{}\[\]$;]')
+ESCAPE_PATTERN = re.compile(r'\\(.)', re.DOTALL)
+
+_UNESCAPES = {'n': '\n', 't': '\t', 'r': '\r'}
+_ESCAPES = {'\\': '\\\\', '"': '\\"', '\n': '\\n', '\t': '\\t', '\r': '\\r',
+            '[': '\\[', '{': '\\{', '}': '\\}', '$': '\\$'}
+
+
+def nk_unquote(raw):
+    """Knob text as written in the script to its value: "a\\nb" -> a<newline>b, {1 2} -> 1 2."""
+    if len(raw) >= 2 and raw[0] == '"' and raw[-1] == '"':
+        return ESCAPE_PATTERN.sub(lambda m: _UNESCAPES.get(m.group(1), m.group(1)), raw[1:-1])
+    if len(raw) >= 2 and raw[0] == '{' and raw[-1] == '}':
+        return raw[1:-1]
+    return raw
+
+
+def nk_quote(value):
+    """Value to knob text the way Nuke writes it, quoted only when needed."""
+    value = str(value)
+    if value and not NEEDS_QUOTES.search(value):
+        return value
+    return '"' + "".join(_ESCAPES.get(char, char) for char in value) + '"'
+
+
+def _scan(text, depth, quoted, quote_depth):
+    """Brace depth and quote state after text. Quotes only count at quote_depth, inside braces they are literal."""
+    escaped_to = -1
+    for match in SPECIAL_CHARS.finditer(text):
+        position = match.start()
+        if position <= escaped_to:
+            continue
+        char = match.group()
+        if char == '\\':
+            escaped_to = position + 1
+        elif quoted:
+            if char == '"':
+                quoted = False
+        elif char == '"':
+            if depth == quote_depth:
+                quoted = True
+        elif char == '{':
+            depth += 1
+        else:
+            depth -= 1
+    return depth, quoted
+
+
+def _indent(line):
+    return len(line) - len(line.lstrip(' \t'))
+
+
+class NkNode(object):
+    """
+    One node block. knobs holds [name, value, raw text] in script order, the
+    value is the knob text as written (see value() for the decoded one).
+    inputs holds the input nodes by input number, None for unconnected inputs.
+    """
+    __slots__ = ("cls", "knobs", "inputs", "parent", "children", "clone_of", "clone_id",
+                 "line", "_header", "_footer", "_raw")
+
+    def __init__(self, cls, header, knobs, footer, raw=None, line=0):
+        self.cls = cls
+        self.knobs = knobs
+        self.inputs = []
+        self.parent = None
+        self.children = []
+        self.clone_of = None
+        self.clone_id = None
+        self.line = line
+        self._header = header
+        self._footer = footer
+        self._raw = raw
+
+    def __repr__(self):
+        return f"<NkNode {self.cls} {self.full_name}>"
+
+    @property
+    def name(self):
+        return self.value("name", "")
+
+    @property
+    def full_name(self):
+        """Name including the enclosing groups, Group1.Blur1, as nuke.toNode() takes it."""
+        names = [self.name]
+        parent = self.parent
+        while parent is not None:
+            names.append(parent.name)
+            parent = parent.parent
+        return ".".join(reversed(names))
+
+    @property
+    def dirty(self):
+        return self._raw is None
+
+    @property
+    def input_count(self):
+        """Number of inputs taken from the stack, "inputs 1+1" counts the mask input too."""
+        raw = self.knob("inputs")
+        if raw is None:
+            return 1
+        try:
+            return sum(int(part) for part in raw.split("+"))
+        except ValueError:
+            return 1
+
+    def knob(self, name, default=None):
+        """Knob text as written in the script, default if the node doesn't set it."""
+        for knob in self.knobs:
+            if knob[0] == name:
+                return knob[1]
+        return default
+
+    def value(self, name, default=None):
+        raw = self.knob(name)
+        return default if raw is None else nk_unquote(raw)
+
+    def set_knob(self, name, value, quote=True):
+        """Sets a knob, value is quoted unless quote=False (for tcl lists and expressions)."""
+        text = nk_quote(value) if quote else str(value)
+        for knob in self.knobs:
+            if knob[0] == name:
+                if knob[1] != text:
+                    knob[1], knob[2] = text, None
+                    self._raw = None
+                return
+        self.knobs.append([name, text, None])
+        self._raw = None
+
+    def remove_knob(self, name):
+        count = len(self.knobs)
+        self.knobs = [knob for knob in self.knobs if knob[0] != name]
+        if len(self.knobs) != count:
+            self._raw = None
+
+    def to_nk(self):
+        """The node block as script text, the original text while the node wasn't edited."""
+        if self._raw is not None:
+            return self._raw
+        eol = "\r\n" if self._header.endswith("\r\n") else "\n"
+        indent = self._header[:_indent(self._header)] + " "
+        parts = [self._header]
+        for name, value, raw in self.knobs:
+            parts.append(raw if raw is not None else f"{indent}{name} {value}".rstrip(" ") + eol)
+        parts.append(self._footer)
+        return "".join(parts)
+
+
+def iter_statements(lines):
+    """
+    Yields (line number, text, node) for every statement of a script, node is an
+    NkNode for node blocks and None for commands (push, set, end_group, version ...).
+    lines is any iterable of lines with their line endings, an open file streams.
+    """
+    buffer, knob, knobs = [], [], None
+    depth, quoted, quote_depth, start = 0, False, 0, 0
+    header = None
+
+    for number, line in enumerate(lines, start=1):
+        if not buffer:
+            start = number
+            match = NODE_START_PATTERN.match(line) or CLONE_REF_PATTERN.match(line)
+            if match:
+                buffer, knobs, header = [line], [], line
+                depth, quote_depth = 1, 1
+                continue
+            if line.lstrip().startswith("#") or not line.strip():
+                yield number, line, None
+                continue
+            knobs, quote_depth = None, 0
+
+        buffer.append(line)
+        starts_knob = knobs is not None and depth == 1 and not quoted
+        if quoted or SPECIAL_CHARS.search(line):
+            depth, quoted = _scan(line, depth, quoted, quote_depth)
+
+        if knobs is not None:
+            if depth <= 0 and not quoted:
+                if knob:
+                    knobs.append(knob)
+                yield start, "".join(buffer), _make_node(header, knobs, line, "".join(buffer), start)
+                buffer, knob, knobs, depth = [], [], None, 0
+                continue
+            if starts_knob and knob:
+                knobs.append(knob)
+                knob = []
+            knob.append(line)
+        elif depth <= 0 and not quoted:
+            yield start, "".join(buffer), None
+            buffer, depth = [], 0
+
+    if buffer:
+        # Truncated script, keep the text so it still writes back unchanged
+        yield start, "".join(buffer), None
+
+
+def _make_node(header, knob_lines, footer, raw, line):
+    match = NODE_START_PATTERN.match(header)
+    knobs = []
+    blank = ""
+    for lines in knob_lines:
+        text = "".join(lines)
+        parts = text.strip().split(None, 1)
+        if not parts:
+            # Blank lines stay with the knob before them (or the first knob) to write back unchanged
+            if knobs:
+                knobs[-1][2] += text
+            else:
+                blank += text
+            continue
+        knobs.append([parts[0], parts[1] if len(parts) > 1 else "", blank + text])
+        blank = ""
+    if blank:
+        footer = blank + footer
+    if match:
+        node = NkNode(match.group(3), header, knobs, footer, raw, line)
+        node.clone_id = match.group(2)
+    else:
+        node = NkNode(None, header, knobs, footer, raw, line)
+        node.clone_id = "$" + CLONE_REF_PATTERN.match(header).group(2)
+    return node
+
+
+class _GraphBuilder(object):
+    """Replays the stack commands of a script to connect its nodes."""
+
+    def __init__(self):
+        self.stack = []
+        self.groups = []  # (group node, stack outside of it)
+        self.variables = {}
+        self.root = None
+        self.last_node = None
+
+    def feed(self, text, node):
+        if node is not None and _indent(text) > len(self.groups) and self.last_node is not None:
+            # Nodes one level deeper belong to the group written just before. Only nodes
+            # and end_group are indented, push and set never are.
+            self.groups.append((self.last_node, self.stack))
+            self.stack = []
+
+        if node is None:
+            self._command(text.strip())
+            return
+
+        if node.clone_id and node.clone_id.startswith("$"):
+            original = self.variables.get(node.clone_id[1:])
+            node.clone_of = original
+            node.cls = original.cls if original is not None else "clone"
+        if node.cls == "Root" and not self.groups:
+            self.root = node
+            return
+
+        node.parent = self.groups[-1][0] if self.groups else None
+        if node.parent is not None:
+            node.parent.children.append(node)
+        # The top of the stack is input 0
+        node.inputs = [self.stack.pop() if self.stack else None for _ in range(node.input_count)]
+        self.stack.append(node)
+        self.last_node = node
+
+    def _command(self, command):
+        if command.startswith("push "):
+            value = command[5:].strip()
+            self.stack.append(self.variables.get(value[1:]) if value.startswith("$") else None)
+        elif command.startswith("set "):
+            match = SET_PATTERN.match(command)
+            if match:
+                position = len(self.stack) - 1 - int(match.group(2))
+                self.variables[match.group(1)] = self.stack[position] if position >= 0 else None
+        elif command == "end_group" and self.groups:
+            group, self.stack = self.groups.pop()
+            self.last_node = group
+
+
+class NkScript(object):
+    """A parsed script: statements in file order, the nodes and the Root node."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.statements = []  # NkNode or the command text
+        self.nodes = []
+        self.root = None
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def by_name(self, full_name):
+        for node in self.nodes:
+            if node.full_name == full_name:
+                return node
+        return None
+
+    def nodes_by_class(self, cls):
+        return [node for node in self.nodes if node.cls == cls]
+
+    def block_range(self, node):
+        """
+        (start, end) slice of statements holding node, for a group including its
+        children up to and with its end_group.
+        """
+        start = next(i for i, statement in enumerate(self.statements) if statement is node)
+        last = start
+        if node.children:
+            last = next(i for i in range(start, len(self.statements)) if self.statements[i] is node.children[-1])
+        indent = _indent(node.to_nk())
+        # push and set are written unindented, only end_group tells where the group ends
+        for end in range(last + 1, len(self.statements)):
+            statement = self.statements[end]
+            if isinstance(statement, NkNode):
+                break
+            if statement.strip() == "end_group" and _indent(statement) == indent:
+                return start, end + 1
+            if statement.strip() and not node.children:
+                break
+        return start, last + 1
+
+    def edges(self):
+        """Yields (input node, node, input number) for every connected input."""
+        for node in self.nodes:
+            for number, source in enumerate(node.inputs):
+                if source is not None:
+                    yield source, node, number
+
+    def to_string(self):
+        return "".join(s.to_nk() if isinstance(s, NkNode) else s for s in self.statements)
+
+    def write(self, path=None):
+        """Writes the script next to path and renames it into place."""
+        path = path or self.path
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8', errors='surrogateescape', newline='') as f:
+                for statement in self.statements:
+                    f.write(statement.to_nk() if isinstance(statement, NkNode) else statement)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def _open_nk(path):
+    # surrogateescape keeps any non UTF-8 bytes intact, newline='' keeps line endings
+    return open(path, 'r', encoding='utf-8', errors='surrogateescape', newline='')
+
+
+def iter_nodes(path):
+    """
+    Streams the nodes of a script with their inputs connected. Commands and the
+    statement list are not kept, use iter_statements() to only cut a script
+    into statements in constant memory.
+    """
+    builder = _GraphBuilder()
+    with _open_nk(path) as f:
+        for _, text, node in iter_statements(f):
+            builder.feed(text, node)
+            if node is not None and node is not builder.root:
+                yield node
+
+
+def _build(script, lines):
+    builder = _GraphBuilder()
+    for _, text, node in iter_statements(lines):
+        builder.feed(text, node)
+        script.statements.append(text if node is None else node)
+        if node is not None and node is not builder.root:
+            script.nodes.append(node)
+    script.root = builder.root
+    return script
+
+
+def parse_nk(path):
+    """Parses the script at path into an NkScript."""
+    with _open_nk(path) as f:
+        return _build(NkScript(path), f)
+
+
+def parse_nk_string(text):
+    """Parses script text, e.g. a node selection copied from Nuke."""
+    return _build(NkScript(), text.splitlines(True))
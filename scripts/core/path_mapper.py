@@ -0,0 +1,223 @@
+# SPDX-License-Identifier: Apache-2.0
+# path_mapper.py - Config driven path mapping for migrated servers, other OSes and fallback roots
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+#
+# Nuke runs every file name through it (nuke.addFilenameFilter in init.py), so
+# a Linux render node reads //192.168.99.203/... from /mnt/... Headless:
+#     python -m scripts.core.path_mapper --project cinderella //192.168.99.25/prj/cinderella/...
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import functools
+import threading
+from collections import OrderedDict
+
+# Servers the project moved away from, used when the config has no migrations of its own
+DEFAULT_MIGRATIONS = {
+    "//192.168.99.25": "//192.168.99.203",
+    "//192.168.99.202": "//192.168.99.203",
+}
+
+DEFAULT_CACHE_SIZE = 8192
+FALLBACK_RECHECK_SECONDS = 30  # files get published and moved, where a path resolves to is checked again after this
+
+
+def current_os():
+    if sys.platform.startswith("win"):
+        return "windows"
+    if sys.platform == "darwin":
+        return "darwin"
+    return "linux"
+
+
+def _windows_style(path):
+    return path.startswith("//") or (len(path) > 1 and path[1] == ":")
+
+
+def _normalize(path):
+    return path.replace("\\", "/")
+
+
+def _segments(path):
+    """Prefix segments to walk the trie with, case-insensitive for UNC and drive letter paths."""
+    path = _normalize(path).rstrip("/")
+    return (path.lower() if _windows_style(path) else path).split("/")
+
+
+class PrefixTrie(object):
+    """Longest prefix match over whole path segments: //srv/prj matches //srv/prj/a.exr but not //srv/prj2."""
+    __slots__ = ("_root",)
+
+    _VALUE = object()
+
+    def __init__(self, items=()):
+        self._root = {}
+        for prefix, value in items:
+            self.add(prefix, value)
+
+    def __bool__(self):
+        return bool(self._root)
+
+    def add(self, prefix, value):
+        node = self._root
+        for segment in _segments(prefix):
+            node = node.setdefault(segment, {})
+        node[self._VALUE] = (len(_normalize(prefix).rstrip("/")), value)
+
+    def match(self, path):
+        """Returns (prefix length in path, value) of the longest matching prefix, or None."""
+        node, found = self._root, None
+        for segment in _segments(path):
+            node = node.get(segment)
+            if node is None:
+                break
+            found = node.get(self._VALUE, found)
+        return found
+
+
+class PathMapper(object):
+    """
+    Maps a path in three steps:
+        migrations - old server prefix -> new server prefix, {"//192.168.99.25": "//192.168.99.203"}
+        roots      - the same storage on every OS, [{"windows": "//192.168.99.203/prj", "linux": "/mnt/prj"}],
+                     a root of any other OS is replaced with the one of this OS
+        fallbacks  - ordered roots of the same tree, [["//srv/cache_new", "//srv/cache_old"]], a missing
+                     path's folder is looked up under the following roots and the first existing one is used
+    Results are memoised, a lookup of a seen path is a dict hit. The root a folder under a fallback
+    root resolves to is remembered for FALLBACK_RECHECK_SECONDS, for up to cache_size folders.
+    """
+
+    def __init__(self, migrations=None, roots=(), fallbacks=(), os_name=None, cache_size=DEFAULT_CACHE_SIZE):
+        self.os_name = os_name or current_os()
+        self.migrations = dict(DEFAULT_MIGRATIONS if migrations is None else migrations)
+        self.roots = [dict(root) for root in roots]
+        self.fallbacks = [list(group) for group in fallbacks]
+
+        self._migrations = PrefixTrie((old, new.rstrip("/")) for old, new in self.migrations.items())
+        # The same migrations as a single regex for rewriting stored paths in bulk, longest prefix first
+        olds = sorted((old.rstrip("/") for old in self.migrations), key=len, reverse=True)
+        self.migration_pattern = re.compile(
+            "^(%s)(?=/|$)" % "|".join(re.escape(old) for old in olds), re.IGNORECASE) if olds else None
+        self._migration_targets = {old.rstrip("/").lower(): new.rstrip("/") for old, new in self.migrations.items()}
+        # Changes whenever the migrations do, scripts remapped against an older table are checked again
+        self.migration_version = hashlib.sha1(
+            json.dumps(sorted(self._migration_targets.items())).encode("utf-8")).hexdigest()[:12]
+        self._roots = PrefixTrie((path, root[self.os_name].rstrip("/"))
+                                 for root in self.roots if root.get(self.os_name)
+                                 for os_name, path in root.items() if os_name != self.os_name and path)
+        # Fallback roots are compared with already mapped paths, so they are mapped the same way
+        groups = [[self._rewrite(root).rstrip("/") for root in group if root] for group in self.fallbacks]
+        self._fallbacks = PrefixTrie((root, group) for group in groups for root in group if len(group) > 1)
+
+        self._cache_size = cache_size
+        self._resolved = OrderedDict()  # folder -> (time it was checked, fallback root or None), LRU
+        self._resolved_lock = threading.Lock()
+        self._cached_rewrite = functools.lru_cache(maxsize=cache_size)(self._rewrite)
+
+    @classmethod
+    def from_config(cls, config, **kwargs):
+        """Rules from a project config: its path_mapping block, cache_path_new/old fall back to each other."""
+        settings = config.get("path_mapping", {})
+        fallbacks = list(settings.get("fallbacks", []))
+        cache_roots = [config.get("cache_path_new"), config.get("cache_path_old")]
+        if all(cache_roots) and not any(cache_roots[0] in group for group in fallbacks):
+            fallbacks.append(cache_roots)
+        return cls(settings.get("migrations"), settings.get("roots", ()), fallbacks, **kwargs)
+
+    def _rewrite(self, path):
+        for trie in (self._migrations, self._roots):
+            if trie:
+                found = trie.match(path)
+                if found is not None:
+                    length, target = found
+                    path = target + _normalize(path[length:])
+        return path
+
+    def _resolve_root(self, directory, length, group):
+        """The fallback root directory exists under, None if it is where it is (or nowhere)."""
+        if os.path.exists(directory):
+            return None
+        rest = directory[length:]
+        for root in group:
+            if root + rest != directory and os.path.exists(root + rest):
+                return root
+        return None
+
+    def _fallback(self, path):
+        found = self._fallbacks.match(path)
+        if found is None:
+            return path
+        length, group = found
+        # Resolved per folder: every frame of a sequence (and the %04d pattern) shares one check
+        directory = os.path.dirname(path)
+        now = time.monotonic()
+        with self._resolved_lock:
+            resolved = self._resolved.get(directory)
+            if resolved is not None and now - resolved[0] < FALLBACK_RECHECK_SECONDS:
+                self._resolved.move_to_end(directory)
+        if resolved is None or now - resolved[0] >= FALLBACK_RECHECK_SECONDS:
+            resolved = (now, self._resolve_root(directory, length, group))
+            with self._resolved_lock:
+                self._resolved[directory] = resolved
+                self._resolved.move_to_end(directory)
+                while len(self._resolved) > self._cache_size:
+                    self._resolved.popitem(last=False)
+        root = resolved[1]
+        return path if root is None else root + path[length:]
+
+    def migrate(self, path):
+        """The path with an old server prefix replaced with the new one, what gets stored back into scripts."""
+        if self.migration_pattern is None or not path:
+            return path
+        return self.migration_pattern.sub(lambda m: self._migration_targets[m.group(1).lower()], path, count=1)
+
+    def map(self, path):
+        """The path to open on this machine. Anything without a matching rule is returned unchanged."""
+        if not path:
+            return path
+        path = self._cached_rewrite(path)
+        return self._fallback(path) if self._fallbacks else path
+
+    __call__ = map
+
+    def clear_cache(self):
+        self._cached_rewrite.cache_clear()
+        with self._resolved_lock:
+            self._resolved.clear()
+
+
+_mappers = {}
+_mappers_lock = threading.Lock()
+
+
+def get_path_mapper(project="cinderella"):
+    """The mapper of a project, built from its config once per process."""
+    with _mappers_lock:
+        mapper = _mappers.get(project)
+        if mapper is None:
+            from ..config import get_project_config
+            mapper = _mappers[project] = PathMapper.from_config(get_project_config(project))
+        return mapper
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show how paths are mapped on this machine")
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--project", default="cinderella")
+    parser.add_argument("--os", choices=("windows", "linux", "darwin"), help="Map as if running on this OS")
+    args = parser.parse_args(argv)
+
+    from ..config import get_project_config
+    mapper = PathMapper.from_config(get_project_config(args.project), os_name=args.os)
+    for path in args.paths:
+        print(f"{path} -> {mapper.map(path)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
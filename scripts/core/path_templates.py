@@ -0,0 +1,289 @@
+# SPDX-License-Identifier: Apache-2.0
+# path_templates.py - Declarative shot path layout, formatting and parsing
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+#
+# One template per path, compiled once and memoised both ways:
+#     templates.format("comp_exr", ep="ep01", sq="sq010", sh="sh010")  ->  ".../comp/exr/ep01_sq010_sh010.%04d.exr"
+#     templates.parse("script_name", "ep01_sq010_sh010_v003.nk", exact=False)  ->  {"ep": "ep01", ...}
+#
+# Syntax: {field} is a value, {@name} inlines another template, [...] is an
+# optional part, formatted only when every field in it has a value.
+
+import re
+import functools
+import threading
+
+# What a field matches when parsing, anything else is one folder or file name part
+FIELD_PATTERNS = {
+    "ep": r"ep\d+",
+    "sq": r"sq\d+",
+    "sh": r"sh\d+",
+    "version": r"v\d+",
+    "kind": r"light_precomp|precomp",
+    "layer": r"[^/]+?",
+    "comp_root": r".+?",
+    "render_root": r".+?",
+    "cache_root": r".+?",
+}
+DEFAULT_FIELD_PATTERN = r"[^/]+?"
+
+DEFAULT_TEMPLATES = {
+    "shot": "{ep}_{sq}_{sh}",
+    # ep01_sq010_sh010_v003, ep01sq010sh010, ep01_sq010_sh010_light_precomp_v002
+    "script_name": "{ep}[_]{sq}[_]{sh}[_{kind}][_{version}]",
+
+    "sequence_dir": "{comp_root}/{ep}/{sq}",
+    "shot_dir": "{@sequence_dir}/{sh}",
+
+    "comp_dir": "{@shot_dir}/comp",
+    "comp_nk_dir": "{@comp_dir}/nk",
+    "comp_exr_dir": "{@comp_dir}/exr",
+    "comp_mov_dir": "{@comp_dir}/mov",
+    "thumb_dir": "{@comp_mov_dir}/.thumb",
+    "comp_script": "{@comp_nk_dir}/{@shot}_{version}.nk",
+    "comp_exr": "{@comp_exr_dir}/{@shot}.%04d.exr",
+    "comp_mov": "{@comp_mov_dir}/{@shot}_{version}.mov",
+
+    "precomp_dir": "{@shot_dir}/light_precomp",
+    "precomp_nk_dir": "{@precomp_dir}/nk",
+    "precomp_exr_dir": "{@precomp_dir}/exr",
+    "precomp_mov_dir": "{@precomp_dir}/mov",
+    "precomp_script": "{@precomp_nk_dir}/{@shot}_precomp_{version}.nk",
+    "precomp_exr": "{@precomp_exr_dir}/{@shot}_precomp.%04d.exr",
+    "precomp_mov": "{@precomp_mov_dir}/{@shot}_precomp_{version}.mov",
+
+    "render_dir": "{render_root}/{ep}/{sq}/{sh}/render",
+    "render_layer_dir": "{@render_dir}/{layer}",
+    "camera": "{cache_root}/{ep}/{sq}/{sh}/src/shot_camera.abc",
+}
+
+# Project config keys the root fields default to
+ROOT_CONFIG_KEYS = {
+    "comp_root": "server_comp_path",
+    "render_root": "server_render_path",
+    "cache_root": "cache_path_new",
+}
+
+DEFAULT_CACHE_SIZE = 4096
+
+TOKEN_PATTERN = re.compile(r'\{(@?)(\w+)\}|\[|\]|[^{}\[\]]+')
+
+
+class TemplateError(ValueError):
+    """A template that can't be compiled or formatted."""
+
+
+def _tokenize(name, source, templates, stack=()):
+    """Nested [("text", s) | ("field", name) | ("optional", [...])] with {@name} references inlined."""
+    if name in stack:
+        raise TemplateError(f"template {name} references itself: {' -> '.join(stack + (name,))}")
+    root = []
+    nodes = [root]
+    position = 0
+    for match in TOKEN_PATTERN.finditer(source):
+        if match.start() != position:
+            break
+        position = match.end()
+        token = match.group()
+        if token == "[":
+            optional = []
+            nodes[-1].append(("optional", optional))
+            nodes.append(optional)
+        elif token == "]":
+            if len(nodes) == 1:
+                raise TemplateError(f"unbalanced ] in template {name}")
+            nodes.pop()
+        elif match.group(2):
+            if match.group(1):
+                reference = match.group(2)
+                if reference not in templates:
+                    raise TemplateError(f"template {name} references unknown template {reference}")
+                nodes[-1].extend(_tokenize(reference, templates[reference], templates, stack + (name,)))
+            else:
+                nodes[-1].append(("field", match.group(2)))
+        else:
+            nodes[-1].append(("text", token))
+    if position != len(source) or len(nodes) != 1:
+        raise TemplateError(f"malformed template {name}: {source}")
+    return root
+
+
+class PathTemplate(object):
+    """A compiled template. format() and parse() results are memoised."""
+
+    def __init__(self, name, source, templates=None, defaults=None, cache_size=DEFAULT_CACHE_SIZE):
+        self.name = name
+        self.source = source
+        self.defaults = dict(defaults or {})
+        self._tokens = _tokenize(name, source, templates or {name: source})
+        self.fields = []
+        self._regex = re.compile(self._pattern(self._tokens, set()), re.IGNORECASE)
+        self._format = functools.lru_cache(maxsize=cache_size)(self._format_items)
+        self._parse = functools.lru_cache(maxsize=cache_size)(self._match)
+
+    def __repr__(self):
+        return f"<PathTemplate {self.name}: {self.source}>"
+
+    def _pattern(self, tokens, seen):
+        parts = []
+        for kind, value in tokens:
+            if kind == "text":
+                parts.append(re.escape(value))
+            elif kind == "optional":
+                parts.append(f"(?:{self._pattern(value, seen)})?")
+            elif value in seen:
+                parts.append(f"(?P={value})")
+            else:
+                seen.add(value)
+                self.fields.append(value)
+                # Roots with a configured value only match that value
+                default = self.defaults.get(value)
+                pattern = re.escape(default.rstrip("/")) if default else FIELD_PATTERNS.get(value, DEFAULT_FIELD_PATTERN)
+                parts.append(f"(?P<{value}>{pattern})")
+        return "".join(parts)
+
+    def _render(self, tokens, context, optional=False):
+        parts = []
+        for kind, value in tokens:
+            if kind == "text":
+                parts.append(value)
+            elif kind == "optional":
+                rendered = self._render(value, context, optional=True)
+                if rendered is not None:
+                    parts.append(rendered)
+            elif context.get(value) is None:
+                if optional:
+                    return None
+                raise TemplateError(f"template {self.name} needs {value}")
+            else:
+                parts.append(str(context[value]))
+        return "".join(parts)
+
+    def _format_items(self, items):
+        context = dict(self.defaults)
+        context.update(items)
+        return self._render(self._tokens, context)
+
+    def format(self, **context):
+        """The path for context, fields left out take the template defaults (roots from config)."""
+        return self._format(tuple(sorted(context.items())))
+
+    def _match(self, path, exact):
+        path = path.replace("\\", "/")
+        match = self._regex.fullmatch(path) if exact else self._regex.match(path)
+        return match.groupdict() if match else None
+
+    def parse(self, path, exact=True):
+        """
+        {field: value} of a path (or None if it doesn't follow the template), fields of
+        optional parts that aren't there are None. exact=False only matches the start.
+        """
+        fields = self._parse(path, exact)
+        return dict(fields) if fields is not None else None
+
+
+class PathTemplates(object):
+    """
+    The templates of a project: DEFAULT_TEMPLATES with its overrides, root fields
+    defaulting to the project paths. Templates are compiled on first use.
+    """
+
+    def __init__(self, overrides=None, defaults=None):
+        self.sources = dict(DEFAULT_TEMPLATES)
+        self.sources.update(overrides or {})
+        self.defaults = dict(defaults or {})
+        self._compiled = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Compiled templates are rebuilt on use, so templates can be passed to worker processes
+        return {"sources": self.sources, "defaults": self.defaults}
+
+    def __setstate__(self, state):
+        self.__init__(defaults=state["defaults"])
+        self.sources = state["sources"]
+
+    @classmethod
+    def from_config(cls, config):
+        defaults = {field: config.get(key) for field, key in ROOT_CONFIG_KEYS.items() if config.get(key)}
+        return cls(config.get("path_templates"), defaults)
+
+    def __contains__(self, name):
+        return name in self.sources
+
+    def __getitem__(self, name):
+        template = self._compiled.get(name)
+        if template is None:
+            if name not in self.sources:
+                raise KeyError(f"no path template {name}")
+            with self._lock:
+                template = self._compiled.get(name)
+                if template is None:
+                    template = self._compiled[name] = PathTemplate(name, self.sources[name], self.sources,
+                                                                   self.defaults)
+        return template
+
+    def format(self, name, **context):
+        return self[name].format(**context)
+
+    def parse(self, name, path, exact=True):
+        return self[name].parse(path, exact)
+
+    def shot_context(self, text):
+        """{"ep", "sq", "sh"} from a shot, script or file name starting with one, or None."""
+        context = self.parse("script_name", text, exact=False)
+        return {field: context[field] for field in ("ep", "sq", "sh")} if context else None
+
+    def shot_paths(self, shot, **context):
+        """The folders of a shot (ep01_sq010_sh010), or None for a name that isn't a shot."""
+        shot_context = self.shot_context(shot)
+        if shot_context is None:
+            return None
+        context.update(shot_context)
+        paths = {"shot_name": self.format("shot", **shot_context)}
+        paths.update(shot_context)
+        for key, name in (("comp_dir", "comp_dir"), ("precomp_dir", "precomp_dir"), ("nk_dir", "comp_nk_dir"),
+                          ("exr_dir", "comp_exr_dir"), ("mov_dir", "comp_mov_dir"), ("thumb_dir", "thumb_dir"),
+                          ("render_dir", "render_dir"), ("camera", "camera")):
+            try:
+                paths[key] = self.format(name, **context)
+            except TemplateError:
+                paths[key] = None  # a root that isn't configured
+        return paths
+
+
+default_templates = PathTemplates()
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+def get_path_templates(project=None):
+    """The templates of a project built from its config once per process, DEFAULT_TEMPLATES without a project."""
+    if project is None:
+        return default_templates
+    with _templates_lock:
+        templates = _templates.get(project)
+        if templates is None:
+            from ..config import get_project_config
+            templates = _templates[project] = PathTemplates.from_config(get_project_config(project))
+        return templates
+
+
+def write_file_path(comp_path, script_name, file_format, templates=None):
+    """
+    Path the EXR or MOV Write of a script renders to, derived from the script name
+    (ep01_sq010_sh010_v003.nk, ep01_sq010_sh010_precomp_v002.nk). None if the name
+    doesn't follow the convention or a MOV path is asked for an unversioned script.
+    """
+    templates = templates or default_templates
+    context = templates.parse("script_name", script_name, exact=False)
+    if not context or file_format not in ("exr", "mov"):
+        return None
+    if file_format == "mov" and not context["version"]:
+        return None
+
+    kind = "precomp" if context.pop("kind") else "comp"
+    if comp_path:
+        context["comp_root"] = comp_path
+    return templates.format(f"{kind}_{file_format}", **context)
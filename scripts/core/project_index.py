@@ -0,0 +1,265 @@
+# SPDX-License-Identifier: Apache-2.0
+# project_index.py - Shared project-wide shot index and its headless indexer
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+#
+# One machine (render node, scheduled task) runs the indexer:
+#     python -m scripts.core.project_index --project cinderella
+# and every Shot Manager reads the resulting SQLite file instead of crawling
+# the render share on its own.
+
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import argparse
+from urllib.request import pathname2url
+
+from .shot_scanner import ShotScanner, DEFAULT_SCAN_WORKERS
+from .path_templates import get_path_templates
+
+SCHEMA_VERSION = 3
+INDEX_FILE_NAME = ".shot_index.sqlite"
+DEFAULT_INDEX_MAX_AGE = 3600  # seconds
+
+SHOT_PATTERN = re.compile(r'(ep\d+)_(sq\d+)_(sh\d+)')
+
+# shots.record holds the full ShotScanner record as JSON, the other tables
+# duplicate parts of it so they can be queried directly.
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE dirs (rel TEXT PRIMARY KEY, data TEXT);
+CREATE TABLE shots (name TEXT PRIMARY KEY, ep TEXT, sq TEXT, sh TEXT, record TEXT);
+CREATE TABLE layers (
+    shot TEXT, layer TEXT, version INTEGER, dir_name TEXT,
+    PRIMARY KEY (shot, layer)
+);
+CREATE TABLE scripts (
+    shot TEXT, kind TEXT, file_name TEXT, version INTEGER,
+    PRIMARY KEY (shot, kind)
+);
+CREATE TABLE aovs (
+    shot TEXT, layer TEXT, aov TEXT, channels TEXT,
+    PRIMARY KEY (shot, layer, aov)
+);
+CREATE INDEX aovs_by_name ON aovs (aov);
+"""
+
+
+def default_index_path(config):
+    index_path = config.get("shot_manager", {}).get("index_path")
+    if index_path:
+        return index_path
+    render_path = config.get("server_render_path")
+    return f"{render_path}/{INDEX_FILE_NAME}" if render_path else None
+
+
+class ProjectIndex(object):
+    """Read-only view of an index file. Missing or unreadable files behave as an empty, stale index."""
+
+    def __init__(self, path):
+        self.path = path
+        self.meta = {}
+        self._conn = None
+
+        if not path or not os.path.exists(path):
+            return
+        try:
+            # immutable: the indexer never writes in place, it swaps in a new file
+            uri = f"file:{pathname2url(os.path.abspath(path))}?mode=ro&immutable=1"
+            self._conn = sqlite3.connect(uri, uri=True)
+            self.meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+        except sqlite3.Error as e:
+            print(f"Error opening shot index {path}: {e}")
+            self.close()
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def indexed_at(self):
+        return float(self.meta.get("indexed_at", 0))
+
+    def is_fresh(self, render_root=None, max_age=DEFAULT_INDEX_MAX_AGE):
+        if self._conn is None:
+            return False
+        if int(self.meta.get("schema_version", 0)) != SCHEMA_VERSION:
+            return False
+        if render_root and self.meta.get("render_root") != render_root:
+            return False
+        return time.time() - self.indexed_at < max_age
+
+    def shots(self):
+        if self._conn is None:
+            return []
+        return [row[0] for row in self._conn.execute("SELECT name FROM shots ORDER BY name")]
+
+    def layers(self, shot):
+        """Returns {layer: (version, dir_name)} for the latest render of each layer."""
+        if self._conn is None:
+            return {}
+        rows = self._conn.execute("SELECT layer, version, dir_name FROM layers WHERE shot = ?", (shot,))
+        return {layer: (version, dir_name) for layer, version, dir_name in rows}
+
+    def latest_script(self, shot, kind="nk"):
+        """Returns (file_name, version) of the latest comp ("nk") or light precomp ("precomp") script, or None."""
+        if self._conn is None:
+            return None
+        return self._conn.execute(
+            "SELECT file_name, version FROM scripts WHERE shot = ? AND kind = ?", (shot, kind)).fetchone()
+
+    def aovs(self, shot):
+        """Returns {layer: {aov: [channel]}} read from the EXR headers of the latest render of each layer."""
+        if self._conn is None:
+            return {}
+        aovs = {}
+        for layer, aov, channels in self._conn.execute(
+                "SELECT layer, aov, channels FROM aovs WHERE shot = ? ORDER BY layer, aov", (shot,)):
+            aovs.setdefault(layer, {})[aov] = channels.split(",")
+        return aovs
+
+    def shots_with_aov(self, aov):
+        """Returns [(shot, layer)] whose latest render has the AOV, e.g. "lgt_key"."""
+        if self._conn is None:
+            return []
+        return self._conn.execute(
+            "SELECT shot, layer FROM aovs WHERE aov = ? ORDER BY shot, layer", (aov,)).fetchall()
+
+    def records(self):
+        """Returns {shot: record} as collected by ShotScanner.collect_record."""
+        if self._conn is None:
+            return {}
+        return {name: json.loads(record) for name, record in self._conn.execute("SELECT name, record FROM shots")}
+
+    def tree(self):
+        if self._conn is None:
+            return {}
+        return {rel: json.loads(data) for rel, data in self._conn.execute("SELECT rel, data FROM dirs")}
+
+
+class ProjectIndexer(object):
+    """
+    Scans the render tree with ShotScanner and writes a fresh index file.
+    The previous index supplies directory mtimes, so unchanged folders are not listed again.
+    """
+
+    def __init__(self, render_path, comp_path, index_path, max_workers=DEFAULT_SCAN_WORKERS, project=None,
+                 camera_roots=(), read_aovs=True, templates=None):
+        self.render_path = render_path
+        self.comp_path = comp_path
+        self.index_path = index_path
+        self.max_workers = max_workers
+        self.project = project
+        self.camera_roots = camera_roots
+        self.read_aovs = read_aovs
+        self.templates = templates
+
+    def build(self, full_scan=False):
+        started = time.time()
+        with ProjectIndex(self.index_path) as previous:
+            reuse = not full_scan and previous.meta.get("render_root") == self.render_path \
+                and int(previous.meta.get("schema_version", 0)) == SCHEMA_VERSION
+            previous_tree = previous.tree() if reuse else {}
+            previous_records = previous.records() if reuse else {}
+
+        scanner = ShotScanner(self.render_path,
+                              max_workers=self.max_workers,
+                              previous_tree=previous_tree,
+                              comp_path=self.comp_path,
+                              camera_roots=self.camera_roots,
+                              previous_records=previous_records,
+                              read_aovs=self.read_aovs,
+                              templates=self.templates)
+        shots = scanner.scan()
+
+        self._write(shots, scanner.records, scanner.tree)
+        print(f"Indexed {len(shots)} shots in {time.time() - started:.1f}s "
+              f"(reused {scanner.reused_dirs} of {len(scanner.tree)} directories) -> {self.index_path}")
+        return shots
+
+    def _write(self, shots, records, tree):
+        index_dir = os.path.dirname(self.index_path)
+        if index_dir and not os.path.exists(index_dir):
+            os.makedirs(index_dir)
+
+        # Build next to the target and swap it in, readers always see a complete file
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        conn = sqlite3.connect(tmp_path)
+        try:
+            conn.executescript(SCHEMA)
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+                ("schema_version", str(SCHEMA_VERSION)),
+                ("render_root", self.render_path),
+                ("project", self.project or ""),
+                ("indexed_at", repr(time.time())),
+            ])
+            conn.executemany("INSERT INTO dirs VALUES (?, ?)",
+                             [(rel, json.dumps(data)) for rel, data in tree.items()])
+            conn.executemany("INSERT INTO shots VALUES (?, ?, ?, ?, ?)", [
+                (shot,) + SHOT_PATTERN.match(shot).groups() + (json.dumps(records.get(shot, {})),)
+                for shot in shots])
+            conn.executemany("INSERT INTO layers VALUES (?, ?, ?, ?)", [
+                (shot, layer, version, dir_name)
+                for shot, record in records.items() for layer, (version, dir_name) in record["layers"].items()])
+            conn.executemany("INSERT INTO scripts VALUES (?, ?, ?, ?)", [
+                (shot, kind, record[kind][0], record[kind][1])
+                for shot, record in records.items() for kind in ("nk", "precomp") if record.get(kind)])
+            conn.executemany("INSERT INTO aovs VALUES (?, ?, ?, ?)", [
+                (shot, layer, aov, ",".join(channels))
+                for shot, record in records.items()
+                for layer, (_, layer_aovs) in record.get("aovs", {}).items()
+                for aov, channels in layer_aovs.items()])
+            conn.commit()
+        finally:
+            conn.close()
+
+        # Readers only hold the file open for a single query, retry if one is in the way
+        for attempt in range(10):
+            try:
+                os.replace(tmp_path, self.index_path)
+                return
+            except PermissionError:
+                time.sleep(0.5)
+        os.remove(tmp_path)
+        raise RuntimeError(f"Could not replace shot index {self.index_path}, it is locked")
+
+
+def main(argv=None):
+    from ..config import get_project_config
+
+    parser = argparse.ArgumentParser(description="Build the shared Shot Manager index")
+    parser.add_argument("--project", default="cinderella")
+    parser.add_argument("--index", help="Index file path (default: shot_manager.index_path from config)")
+    parser.add_argument("--workers", type=int, help="Scanner threads (default: shot_manager.scan_workers)")
+    parser.add_argument("--full", action="store_true", help="Ignore directory mtimes from the previous index")
+    args = parser.parse_args(argv)
+
+    config = get_project_config(args.project)
+    settings = config.get("shot_manager", {})
+    workers = args.workers or settings.get("scan_workers", DEFAULT_SCAN_WORKERS)
+    indexer = ProjectIndexer(config.get("server_render_path"),
+                             config.get("server_comp_path"),
+                             args.index or default_index_path(config),
+                             max_workers=workers,
+                             project=args.project,
+                             camera_roots=(config.get("cache_path_new"), config.get("cache_path_old")),
+                             read_aovs=settings.get("index_aovs", True),
+                             templates=get_path_templates(args.project))
+    indexer.build(full_scan=args.full)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+# SPDX-License-Identifier: Apache-2.0
+# render_watcher.py - Live render tree watcher for the Shot Manager
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+
+import os
+import sys
+import time
+import select
+import ctypes
+import ctypes.util
+import threading
+
+from .shot_scanner import ShotScanner, DEFAULT_SCAN_WORKERS
+
+DEFAULT_WATCH_INTERVAL = 60  # seconds between polls
+SETTLE_TIME = 2.0  # seconds to let a burst of filesystem events finish
+
+# inotify(7) constants
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = 0o0004000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_ONLYDIR
+
+# inotify only sees changes made through this machine's kernel, renders written to
+# these by farm nodes raise no events
+NETWORK_FILESYSTEMS = frozenset(("nfs", "nfs4", "cifs", "smb3", "smbfs", "ncpfs", "afs", "9p", "ceph", "lustre",
+                                 "gpfs", "glusterfs", "fuse.glusterfs", "fuse.sshfs", "fuse.davfs2", "fuse.rclone"))
+
+
+class _Inotify(object):
+    """Minimal ctypes binding, only reports that something changed in one of the watched folders."""
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watched = set()
+        # Self-pipe so stop() can interrupt a blocking wait()
+        self._wake_r, self._wake_w = os.pipe()
+
+    def add_watch(self, path):
+        if path in self.watched:
+            return
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        self.watched.add(path)
+
+    def wait(self, timeout):
+        """Blocks until an event arrives or timeout expires. Returns True if there were events."""
+        ready, _, _ = select.select([self.fd, self._wake_r], [], [], timeout)
+        if self.fd not in ready:
+            return False
+        self.drain()
+        return True
+
+    def wake(self):
+        os.write(self._wake_w, b"x")
+
+    def drain(self):
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self):
+        if self.fd >= 0:
+            for fd in (self.fd, self._wake_r, self._wake_w):
+                os.close(fd)
+            self.fd = -1
+
+
+def _inotify_available():
+    return sys.platform.startswith('linux') and hasattr(select, 'select')
+
+
+def filesystem_type(path, mounts_path="/proc/self/mounts"):
+    """Type of the filesystem path is on (ext4, nfs4, cifs...), None if it can't be told."""
+    path = os.path.realpath(path)
+    found, found_type = "", None
+    try:
+        with open(mounts_path, 'r') as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                # Spaces and the like are octal escaped: /mnt/render\040share
+                mount_point = fields[1].encode("latin-1").decode("unicode_escape")
+                inside = path == mount_point or path.startswith(mount_point.rstrip("/") + "/")
+                if inside and len(mount_point) >= len(found):
+                    found, found_type = mount_point, fields[2]
+    except OSError:
+        return None
+    return found_type
+
+
+class RenderWatcher(object):
+    """
+    Keeps a shot list in sync with the render tree from a background thread.
+
+    Every check is an incremental ShotScanner pass over the tree and records of the
+    previous pass, so unchanged folders cost a single stat. On Linux the folders of
+    a tree on a local filesystem are watched with inotify and checked as soon as an
+    event arrives, besides the poll every interval seconds that catches frames landing
+    in existing layer folders. Network mounts (NFS, SMB), where farm renders land, raise
+    no inotify events for other hosts' writes and are only polled.
+
+    on_change(added, changed, removed, shots, tree, records) is called from the watcher
+    thread whenever the shot list or any shot record differs from the previous pass.
+    """
+
+    def __init__(self, render_path, on_change, shots=None, tree=None, records=None,
+                 comp_path=None, camera_roots=(), interval=DEFAULT_WATCH_INTERVAL,
+                 max_workers=DEFAULT_SCAN_WORKERS, use_inotify=True, templates=None):
+        self.render_path = render_path
+        self.on_change = on_change
+        self.comp_path = comp_path
+        self.camera_roots = camera_roots
+        self.templates = templates
+        self.interval = max(1, interval)
+        self.max_workers = max_workers
+        self.use_inotify = use_inotify and _inotify_available()
+        self.backend = None
+
+        self._lock = threading.Lock()
+        self._shots = list(shots or [])
+        self._tree = dict(tree or {})
+        self._records = dict(records or {})
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._inotify = None
+
+    def reset(self, shots, tree, records):
+        """Replaces the baseline after a scan done elsewhere (e.g. a manual refresh)."""
+        with self._lock:
+            self._shots = list(shots)
+            self._tree = dict(tree)
+            self._records = dict(records)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="RenderWatcher")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        inotify = self._inotify
+        if inotify is not None:
+            try:
+                inotify.wake()
+            except OSError:
+                pass  # Already closed by the watcher thread
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive() and not self._stop_event.is_set()
+
+    def check(self):
+        """Runs one incremental pass and reports differences. Returns True if anything changed."""
+        with self._lock:
+            old_shots, old_tree, old_records = self._shots, self._tree, self._records
+
+        scanner = ShotScanner(self.render_path,
+                              max_workers=self.max_workers,
+                              previous_tree=old_tree,
+                              comp_path=self.comp_path,
+                              camera_roots=self.camera_roots,
+                              previous_records=old_records,
+                              templates=self.templates)
+        shots = scanner.scan()
+        if self._stop_event.is_set():
+            return False
+
+        old_set, new_set = set(old_shots), set(shots)
+        added = sorted(new_set - old_set)
+        removed = sorted(old_set - new_set)
+        changed = sorted(shot for shot in new_set & old_set
+                         if scanner.records.get(shot) != old_records.get(shot))
+
+        with self._lock:
+            self._shots, self._tree, self._records = shots, scanner.tree, scanner.records
+
+        if self._inotify is not None:
+            self._watch_tree(scanner.tree)
+
+        if added or removed or changed:
+            self.on_change(added, changed, removed, shots, scanner.tree, scanner.records)
+            return True
+        return False
+
+    def _watch_tree(self, tree):
+        paths = []
+        for rel, data in tree.items():
+            path = os.path.join(self.render_path, rel) if rel else self.render_path
+            paths.append(path)
+            # Shot folders (children of sequences) so a new render folder is noticed
+            if rel.count("/") == 1:
+                paths.extend(os.path.join(path, sh) for sh in data.get("dirs", []))
+        try:
+            for path in paths:
+                if path not in self._inotify.watched and os.path.isdir(path):
+                    self._inotify.add_watch(path)
+        except OSError as e:
+            print(f"Render watcher: {e}, falling back to polling")
+            inotify, self._inotify = self._inotify, None
+            inotify.close()
+            self.backend = "polling"
+
+    def _run(self):
+        if self.use_inotify:
+            fs_type = filesystem_type(self.render_path)
+            if fs_type in NETWORK_FILESYSTEMS:
+                print(f"Render watcher: {self.render_path} is on {fs_type}, polling every {self.interval}s")
+                self.use_inotify = False
+        if self.use_inotify:
+            try:
+                self._inotify = _Inotify()
+                self.backend = "inotify"
+                with self._lock:
+                    tree = self._tree
+                self._watch_tree(tree)
+            except OSError as e:
+                print(f"Render watcher: inotify unavailable ({e}), falling back to polling")
+                self._inotify = None
+        if self._inotify is None:
+            self.backend = "polling"
+
+        while not self._stop_event.is_set():
+            try:
+                if self._inotify is not None:
+                    # Frames landing in an existing layer folder raise no event, poll anyway
+                    if self._inotify.wait(self.interval):
+                        time.sleep(SETTLE_TIME)
+                        self._inotify.drain()
+                elif self._stop_event.wait(self.interval):
+                    break
+
+                if not self._stop_event.is_set():
+                    self.check()
+            except Exception as e:
+                # A failing pass or on_change handler must not end the watcher
+                if self._stop_event.is_set():
+                    break
+                print(f"Render watcher error: {type(e).__name__}: {e}")
+                self._stop_event.wait(self.interval)
+
+        inotify, self._inotify = self._inotify, None
+        if inotify is not None:
+            inotify.close()
@@ -0,0 +1,338 @@
+# SPDX-License-Identifier: Apache-2.0
+# script_inventory.py - Project-wide inventory of what shot scripts read, write and use
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+#
+# Parses every comp and light precomp script without Nuke and records its file
+# paths, node classes and gizmos in SQLite:
+#     python -m scripts.core.script_inventory --project cinderella
+#     python -m scripts.core.script_inventory --project cinderella --reads beauty_v012
+#     python -m scripts.core.script_inventory --project cinderella --uses TX_3DRays
+
+import os
+import re
+import sys
+import time
+import shutil
+import sqlite3
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from urllib.request import pathname2url
+
+from .nk_parser import iter_nodes
+from .path_templates import get_path_templates
+from .script_transforms import find_scripts
+from .version_resolver import parse_version
+
+SCHEMA_VERSION = 1
+INVENTORY_FILE_NAME = ".script_inventory.sqlite"
+DEFAULT_INVENTORY_WORKERS = 8
+
+SHOT_PATTERN = re.compile(r'(ep\d+)_?(sq\d+)_?(sh\d+)', re.IGNORECASE)
+FILE_CLASS_PATTERN = re.compile(r'^(Read|Write|Camera|DeepRead|DeepWrite)')
+FILE_KNOBS = ("file", "proxy")
+
+# Lookups go through the primary keys (WITHOUT ROWID tables are the index),
+# the script indexes only serve re-indexing a single script.
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE scripts (
+    path TEXT PRIMARY KEY, shot TEXT, kind TEXT, version INTEGER,
+    mtime REAL, size INTEGER, nodes INTEGER, error TEXT
+);
+CREATE INDEX scripts_shot ON scripts (shot);
+CREATE TABLE files (
+    file TEXT, script TEXT, node TEXT, class TEXT, knob TEXT,
+    PRIMARY KEY (file, script, node, knob)
+) WITHOUT ROWID;
+CREATE INDEX files_script ON files (script);
+CREATE TABLE file_parts (
+    part TEXT, script TEXT, file TEXT,
+    PRIMARY KEY (part, script, file)
+) WITHOUT ROWID;
+CREATE INDEX file_parts_script ON file_parts (script);
+CREATE TABLE classes (
+    class TEXT, script TEXT, count INTEGER, gizmo INTEGER,
+    PRIMARY KEY (class, script)
+) WITHOUT ROWID;
+CREATE INDEX classes_script ON classes (script);
+"""
+
+
+def default_inventory_path(config):
+    inventory_path = config.get("shot_manager", {}).get("inventory_path")
+    if inventory_path:
+        return inventory_path
+    comp_path = config.get("server_comp_path")
+    return f"{comp_path}/{INVENTORY_FILE_NAME}" if comp_path else None
+
+
+def gizmo_names(gizmo_dirs):
+    """Class names of the .gizmo files in gizmo_dirs, a node of such a class is a gizmo instance."""
+    names = set()
+    for gizmo_dir in gizmo_dirs:
+        try:
+            with os.scandir(gizmo_dir) as it:
+                names.update(entry.name[:-6] for entry in it if entry.name.endswith(".gizmo"))
+        except OSError:
+            continue
+    return names
+
+
+def _path_parts(path):
+    """Folder and file names of a path, the keys "which scripts read beauty_v012" is answered by."""
+    return {part for part in path.replace("\\", "/").split("/") if part and not part.endswith(":")}
+
+
+def scan_script(path):
+    """
+    Reads one script. Returns its inventory row data:
+    {"path", "mtime", "size", "nodes", "files": [(file, node, class, knob)], "classes": {class: count}, "error"}.
+    """
+    data = {"path": path, "mtime": None, "size": None, "nodes": 0, "files": [], "classes": {}, "error": None}
+    try:
+        stat = os.stat(path)
+        data["mtime"], data["size"] = stat.st_mtime, stat.st_size
+        classes = Counter()
+        for node in iter_nodes(path):
+            classes[node.cls] += 1
+            if FILE_CLASS_PATTERN.match(node.cls or ""):
+                for knob in FILE_KNOBS:
+                    value = node.value(knob)
+                    if value:
+                        data["files"].append((value, node.full_name, node.cls, knob))
+        data["nodes"] = sum(classes.values())
+        data["classes"] = dict(classes)
+    except Exception as e:
+        # One broken script must not fail the whole build, it is recorded with its error
+        data["error"] = f"{type(e).__name__}: {e}"
+    return data
+
+
+class ScriptInventory(object):
+    """Read-only view of an inventory file. Missing or unreadable files behave as an empty inventory."""
+
+    def __init__(self, path):
+        self.path = path
+        self.meta = {}
+        self._conn = None
+
+        if not path or not os.path.exists(path):
+            return
+        try:
+            # immutable: the indexer never writes in place, it swaps in a new file
+            uri = f"file:{pathname2url(os.path.abspath(path))}?mode=ro&immutable=1"
+            self._conn = sqlite3.connect(uri, uri=True)
+            self.meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+            if int(self.meta.get("schema_version", 0)) != SCHEMA_VERSION:
+                self.meta = {}
+                self.close()
+        except sqlite3.Error as e:
+            print(f"Error opening script inventory {path}: {e}")
+            self.close()
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def indexed_at(self):
+        return float(self.meta.get("indexed_at", 0))
+
+    def _rows(self, query, args=()):
+        if self._conn is None:
+            return []
+        return self._conn.execute(query, args).fetchall()
+
+    def scripts(self):
+        """{path: (mtime, size)} of every indexed script."""
+        return {path: (mtime, size) for path, mtime, size in self._rows("SELECT path, mtime, size FROM scripts")}
+
+    def reading(self, name):
+        """
+        [(shot, script, node, file)] of the Read/Write/Camera file paths that contain
+        name as a folder or file name (beauty_v012), or are exactly name.
+        """
+        return self._rows(
+            "SELECT s.shot, f.script, f.node, f.file FROM file_parts p "
+            "JOIN files f ON f.file = p.file AND f.script = p.script "
+            "JOIN scripts s ON s.path = f.script WHERE p.part = ? "
+            "UNION SELECT s.shot, f.script, f.node, f.file FROM files f "
+            "JOIN scripts s ON s.path = f.script WHERE f.file = ? ORDER BY 1, 2, 3", (name, name))
+
+    def using(self, cls):
+        """[(shot, script, count)] of the scripts with nodes of class cls (a node class or gizmo)."""
+        return self._rows(
+            "SELECT s.shot, c.script, c.count FROM classes c JOIN scripts s ON s.path = c.script "
+            "WHERE c.class = ? ORDER BY 1, 2", (cls,))
+
+    def gizmo_usage(self):
+        """[(gizmo, scripts, shots, instances)] over the whole project, most used first."""
+        return self._rows(
+            "SELECT c.class, COUNT(*), COUNT(DISTINCT s.shot), SUM(c.count) FROM classes c "
+            "JOIN scripts s ON s.path = c.script WHERE c.gizmo = 1 GROUP BY c.class ORDER BY 4 DESC")
+
+    def files(self, script):
+        """[(node, class, knob, file)] recorded for one script."""
+        return self._rows("SELECT node, class, knob, file FROM files WHERE script = ? ORDER BY node", (script,))
+
+    def shot_scripts(self, shot):
+        """[(path, kind, version, nodes, error)] of the indexed scripts of a shot."""
+        return self._rows("SELECT path, kind, version, nodes, error FROM scripts WHERE shot = ? "
+                          "ORDER BY kind, version", (shot,))
+
+
+class ScriptIndexer(object):
+    """
+    Brings the inventory file up to date. Scripts whose mtime and size match the
+    previous inventory are kept as they are, only new and changed scripts are parsed.
+    """
+
+    def __init__(self, comp_path, inventory_path, gizmo_dirs=(), max_workers=DEFAULT_INVENTORY_WORKERS,
+                 project=None, templates=None):
+        self.comp_path = comp_path
+        self.inventory_path = inventory_path
+        self.gizmos = frozenset(gizmo_names(gizmo_dirs))
+        self.max_workers = max_workers
+        self.project = project
+        self.templates = templates
+
+    def build(self, full_scan=False):
+        started = time.time()
+        paths = list(find_scripts(self.comp_path, templates=self.templates))
+        with ScriptInventory(self.inventory_path) as previous:
+            reuse = not full_scan and previous.meta.get("comp_root") == self.comp_path \
+                and previous.meta.get("gizmos") == ",".join(sorted(self.gizmos))
+            known = previous.scripts() if reuse else {}
+
+        changed = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if known.get(path) != (stat.st_mtime, stat.st_size):
+                changed.append(path)
+        removed = set(known) - set(paths)
+
+        results = []
+        if changed:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                results = list(pool.map(scan_script, changed, chunksize=4))
+
+        self._write(results, removed, reuse)
+        failed = sum(1 for data in results if data["error"])
+        print(f"Indexed {len(changed)} of {len(paths)} scripts ({len(removed)} removed, {failed} failed) "
+              f"in {time.time() - started:.1f}s -> {self.inventory_path}")
+        return len(changed)
+
+    def _write(self, results, removed, reuse):
+        inventory_dir = os.path.dirname(self.inventory_path)
+        if inventory_dir and not os.path.exists(inventory_dir):
+            os.makedirs(inventory_dir)
+
+        # Update a copy and swap it in, readers always see a complete file
+        tmp_path = f"{self.inventory_path}.{os.getpid()}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        if reuse:
+            shutil.copyfile(self.inventory_path, tmp_path)
+
+        conn = sqlite3.connect(tmp_path)
+        try:
+            if not reuse:
+                conn.executescript(SCHEMA)
+            stale = [(path,) for path in removed] + [(data["path"],) for data in results]
+            for table, column in (("scripts", "path"), ("files", "script"), ("file_parts", "script"),
+                                  ("classes", "script")):
+                conn.executemany(f"DELETE FROM {table} WHERE {column} = ?", stale)
+
+            for data in results:
+                path = data["path"]
+                match = SHOT_PATTERN.search(os.path.basename(path))
+                shot = "_".join(part.lower() for part in match.groups()) if match else None
+                kind = "precomp" if "/light_precomp/" in path.replace("\\", "/") else "nk"
+                conn.execute("INSERT INTO scripts VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                             (path, shot, kind, parse_version(os.path.basename(path)), data["mtime"],
+                              data["size"], data["nodes"], data["error"]))
+                conn.executemany("INSERT OR IGNORE INTO files VALUES (?, ?, ?, ?, ?)",
+                                 [(file, path, node, cls, knob) for file, node, cls, knob in data["files"]])
+                conn.executemany("INSERT OR IGNORE INTO file_parts VALUES (?, ?, ?)",
+                                 [(part, path, file) for file, _, _, _ in data["files"] for part in _path_parts(file)])
+                conn.executemany("INSERT INTO classes VALUES (?, ?, ?, ?)",
+                                 [(cls, path, count, cls in self.gizmos) for cls, count in data["classes"].items()])
+
+            conn.execute("DELETE FROM meta")
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+                ("schema_version", str(SCHEMA_VERSION)),
+                ("comp_root", self.comp_path),
+                ("project", self.project or ""),
+                ("gizmos", ",".join(sorted(self.gizmos))),
+                ("indexed_at", repr(time.time())),
+            ])
+            conn.commit()
+        finally:
+            conn.close()
+
+        # Readers only hold the file open for a single query, retry if one is in the way
+        for attempt in range(10):
+            try:
+                os.replace(tmp_path, self.inventory_path)
+                return
+            except PermissionError:
+                time.sleep(0.5)
+        os.remove(tmp_path)
+        raise RuntimeError(f"Could not replace script inventory {self.inventory_path}, it is locked")
+
+
+def main(argv=None):
+    from ..config import get_project_config
+
+    parser = argparse.ArgumentParser(description="Build or query the project script inventory")
+    parser.add_argument("--project", default="cinderella")
+    parser.add_argument("--inventory", help="Inventory file path (default: shot_manager.inventory_path from config)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_INVENTORY_WORKERS)
+    parser.add_argument("--gizmo-dir", action="append", default=[], help="Extra gizmo folder, can be repeated")
+    parser.add_argument("--full", action="store_true", help="Parse every script again")
+    parser.add_argument("--reads", help="Only query: scripts whose file paths contain this folder or file name")
+    parser.add_argument("--uses", help="Only query: scripts with nodes of this class or gizmo")
+    parser.add_argument("--gizmos", action="store_true", help="Only query: gizmo usage over the project")
+    args = parser.parse_args(argv)
+
+    config = get_project_config(args.project)
+    inventory_path = args.inventory or default_inventory_path(config)
+
+    if args.reads or args.uses or args.gizmos:
+        started = time.perf_counter()
+        with ScriptInventory(inventory_path) as inventory:
+            if args.reads:
+                rows = inventory.reading(args.reads)
+            elif args.uses:
+                rows = inventory.using(args.uses)
+            else:
+                rows = inventory.gizmo_usage()
+        for row in rows:
+            print("  ".join(str(value) for value in row))
+        print(f"{len(rows)} result(s) in {(time.perf_counter() - started) * 1000:.1f}ms")
+        return 0
+
+    nuke_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    indexer = ScriptIndexer(config.get("server_comp_path"),
+                            inventory_path,
+                            gizmo_dirs=[os.path.join(nuke_root, "gizmos")] + args.gizmo_dir,
+                            max_workers=args.workers,
+                            project=args.project,
+                            templates=get_path_templates(args.project))
+    indexer.build(full_scan=args.full)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,311 @@
+# SPDX-License-Identifier: Apache-2.0
+# script_transforms.py - Headless bulk transforms over every shot script
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+#
+# Applies declarative transforms to all comp and light precomp scripts of a
+# project without opening them in Nuke:
+#     python -m scripts.core.script_transforms --project cinderella \
+#         --remap //192.168.99.25/=//192.168.99.203/ --write-paths --dry-run
+#     python -m scripts.core.script_transforms --project cinderella --transforms server_move.json
+#
+# A transforms file holds a list of transforms, applied in order:
+#     [
+#         {"type": "remap_prefix", "from": ["//192.168.99.25/"], "to": "//192.168.99.203/"},
+#         {"type": "write_paths"},
+#         {"type": "replace_group", "name": "ShotInfo1", "source": "O:/tools/nuke/toolsets/ShotInfo.nk"},
+#         {"type": "inject_group", "after": "Dot85", "source": "O:/tools/nuke/toolsets/Grain.nk"}
+#     ]
+
+import os
+import re
+import sys
+import json
+import time
+import difflib
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .nk_parser import parse_nk, parse_nk_string, NkNode
+from .shot_scanner import list_subdirs, comp_dirs
+from .path_templates import PathTemplates, default_templates, get_path_templates, write_file_path
+from .version_resolver import latest_of
+
+DEFAULT_TRANSFORM_WORKERS = 8
+DEFAULT_REMAP_KNOBS = ("file", "proxy")
+
+
+# Transforms take (script, spec, context) and return (script, notes). They edit
+# the script in place; the ones that restructure it return a freshly parsed one.
+
+def remap_prefix(script, spec, context):
+    """File knobs starting with one of spec["from"] get that prefix replaced by spec["to"]."""
+    old_prefixes = spec["from"] if isinstance(spec["from"], list) else [spec["from"]]
+    new_prefix = spec["to"]
+    knobs = spec.get("knobs", DEFAULT_REMAP_KNOBS)
+    classes = spec.get("classes")
+
+    notes = []
+    nodes = ([script.root] if script.root is not None else []) + script.nodes
+    for node in nodes:
+        if classes and node.cls not in classes:
+            continue
+        for knob in knobs:
+            value = node.value(knob)
+            if not value:
+                continue
+            for old in old_prefixes:
+                if value.startswith(old):
+                    node.set_knob(knob, new_prefix + value[len(old):])
+                    notes.append(f"{node.full_name}.{knob}: {old} -> {new_prefix}")
+                    break
+    return script, notes
+
+
+def write_paths(script, spec, context):
+    """Regenerates the file knob of every EXR and MOV Write from the script name."""
+    comp_path = spec.get("comp_path") or context["comp_path"]
+    script_name = os.path.basename(context["path"])
+    templates = PathTemplates(spec["templates"]) if spec.get("templates") else default_templates
+
+    notes = []
+    for node in script.nodes_by_class("Write"):
+        file_format = node.value("file_type") or os.path.splitext(node.value("file", ""))[1][1:].lower()
+        expected = write_file_path(comp_path, script_name, file_format, templates)
+        if expected and node.value("file") != expected:
+            node.set_knob("file", expected)
+            notes.append(f"{node.full_name}.file -> {expected}")
+    return script, notes
+
+
+_snippets = {}
+
+
+def _load_snippet(path):
+    """Node text of a toolset/group file, its Root and version lines dropped. Cached per process."""
+    if path not in _snippets:
+        snippet = parse_nk(path)
+        top = [node for node in snippet.nodes if node.parent is None]
+        if len(top) != 1:
+            raise ValueError(f"{path} must contain exactly one top level node, found {len(top)}")
+        start, end = snippet.block_range(top[0])
+        text = "".join(s.to_nk() if isinstance(s, NkNode) else s for s in snippet.statements[start:end])
+        _snippets[path] = (top[0].cls, top[0].name, top[0].input_count, text)
+    return _snippets[path]
+
+
+def _find_top_level(script, spec):
+    for node in script.nodes:
+        if node.parent is None and node.name == spec.get("name", node.name) and \
+                node.cls == spec.get("class", node.cls):
+            yield node
+
+
+def replace_group(script, spec, context):
+    """
+    Replaces top level nodes matching spec["name"] and/or spec["class"] (with their
+    group contents) by the node in spec["source"]. Name, position and inputs of the
+    replaced node are kept, nodes taking a different number of inputs are skipped.
+    """
+    cls, _, input_count, text = _load_snippet(spec["source"])
+    targets = list(_find_top_level(script, spec))
+    if not targets:
+        return script, []
+
+    notes = []
+    for target in reversed(targets):
+        if target.input_count != input_count:
+            notes.append(f"skipped {target.name}: {target.input_count} inputs, {cls} takes {input_count}")
+            continue
+        replacement = parse_nk_string(text)
+        node = replacement.nodes[0]
+        for knob in ("name", "xpos", "ypos"):
+            value = target.knob(knob)
+            if value is None:
+                node.remove_knob(knob)
+            else:
+                node.set_knob(knob, value, quote=False)
+        start, end = script.block_range(target)
+        script.statements[start:end] = replacement.statements
+        notes.append(f"replaced {target.name} ({target.cls}) with {cls}")
+
+    return parse_nk_string(script.to_string()), notes
+
+
+def inject_group(script, spec, context):
+    """
+    Inserts the node in spec["source"] right below the top level node spec["after"],
+    everything that was connected to it takes the new node instead. The node takes
+    one input. Nothing happens if the script already has a node of that name.
+    """
+    cls, name, input_count, text = _load_snippet(spec["source"])
+    if input_count != 1:
+        raise ValueError(f"{spec['source']}: injected nodes take one input, {name} takes {input_count}")
+    if any(node.parent is None and node.name == name for node in script.nodes):
+        return script, []
+    anchor = next(_find_top_level(script, {"name": spec["after"]}), None)
+    if anchor is None:
+        return script, []
+
+    injected = parse_nk_string(text)
+    node = injected.nodes[0]
+    for knob, offset in (("xpos", 0), ("ypos", 60)):
+        try:
+            node.set_knob(knob, int(anchor.knob(knob)) + offset, quote=False)
+        except (TypeError, ValueError):
+            pass
+    _, end = script.block_range(anchor)
+    script.statements[end:end] = injected.statements
+    return parse_nk_string(script.to_string()), [f"injected {name} ({cls}) below {anchor.name}"]
+
+
+TRANSFORMS = {
+    "remap_prefix": remap_prefix,
+    "write_paths": write_paths,
+    "replace_group": replace_group,
+    "inject_group": inject_group,
+}
+
+
+def transform_script(path, transforms, comp_path, dry_run=False):
+    """
+    Applies transforms to the script at path and writes it back atomically unless
+    dry_run. Returns {"path", "changed", "diff", "notes", "error"}, the diff holds
+    one unified diff per transform that changed something.
+    """
+    result = {"path": path, "changed": False, "diff": "", "notes": [], "error": None}
+    try:
+        script = parse_nk(path)
+        original = current = script.to_string()
+        context = {"path": path, "comp_path": comp_path}
+        diffs = []
+        for spec in transforms:
+            script, notes = TRANSFORMS[spec["type"]](script, spec, context)
+            text = script.to_string()
+            if text != current:
+                diffs.append(f"# {spec['type']}\n")
+                diffs.extend(difflib.unified_diff(current.splitlines(True), text.splitlines(True),
+                                                  f"a/{path}", f"b/{path}"))
+                current = text
+            result["notes"].extend(f"{spec['type']}: {note}" for note in notes)
+
+        result["changed"] = current != original
+        result["diff"] = "".join(line if line.endswith("\n") else line + "\n" for line in diffs)
+        if result["changed"] and not dry_run:
+            script.write(path)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def find_scripts(comp_path, latest_only=False, shot_filter=None, templates=None):
+    """Yields the comp (nk) and light precomp scripts of every shot under comp_path."""
+    for ep in list_subdirs(comp_path, 'ep'):
+        for sq in list_subdirs(f"{comp_path}/{ep}", 'sq'):
+            for sh in list_subdirs(f"{comp_path}/{ep}/{sq}", 'sh'):
+                if shot_filter and not re.search(shot_filter, f"{ep}_{sq}_{sh}"):
+                    continue
+                dirs = comp_dirs(comp_path, ep, sq, sh, templates)
+                for script_dir in (dirs["nk"], dirs["precomp"]):
+                    try:
+                        with os.scandir(script_dir) as it:
+                            names = sorted(entry.name for entry in it
+                                           if entry.is_file() and entry.name.endswith(".nk"))
+                    except OSError:
+                        continue
+                    if latest_only and names:
+                        names = [latest_of(names)[0]]
+                    for name in names:
+                        yield f"{script_dir}/{name}"
+
+
+def run_transforms(comp_path, transforms, max_workers=DEFAULT_TRANSFORM_WORKERS, dry_run=False,
+                   latest_only=False, shot_filter=None, report_path=None, templates=None):
+    """
+    Transforms every script under comp_path, found through templates, in a process pool.
+    Returns (changed, failed) counts.
+    """
+    for spec in transforms:
+        if spec.get("type") not in TRANSFORMS:
+            raise ValueError(f"Unknown transform: {spec.get('type')}")
+
+    started = time.time()
+    scripts = list(find_scripts(comp_path, latest_only, shot_filter, templates))
+    print(f"{len(scripts)} script(s) to check{' (dry run)' if dry_run else ''}")
+
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(transform_script, path, transforms, comp_path, dry_run) for path in scripts]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if result["error"]:
+                print(f"  FAILED {result['path']}: {result['error']}")
+            elif result["changed"]:
+                print(f"  {'would change' if dry_run else 'changed'} {result['path']} ({len(result['notes'])} edit(s))")
+
+    results.sort(key=lambda r: r["path"])
+    changed = sum(1 for r in results if r["changed"])
+    failed = sum(1 for r in results if r["error"])
+
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8', errors='surrogateescape') as f:
+            f.write(f"# {datetime.now():%Y-%m-%d %H:%M:%S} {comp_path}{' (dry run)' if dry_run else ''}\n")
+            f.write(f"# transforms: {json.dumps(transforms)}\n")
+            for result in results:
+                if result["error"]:
+                    f.write(f"# FAILED {result['path']}: {result['error']}\n")
+                for note in result["notes"]:
+                    f.write(f"# {result['path']}: {note}\n")
+                f.write(result["diff"])
+        print(f"Diff report saved to {report_path}")
+
+    print(f"{'Would change' if dry_run else 'Changed'} {changed} of {len(scripts)} script(s), "
+          f"{failed} failed, in {time.time() - started:.1f}s")
+    return changed, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply transforms to every shot script without Nuke")
+    parser.add_argument("--project", default="cinderella")
+    parser.add_argument("--comp", help="Comp root (default: server_comp_path from config)")
+    parser.add_argument("--transforms", help="JSON file with a list of transforms")
+    parser.add_argument("--remap", action="append", default=[], metavar="OLD=NEW",
+                        help="Replace a file path prefix, can be repeated")
+    parser.add_argument("--write-paths", action="store_true", help="Regenerate Write paths from the script names")
+    parser.add_argument("--shots", help="Only shots matching this regex, e.g. ep01_sq010")
+    parser.add_argument("--latest", action="store_true", help="Only the latest script version of each shot")
+    parser.add_argument("--workers", type=int, default=DEFAULT_TRANSFORM_WORKERS)
+    parser.add_argument("--dry-run", action="store_true", help="Only report the diffs")
+    parser.add_argument("--report", help="Diff report path (default: script_transforms_<time>.diff)")
+    args = parser.parse_args(argv)
+
+    transforms = []
+    if args.transforms:
+        with open(args.transforms, 'r') as f:
+            transforms.extend(json.load(f))
+    for remap in args.remap:
+        old, _, new = remap.partition("=")
+        transforms.append({"type": "remap_prefix", "from": [old], "to": new})
+    if args.write_paths:
+        transforms.append({"type": "write_paths"})
+    if not transforms:
+        parser.error("nothing to do, give --transforms, --remap or --write-paths")
+
+    from ..config import get_project_config
+    config = get_project_config(args.project)
+    comp_path = args.comp or config.get("server_comp_path")
+    # Workers run in other processes, the project's template overrides travel with the transform
+    for spec in transforms:
+        if spec["type"] == "write_paths" and config.get("path_templates"):
+            spec.setdefault("templates", config["path_templates"])
+
+    report_path = args.report or f"script_transforms_{datetime.now():%Y%m%d_%H%M%S}.diff"
+    _, failed = run_transforms(comp_path, transforms, args.workers, dry_run=args.dry_run, latest_only=args.latest,
+                               shot_filter=args.shots, report_path=report_path,
+                               templates=get_path_templates(args.project))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
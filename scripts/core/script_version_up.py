@@ -0,0 +1,94 @@
+# SPDX-License-Identifier: Apache-2.0
+# script_version_up.py - File level version-up of Nuke scripts
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+
+import os
+import re
+import shutil
+
+PRECOMP_MOV_PATTERN = re.compile(r'(_precomp_v)(\d+)(\.mov)', re.IGNORECASE)
+BLOCK_START_PATTERN = re.compile(r'^\s*(\w+) \{\s*$')
+BLOCK_END_PATTERN = re.compile(r'^\s*\}\s*$')
+KNOB_PATTERN = re.compile(r'^(\s*)(name|file)(\s+)(.*?)(\s*)$', re.DOTALL)
+
+
+def _quoted(value, like):
+    """Nuke quotes knob values with spaces, keep the style of the value being replaced."""
+    if like.startswith('"') or ' ' in value:
+        return f'"{value}"'
+    return value
+
+
+def _bump_mov_version(text, new_version):
+    return PRECOMP_MOV_PATTERN.sub(
+        lambda m: f"{m.group(1)}{new_version:0{max(2, len(m.group(2)))}d}{m.group(3)}", text)
+
+
+def version_up_precomp(src_path, dst_path, new_version):
+    """
+    Copies the precomp script src_path to dst_path without loading it in Nuke and
+    rewrites only the versioned tokens: the script name stored in the Root node
+    and the _precomp_vNN.mov path of the MOV Write node. Everything else is
+    copied byte for byte. Returns the number of rewritten lines.
+
+    The copy is written next to dst_path and hard linked into place, so an
+    existing dst_path is never overwritten, not even one created meanwhile by
+    another artist (FileExistsError).
+    """
+    if os.path.exists(dst_path):
+        raise FileExistsError(f"Script already exists: {dst_path}")
+
+    rewritten = 0
+    block = None  # class of the top level node being copied
+    depth = 0
+    tmp_path = f"{dst_path}.{os.getpid()}.tmp"
+
+    # surrogateescape keeps any non UTF-8 bytes intact, newline='' keeps line endings
+    with open(src_path, 'r', encoding='utf-8', errors='surrogateescape', newline='') as src, \
+            open(tmp_path, 'w', encoding='utf-8', errors='surrogateescape', newline='') as dst:
+        try:
+            for line in src:
+                new_line = line
+                start = BLOCK_START_PATTERN.match(line)
+                if start:
+                    if depth == 0:
+                        block = start.group(1)
+                    depth += 1
+                elif BLOCK_END_PATTERN.match(line) and depth:
+                    depth -= 1
+                    if depth == 0:
+                        block = None
+                elif line.startswith("#write_info") and "_precomp_v" in line:
+                    new_line = _bump_mov_version(line, new_version)
+                elif depth == 1 and block in ("Root", "Write"):
+                    knob = KNOB_PATTERN.match(line)
+                    if knob and block == "Root" and knob.group(2) == "name":
+                        value = _quoted(dst_path.replace('\\', '/'), knob.group(4))
+                        new_line = f"{knob.group(1)}name{knob.group(3)}{value}{knob.group(5)}"
+                    elif knob and block == "Write" and knob.group(2) == "file":
+                        new_line = _bump_mov_version(line, new_version)
+
+                if new_line != line:
+                    rewritten += 1
+                dst.write(new_line)
+        except BaseException:
+            dst.close()
+            os.remove(tmp_path)
+            raise
+
+    try:
+        os.link(tmp_path, dst_path)
+    except FileExistsError:
+        raise FileExistsError(f"Script already exists: {dst_path}")
+    except OSError:
+        # No hard links on this share, claim the name exclusively and copy into it
+        with open(tmp_path, 'rb') as src, open(dst_path, 'xb') as dst:
+            try:
+                shutil.copyfileobj(src, dst)
+            except BaseException:
+                dst.close()
+                os.remove(dst_path)
+                raise
+    finally:
+        os.remove(tmp_path)
+    return rewritten
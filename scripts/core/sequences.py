@@ -0,0 +1,186 @@
+# SPDX-License-Identifier: Apache-2.0
+# sequences.py - Frame sequence detection without Nuke
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+#
+# Drop-in for nuke.getFileNameList: one os.scandir pass per directory, frames
+# grouped by head, padding and extension:
+#     file_name_list(layer_dir)  ->  ["beauty.%04d.exr 1001-1100", "notes.txt"]
+
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .version_resolver import get_version_resolver
+
+# The frame number is the last run of digits right before the extension
+FRAME_PATTERN = re.compile(r'^(.*?)(\d+)(\.[A-Za-z][\w]*)$')
+
+# Containers and scripts are never frames, ep01_sq010_sh010_v002.mov and _v003.mov are two files
+SINGLE_FILE_EXTENSIONS = frozenset((".mov", ".mp4", ".avi", ".mxf", ".mkv", ".nk", ".abc", ".fbx", ".obj",
+                                    ".usd", ".usda", ".usdc", ".gizmo", ".json", ".txt", ".xml"))
+
+DEFAULT_DISCOVERY_WORKERS = 16  # layer folders are listed in parallel, the work is SMB round trips
+
+
+class FileSequence(object):
+    """
+    A frame sequence (head + padded frame + tail) or a single file (padding None,
+    no frames). str() gives the nuke.getFileNameList form, "head.%04d.exr 1001-1100".
+    """
+    __slots__ = ("head", "padding", "tail", "frames")
+
+    def __init__(self, head, padding=None, tail="", frames=()):
+        self.head = head
+        self.padding = padding
+        self.tail = tail
+        self.frames = frames
+
+    def __repr__(self):
+        return f"<FileSequence {self}>"
+
+    def __str__(self):
+        if self.padding is None:
+            return self.head
+        return f"{self.pattern} {self.first}-{self.last}"
+
+    @property
+    def is_sequence(self):
+        return self.padding is not None
+
+    @property
+    def pattern(self):
+        """File name with the frame as a printf token, head.%04d.exr."""
+        if self.padding is None:
+            return self.head
+        token = f"%0{self.padding}d" if self.padding > 1 else "%d"
+        return f"{self.head}{token}{self.tail}"
+
+    @property
+    def first(self):
+        return self.frames[0] if self.frames else None
+
+    @property
+    def last(self):
+        return self.frames[-1] if self.frames else None
+
+    @property
+    def extension(self):
+        name = f"{self.head}0{self.tail}" if self.padding is not None else self.head
+        return os.path.splitext(name)[1].lower()
+
+    def name(self, frame):
+        """File name of one frame."""
+        return f"{self.head}{frame:0{self.padding}d}{self.tail}"
+
+    def ranges(self):
+        """Contiguous frame ranges, [(1001, 1050), (1052, 1100)] for a sequence missing 1051."""
+        ranges = []
+        for frame in self.frames:
+            if ranges and frame == ranges[-1][1] + 1:
+                ranges[-1][1] = frame
+            else:
+                ranges.append([frame, frame])
+        return [tuple(r) for r in ranges]
+
+    def missing(self):
+        """Frames between first and last that are not on disk."""
+        present = set(self.frames)
+        return [frame for frame in range(self.first, self.last + 1) if frame not in present] if self.frames else []
+
+    def describe(self):
+        """Pattern with every range, head.%04d.exr 1001-1050 1052-1100."""
+        if self.padding is None:
+            return self.head
+        ranges = " ".join(f"{a}-{b}" if a != b else str(a) for a, b in self.ranges())
+        return f"{self.pattern} {ranges}"
+
+
+def collapse(names):
+    """Groups file names into FileSequences sorted by name. Names that aren't frames stay single files."""
+    groups = {}
+    singles = []
+    for name in names:
+        match = FRAME_PATTERN.match(name)
+        if not match or match.group(3).lower() in SINGLE_FILE_EXTENSIONS:
+            singles.append(FileSequence(name))
+            continue
+        head, digits, tail = match.groups()
+        groups.setdefault((head, len(digits), tail), []).append(int(digits))
+
+    result = singles
+    for (head, padding, tail), frames in groups.items():
+        if len(frames) == 1:
+            # A lone numbered file is a file, not a one frame sequence
+            result.append(FileSequence(f"{head}{frames[0]:0{padding}d}{tail}"))
+        else:
+            result.append(FileSequence(head, padding, tail, sorted(frames)))
+    result.sort(key=lambda sequence: sequence.pattern)
+    return result
+
+
+_cache = {}  # directory -> (mtime, [FileSequence])
+_cache_lock = threading.Lock()
+
+
+def list_sequences(directory, extensions=None):
+    """
+    FileSequences of the files in directory (hidden files and folders left out),
+    optionally only those with one of extensions (".exr", ...). The listing is
+    memoised per directory mtime: an unchanged directory costs a single stat.
+    """
+    try:
+        mtime = os.stat(directory).st_mtime
+    except OSError:
+        return []
+
+    with _cache_lock:
+        cached = _cache.get(directory)
+    if cached is not None and cached[0] == mtime:
+        sequences = cached[1]
+    else:
+        try:
+            with os.scandir(directory) as it:
+                names = [entry.name for entry in it if not entry.name.startswith(".") and entry.is_file()]
+        except OSError:
+            return []
+        sequences = collapse(names)
+        with _cache_lock:
+            _cache[directory] = (mtime, sequences)
+
+    if extensions:
+        extensions = tuple(extension.lower() for extension in extensions)
+        return [sequence for sequence in sequences if sequence.extension in extensions]
+    return list(sequences)
+
+
+def file_name_list(directory, extensions=None):
+    """Same strings as nuke.getFileNameList(directory): "head.%04d.exr 1001-1100" and plain file names."""
+    return [str(sequence) for sequence in list_sequences(directory, extensions)]
+
+
+def clear_sequence_cache(directory=None):
+    with _cache_lock:
+        if directory is None:
+            _cache.clear()
+        else:
+            _cache.pop(directory, None)
+
+
+def latest_layer_sequences(shot_render_path, extensions=(".exr",), max_workers=DEFAULT_DISCOVERY_WORKERS):
+    """
+    [(layer, version folder, FileSequence)] of the last sequence in the latest version
+    folder of every render layer, sorted by layer. Layers without a matching sequence
+    are left out. The layer folders are listed in parallel.
+    """
+    latest_layers = get_version_resolver().latest_layers(shot_render_path)
+    layers = [(layer, dir_name) for layer, (_, dir_name) in sorted(latest_layers.items())]
+
+    def discover(layer):
+        sequences = list_sequences(f"{shot_render_path}/{layer[1]}", extensions)
+        return layer + (sequences[-1],) if sequences else None
+
+    if not layers:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(layers)))) as pool:
+        return [found for found in pool.map(discover, layers) if found is not None]
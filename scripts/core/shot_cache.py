@@ -0,0 +1,70 @@
+# SPDX-License-Identifier: Apache-2.0
+# shot_cache.py - Per-user shot list cache for the Shot Manager
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+
+import os
+import json
+import time
+
+CACHE_SCHEMA_VERSION = 2
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".nuke", "shot_manager_cache.json")
+
+
+def load_shot_cache(path, render_root, project):
+    """
+    Returns the cached {"shots", "tree", "records", "saved_at"} or None.
+
+    A cache written by another schema version, for another render root or another
+    project is ignored. Age is not checked here: an old list is still shown while
+    the panel revalidates it in the background.
+    """
+    if not path or not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, 'r') as f:
+            cache_data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error loading cache: {e}")
+        return None
+
+    if not isinstance(cache_data, dict) or cache_data.get("schema_version") != CACHE_SCHEMA_VERSION:
+        return None
+    if cache_data.get("render_root") != render_root or cache_data.get("project") != project:
+        return None
+
+    return {
+        "shots": cache_data.get("shots", []),
+        "tree": cache_data.get("tree", {}),
+        "records": cache_data.get("records", {}),
+        "saved_at": float(cache_data.get("saved_at", 0)),
+    }
+
+
+def save_shot_cache(path, shots, tree, records, render_root, project):
+    """
+    Writes the cache atomically: the data goes to a temp file next to the target
+    which is then swapped in, so a concurrent Nuke session never reads half a file.
+    """
+    cache_dir = os.path.dirname(path)
+    if cache_dir and not os.path.exists(cache_dir):
+        os.makedirs(cache_dir, exist_ok=True)
+
+    cache_data = {
+        "schema_version": CACHE_SCHEMA_VERSION,
+        "project": project,
+        "render_root": render_root,
+        "saved_at": time.time(),
+        "shots": shots,
+        "tree": tree or {},
+        "records": records or {},
+    }
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(cache_data, f)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
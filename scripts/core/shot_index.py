@@ -0,0 +1,144 @@
+# SPDX-License-Identifier: Apache-2.0
+# shot_index.py - Sorted shot list with episode/sequence ranges for the Shot Manager
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+
+import re
+import bisect
+
+SHOT_NAME_PATTERN = re.compile(r'ep(\d+)_sq(\d+)_sh(\d+)')
+
+
+class ShotIndex(object):
+    """
+    Sorted shot names kept next to their parsed parts in parallel arrays.
+
+    Every name is parsed once when it is added. Shots of one episode (and of one
+    sequence) sit next to each other in the sorted list, so the dropdown contents
+    are slices of the arrays described by precomputed (start, end) ranges. Lookups
+    by name are a bisect and prev/next navigation is plain index arithmetic.
+
+    Episode, sequence and shot values are the digit strings shown in the dropdowns
+    ("01", "010", "010"), names that don't match ep##_sq##_sh## are ignored.
+    """
+
+    __slots__ = ("names", "eps", "sqs", "shs", "_episodes", "_sequences", "_ep_ranges", "_sq_ranges")
+
+    def __init__(self, shots=()):
+        self.names = []
+        self.eps = []
+        self.sqs = []
+        self.shs = []
+        for name in sorted(set(shots)):
+            match = SHOT_NAME_PATTERN.match(name)
+            if match:
+                self.names.append(name)
+                self.eps.append(match.group(1))
+                self.sqs.append(match.group(2))
+                self.shs.append(match.group(3))
+        self._build_ranges()
+
+    def _build_ranges(self):
+        self._episodes = []
+        self._sequences = {}
+        self._ep_ranges = {}
+        self._sq_ranges = {}
+
+        for i, (ep, sq) in enumerate(zip(self.eps, self.sqs)):
+            if ep not in self._ep_ranges:
+                self._episodes.append(ep)
+                self._sequences[ep] = []
+                self._ep_ranges[ep] = [i, i + 1]
+            else:
+                self._ep_ranges[ep][1] = i + 1
+
+            key = (ep, sq)
+            if key not in self._sq_ranges:
+                self._sequences[ep].append(sq)
+                self._sq_ranges[key] = [i, i + 1]
+            else:
+                self._sq_ranges[key][1] = i + 1
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return self.index_of(name) >= 0
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __getitem__(self, index):
+        return self.names[index]
+
+    def index_of(self, name):
+        """Position of name in the sorted list, or -1."""
+        position = bisect.bisect_left(self.names, name)
+        if position < len(self.names) and self.names[position] == name:
+            return position
+        return -1
+
+    def parts(self, index):
+        return self.eps[index], self.sqs[index], self.shs[index]
+
+    def previous_index(self, index):
+        return index - 1 if index > 0 else None
+
+    def next_index(self, index):
+        return index + 1 if 0 <= index < len(self.names) - 1 else None
+
+    def episodes(self):
+        return list(self._episodes)
+
+    def sequences(self, ep):
+        return list(self._sequences.get(ep, ()))
+
+    def shots(self, ep, sq):
+        start, end = self._sq_ranges.get((ep, sq), (0, 0))
+        return self.shs[start:end]
+
+    def episode_range(self, ep):
+        """(start, end) slice of the episode's shots, or None."""
+        span = self._ep_ranges.get(ep)
+        return tuple(span) if span else None
+
+    def sequence_range(self, ep, sq):
+        span = self._sq_ranges.get((ep, sq))
+        return tuple(span) if span else None
+
+    def add(self, name):
+        """
+        Inserts a shot. Returns (index, new_episode, new_sequence), or None if the
+        name is already indexed or isn't a shot name.
+        """
+        match = SHOT_NAME_PATTERN.match(name)
+        if not match:
+            return None
+        position = bisect.bisect_left(self.names, name)
+        if position < len(self.names) and self.names[position] == name:
+            return None
+
+        ep, sq, sh = match.groups()
+        new_episode = ep not in self._ep_ranges
+        new_sequence = (ep, sq) not in self._sq_ranges
+
+        self.names.insert(position, name)
+        self.eps.insert(position, ep)
+        self.sqs.insert(position, sq)
+        self.shs.insert(position, sh)
+        self._build_ranges()
+        return position, new_episode, new_sequence
+
+    def remove(self, name):
+        """
+        Drops a shot. Returns (ep, sq, sh, episode_emptied, sequence_emptied),
+        or None if the name isn't indexed.
+        """
+        position = self.index_of(name)
+        if position < 0:
+            return None
+
+        ep, sq, sh = self.parts(position)
+        for array in (self.names, self.eps, self.sqs, self.shs):
+            del array[position]
+        self._build_ranges()
+        return ep, sq, sh, ep not in self._ep_ranges, (ep, sq) not in self._sq_ranges
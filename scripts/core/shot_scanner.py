@@ -0,0 +1,387 @@
+# SPDX-License-Identifier: Apache-2.0
+# shot_scanner.py - Headless render tree scanner used by the Shot Manager
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from .version_resolver import (latest_of,
+                               split_layer_version,
+                               VERSION_PATTERN as SCRIPT_VERSION_PATTERN,
+                               MOV_VERSION_PATTERN,
+                               THUMB_PATTERN)
+from .channel_manifest import directory_layers
+from .path_templates import default_templates
+
+DEFAULT_SCAN_WORKERS = 8
+
+# First/last frame thumbnails made for Cerebro, only previewed when a version has nothing else
+SECONDARY_THUMB_PATTERN = re.compile(r'_thumb_(first|last)\.(jpg|jpeg|png)$', re.IGNORECASE)
+
+
+def fast_check_renders(render_root):
+    """
+    Checks for EXRs using an iterator.
+    Returns True immediately on the first EXR found.
+    """
+    try:
+        with os.scandir(render_root) as layers:
+            for layer in layers:
+                if not layer.is_dir(): continue
+
+                with os.scandir(layer.path) as files:
+                    for f in files:
+                        if f.name.lower().endswith('.exr'):
+                            return True
+    except OSError:
+        pass
+    return False
+
+
+def list_subdirs(path, prefix):
+    """Returns names of subdirectories starting with prefix, or [] if path can't be listed."""
+    try:
+        with os.scandir(path) as it:
+            return [entry.name for entry in it if entry.name.startswith(prefix) and entry.is_dir()]
+    except OSError:
+        return []
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def scan_render_layers(render_root):
+    """
+    Lists the render folder once and returns ({layer: [version, dir_name]}, has_exr)
+    with the highest numeric version of every layer. Latest versions are checked
+    for EXRs first since they are the most likely to have frames.
+    """
+    layers = {}
+    layer_dirs = []
+    try:
+        with os.scandir(render_root) as it:
+            for entry in it:
+                if not entry.is_dir(): continue
+                layer_dirs.append(entry.name)
+                layer, version = split_layer_version(entry.name)
+                if layer not in layers or version > layers[layer][0]:
+                    layers[layer] = [version, entry.name]
+    except OSError:
+        return {}, False
+
+    latest = [dir_name for _, dir_name in layers.values()]
+    for dir_name in latest + [d for d in layer_dirs if d not in latest]:
+        try:
+            with os.scandir(os.path.join(render_root, dir_name)) as files:
+                if any(f.name.lower().endswith('.exr') for f in files):
+                    return layers, True
+        except OSError:
+            continue
+    return layers, False
+
+
+def latest_version_file(directory, extension, pattern=SCRIPT_VERSION_PATTERN, versioned_only=False):
+    """Returns [file_name, version] of the highest version file with extension, or None."""
+    try:
+        with os.scandir(directory) as it:
+            latest = latest_of([entry.name for entry in it], extension, pattern, versioned_only)
+    except OSError:
+        return None
+    return list(latest) if latest else None
+
+
+def thumbnail_versions(thumb_dir):
+    """Returns {"v01": file_name} for thumbnails in a .thumb folder, preferring the middle frame."""
+    thumbs = {}
+    try:
+        with os.scandir(thumb_dir) as it:
+            for entry in it:
+                match = THUMB_PATTERN.match(entry.name)
+                if not match:
+                    continue
+                version_key = f"v{match.group(2).zfill(2)}"
+                if version_key not in thumbs or SECONDARY_THUMB_PATTERN.search(thumbs[version_key]):
+                    thumbs[version_key] = entry.name
+    except OSError:
+        pass
+    return thumbs
+
+
+def thumb_version_number(version_key):
+    """Sort key for the "v01" keys of thumbnail_versions, v100 comes after v99."""
+    return int(version_key[1:])
+
+
+def comp_dirs(comp_path, ep, sq, sh, templates=None):
+    """Comp side folders of a shot, ep/sq/sh are full folder names (ep01, sq010, sh010)."""
+    templates = templates or default_templates
+    context = {"comp_root": comp_path, "ep": ep, "sq": sq, "sh": sh}
+    return {
+        "nk": templates.format("comp_nk_dir", **context),
+        "precomp": templates.format("precomp_nk_dir", **context),
+        "mov": templates.format("comp_mov_dir", **context),
+        "thumb": templates.format("thumb_dir", **context),
+    }
+
+
+def find_camera(camera_roots, ep, sq, sh, templates=None):
+    templates = templates or default_templates
+    for root in camera_roots:
+        if not root: continue
+        camera_path = templates.format("camera", cache_root=root, ep=ep, sq=sq, sh=sh)
+        if os.path.exists(camera_path):
+            return camera_path
+    return None
+
+
+class ShotScanner(object):
+    """
+    Walks render_path/ep/sq/sh/render/layer and collects names of shots with EXRs.
+
+    With max_workers > 1 sequence and shot level listings are spread over a thread
+    pool, so network round trips overlap. on_shot is called for every shot as soon
+    as it is found, always from the thread running scan(). The result of scan() is
+    always the same sorted list regardless of the mode.
+
+    Every visited ep/sq/render directory is recorded in self.tree with its mtime.
+    Passing a previous tree makes the scan incremental: a directory whose mtime
+    did not change is not listed again and its cached result is reused.
+
+    When comp_path is given, the same pass builds a compact record for every shot
+    in self.records (see collect_record), so the panel needs no listings of its own.
+    With read_aovs the record also lists the AOVs of every layer, read from one EXR header.
+    Comp folders and cameras are located with templates (PathTemplates, the defaults if None).
+    """
+
+    def __init__(self, render_path, max_workers=1, on_shot=None, previous_tree=None,
+                 comp_path=None, camera_roots=(), previous_records=None, read_aovs=False, templates=None):
+        self.render_path = render_path
+        self.max_workers = max(1, int(max_workers or 1))
+        self.on_shot = on_shot
+        self.previous_tree = previous_tree or {}
+        self.comp_path = comp_path
+        self.camera_roots = [root for root in camera_roots if root]
+        self.previous_records = previous_records or {}
+        self.read_aovs = read_aovs
+        self.templates = templates
+        self.tree = {}
+        self.records = {}
+        self.reused_dirs = 0
+        self._reused_lock = threading.Lock()
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    @property
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def scan(self):
+        self.tree = {}
+        self.records = {}
+        self.reused_dirs = 0
+        if not os.path.exists(self.render_path):
+            return []
+
+        if self.max_workers > 1:
+            available_shots = self._scan_parallel()
+        else:
+            available_shots = self._scan_serial()
+
+        available_shots.sort()
+        return available_shots
+
+    def _path(self, rel):
+        return os.path.join(self.render_path, rel) if rel else self.render_path
+
+    def _count_reused(self):
+        # Called from pool threads in parallel mode
+        with self._reused_lock:
+            self.reused_dirs += 1
+
+    def list_level(self, rel, prefix):
+        """
+        Lists subdirectories of rel named prefix and digits (ep01), reusing the cached
+        listing if mtime is unchanged.
+        """
+        path = self._path(rel)
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return []
+
+        cached = self.previous_tree.get(rel)
+        if cached and cached.get("mtime") == mtime and "dirs" in cached:
+            names = cached["dirs"]
+            self._count_reused()
+        else:
+            names = list_subdirs(path, prefix)
+
+        self.tree[rel] = {"mtime": mtime, "dirs": names}
+        # ep_tmp, sq010_old and the like aren't shots
+        return [name for name in names if name[len(prefix):].isdigit()]
+
+    def check_shot(self, rel):
+        """True if the shot has a render folder with at least one EXR in it."""
+        render_rel = f"{rel}/render"
+        render_root = self._path(render_rel)
+        try:
+            mtime = os.stat(render_root).st_mtime
+        except OSError:
+            return False
+
+        # A shot without EXRs is always rechecked: frames land in existing layer
+        # folders without touching the render folder mtime.
+        cached = self.previous_tree.get(render_rel)
+        unchanged = bool(cached and cached.get("mtime") == mtime and cached.get("has_exr"))
+        shot_name = rel.replace("/", "_")
+        previous = self.previous_records.get(shot_name)
+
+        if self.comp_path is None:
+            has_exr = unchanged or fast_check_renders(render_root)
+        elif unchanged and previous is not None:
+            layers, has_exr = previous["layers"], True
+        else:
+            layers, has_exr = scan_render_layers(render_root)
+            unchanged = False
+
+        if unchanged:
+            self._count_reused()
+
+        self.tree[render_rel] = {"mtime": mtime, "has_exr": has_exr}
+        if has_exr and self.comp_path is not None:
+            self.records[shot_name] = self.collect_record(rel, layers, mtime, previous)
+        return has_exr
+
+    def collect_record(self, rel, layers, render_mtime, previous=None):
+        """
+        Builds the per-shot record:
+            layers  - {layer: [latest version, dir name]}
+            nk      - [file name, version] of the latest comp script, or None
+            precomp - same for the light precomp script
+            mov     - [file name, version] of the latest versioned mov, or None
+            thumbs  - {"v01": file name} in the mov/.thumb folder
+            camera  - path of shot_camera.abc, or None
+            aovs    - {layer: [dir name, {aov: [channel]}]} with read_aovs
+            mtimes  - folder mtimes the values above were read at
+        Folders whose mtime matches the previous record are not listed again.
+        """
+        ep, sq, sh = rel.split("/")
+        dirs = comp_dirs(self.comp_path, ep, sq, sh, self.templates)
+        previous = previous or {}
+        previous_mtimes = previous.get("mtimes", {})
+        record = {"layers": layers, "mtimes": {"render": render_mtime}}
+
+        readers = {
+            "nk": lambda path: latest_version_file(path, '.nk'),
+            "precomp": lambda path: latest_version_file(path, '.nk'),
+            "mov": lambda path: latest_version_file(path, '.mov', MOV_VERSION_PATTERN, versioned_only=True),
+            "thumb": thumbnail_versions,
+        }
+        for key, reader in readers.items():
+            value_key = "thumbs" if key == "thumb" else key
+            mtime = _mtime(dirs[key])
+            if mtime is None:
+                value = {} if key == "thumb" else None
+            elif mtime == previous_mtimes.get(key) and value_key in previous:
+                value = previous[value_key]
+            else:
+                value = reader(dirs[key])
+            record[value_key] = value
+            record["mtimes"][key] = mtime
+
+        # Cameras are published once, only look again while the shot has none
+        record["camera"] = previous.get("camera") or find_camera(self.camera_roots, ep, sq, sh, self.templates)
+
+        if self.read_aovs:
+            # Every frame of a version has the same channels, a layer is only read again for a new version
+            previous_aovs = previous.get("aovs", {})
+            aovs = {}
+            for layer, (_, dir_name) in layers.items():
+                cached = previous_aovs.get(layer)
+                if cached and cached[0] == dir_name:
+                    aovs[layer] = cached
+                    continue
+                channels = directory_layers(f"{self._path(rel)}/render/{dir_name}")
+                if channels is not None:
+                    aovs[layer] = [dir_name, channels]
+            record["aovs"] = aovs
+        elif "aovs" in previous:
+            # Read by an indexer pass, still valid for the layer versions that didn't change
+            record["aovs"] = {layer: cached for layer, cached in previous["aovs"].items()
+                              if layer in layers and layers[layer][1] == cached[0]}
+        return record
+
+    def _shot_found(self, shot_name, found):
+        found.append(shot_name)
+        if self.on_shot:
+            self.on_shot(shot_name)
+
+    def _scan_serial(self):
+        available_shots = []
+
+        try:
+            # Level 1: Episodes
+            for ep in self.list_level("", 'ep'):
+                if self.is_cancelled: break
+
+                # Level 2: Sequences
+                for sq in self.list_level(ep, 'sq'):
+
+                    # Level 3: Shots
+                    for sh in self.list_level(f"{ep}/{sq}", 'sh'):
+
+                        # Level 4: Render folder
+                        if self.check_shot(f"{ep}/{sq}/{sh}"):
+                            self._shot_found(f"{ep}_{sq}_{sh}", available_shots)
+
+        except Exception as e:
+            print(f"Scan error: {e}")
+
+        return available_shots
+
+    def _scan_parallel(self):
+        available_shots = []
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            # Future -> (level, ep, sq, sh). Children are submitted from this thread
+            # as their parent listing completes, so no pool thread ever blocks on another.
+            pending = {}
+            for ep in self.list_level("", 'ep'):
+                pending[pool.submit(self.list_level, ep, 'sq')] = ('ep', ep, None, None)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    level, ep, sq, sh = pending.pop(future)
+                    if self.is_cancelled:
+                        continue
+
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"Scan error: {e}")
+                        continue
+
+                    if level == 'ep':
+                        for sq_name in result:
+                            pending[pool.submit(self.list_level, f"{ep}/{sq_name}", 'sh')] = ('sq', ep, sq_name, None)
+                    elif level == 'sq':
+                        for sh_name in result:
+                            pending[pool.submit(self.check_shot, f"{ep}/{sq}/{sh_name}")] = ('sh', ep, sq, sh_name)
+                    elif result:
+                        self._shot_found(f"{ep}_{sq}_{sh}", available_shots)
+
+                if self.is_cancelled:
+                    for future in pending:
+                        future.cancel()
+                    pending.clear()
+
+        return available_shots
@@ -0,0 +1,200 @@
+# SPDX-License-Identifier: Apache-2.0
+# thumbnail_atlas.py - Per-sequence thumbnail atlas for sequence overviews
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+#
+# Every sequence gets one packed image of its shots' latest thumbnails plus a
+# JSON table with the cell of each shot, so an overview is a single file read:
+#     python -m scripts.core.thumbnail_atlas --project cinderella
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from .shot_scanner import list_subdirs, thumbnail_versions, thumb_version_number, comp_dirs
+from .path_templates import default_templates, get_path_templates
+
+ATLAS_SCHEMA_VERSION = 1
+ATLAS_IMAGE_NAME = ".thumb_atlas.png"  # lossless, incremental updates paste onto it again and again
+ATLAS_TABLE_NAME = ".thumb_atlas.json"
+ATLAS_COLUMNS = 8
+CELL_WIDTH = 256
+CELL_HEIGHT = 108  # matches the 1024x429 review thumbnails
+DEFAULT_ATLAS_WORKERS = 4
+
+
+def atlas_paths(comp_path, ep, sq, templates=None):
+    """(image path, table path) of a sequence atlas, ep/sq are folder names (ep01, sq010)."""
+    sequence_path = (templates or default_templates).format("sequence_dir", comp_root=comp_path, ep=ep, sq=sq)
+    return f"{sequence_path}/{ATLAS_IMAGE_NAME}", f"{sequence_path}/{ATLAS_TABLE_NAME}"
+
+
+def load_atlas_table(table_path):
+    """Returns the offset table or None if it is missing or from another schema."""
+    try:
+        with open(table_path, 'r') as f:
+            table = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(table, dict) or table.get("schema_version") != ATLAS_SCHEMA_VERSION:
+        return None
+    return table
+
+
+def sequence_thumbnails(comp_path, ep, sq, templates=None):
+    """Returns [(shot name, latest thumbnail path or None, its mtime)] sorted by shot."""
+    templates = templates or default_templates
+    result = []
+    sequence_path = templates.format("sequence_dir", comp_root=comp_path, ep=ep, sq=sq)
+    for sh in sorted(list_subdirs(sequence_path, 'sh')):
+        thumb_dir = comp_dirs(comp_path, ep, sq, sh, templates)["thumb"]
+        thumbs = thumbnail_versions(thumb_dir)
+        thumb_path, mtime = None, None
+        if thumbs:
+            thumb_path = f"{thumb_dir}/{thumbs[max(thumbs, key=thumb_version_number)]}"
+            try:
+                mtime = os.stat(thumb_path).st_mtime
+            except OSError:
+                thumb_path = None
+        result.append((templates.format("shot", ep=ep, sq=sq, sh=sh), thumb_path, mtime))
+    return result
+
+
+def _layout(shots):
+    columns = max(1, min(ATLAS_COLUMNS, len(shots)))
+    rows = (len(shots) + columns - 1) // columns
+    cells = {name: [(i % columns) * CELL_WIDTH, (i // columns) * CELL_HEIGHT, CELL_WIDTH, CELL_HEIGHT]
+             for i, name in enumerate(shots)}
+    return columns, [columns * CELL_WIDTH, max(1, rows) * CELL_HEIGHT], cells
+
+
+def _draw(base_args, cells, output_path, ffmpeg):
+    """Pastes [(thumbnail path, rect)] onto the base image in one ffmpeg call."""
+    inputs, filters, last = list(base_args), [], "0:v"
+    for number, (thumb_path, (x, y, w, h)) in enumerate(cells, start=1):
+        inputs += ['-i', thumb_path]
+        filters.append(f"[{number}:v]scale={w}:{h}:force_original_aspect_ratio=decrease,"
+                       f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2[c{number}]")
+        filters.append(f"[{last}][c{number}]overlay={x}:{y}[o{number}]")
+        last = f"o{number}"
+
+    cmd = [ffmpeg, '-hide_banner', '-loglevel', 'error'] + inputs
+    if filters:
+        cmd += ['-filter_complex', ";".join(filters), '-map', f"[{last}]"]
+    cmd += ['-frames:v', '1', '-y', output_path]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed for {output_path}: {result.stderr.strip()}")
+
+
+def build_sequence_atlas(comp_path, ep, sq, force=False, ffmpeg="ffmpeg", templates=None):
+    """
+    Brings the atlas of one sequence up to date. Returns the number of cells drawn,
+    0 if nothing changed.
+
+    While the shot list stays the same only cells whose thumbnail changed are
+    pasted onto the existing atlas, a PNG, so the other cells never lose quality. A new or removed shot, or a shot that lost
+    its thumbnail, changes the layout and the atlas is drawn from scratch.
+    """
+    image_path, table_path = atlas_paths(comp_path, ep, sq, templates)
+    shots = sequence_thumbnails(comp_path, ep, sq, templates)
+    if not shots:
+        return 0
+
+    columns, size, rects = _layout([name for name, _, _ in shots])
+    previous = None if force else load_atlas_table(table_path)
+    if previous is not None and not os.path.exists(image_path):
+        previous = None
+
+    entries = {name: {"rect": rects[name], "thumb": os.path.basename(path) if path else None, "mtime": mtime}
+               for name, path, mtime in shots}
+    sources = {name: path for name, path, _ in shots}
+
+    incremental = previous is not None and previous.get("size") == size and \
+        {name: entry["rect"] for name, entry in previous.get("shots", {}).items()} == rects and \
+        all(sources[name] or not entry.get("thumb") for name, entry in previous["shots"].items())
+    if incremental:
+        changed = [name for name, entry in entries.items() if sources[name] and entry != previous["shots"][name]]
+        if not changed:
+            return 0
+        base_args = ['-i', image_path]
+    else:
+        changed = [name for name in entries if sources[name]]
+        base_args = ['-f', 'lavfi', '-i', f"color=c=black:s={size[0]}x{size[1]}"]
+
+    # Written next to the target and swapped in, readers never see a partial atlas
+    tmp_image = f"{image_path}.{os.getpid()}.tmp.png"
+    try:
+        _draw(base_args, [(sources[name], rects[name]) for name in changed], tmp_image, ffmpeg)
+        os.replace(tmp_image, image_path)
+    finally:
+        if os.path.exists(tmp_image):
+            os.remove(tmp_image)
+
+    table = {
+        "schema_version": ATLAS_SCHEMA_VERSION,
+        "image": ATLAS_IMAGE_NAME,
+        "cell": [CELL_WIDTH, CELL_HEIGHT],
+        "columns": columns,
+        "size": size,
+        "updated_at": time.time(),
+        "shots": entries,
+    }
+    tmp_table = f"{table_path}.{os.getpid()}.tmp"
+    with open(tmp_table, 'w') as f:
+        json.dump(table, f)
+    os.replace(tmp_table, table_path)
+    return len(changed)
+
+
+def update_shot_atlas(comp_path, shot_name, ffmpeg="ffmpeg", templates=None):
+    """Updates the atlas of the sequence shot_name belongs to, e.g. after a publish."""
+    context = (templates or default_templates).shot_context(shot_name)
+    if not context:
+        return 0
+    return build_sequence_atlas(comp_path, context["ep"], context["sq"], ffmpeg=ffmpeg, templates=templates)
+
+
+def build_atlases(comp_path, max_workers=DEFAULT_ATLAS_WORKERS, force=False, templates=None):
+    """Updates the atlas of every sequence under comp_path. Returns the number of atlases that changed."""
+    started = time.time()
+    sequences = [(ep, sq) for ep in list_subdirs(comp_path, 'ep') for sq in list_subdirs(f"{comp_path}/{ep}", 'sq')]
+
+    def run(sequence):
+        try:
+            return build_sequence_atlas(comp_path, *sequence, force=force, templates=templates)
+        except (OSError, RuntimeError) as e:
+            print(f"Atlas error in {'/'.join(sequence)}: {e}")
+            return 0
+
+    # Each sequence is one ffmpeg process, threads only wait on them
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        drawn = list(pool.map(run, sequences))
+
+    updated = sum(1 for count in drawn if count)
+    print(f"Updated {updated} of {len(sequences)} sequence atlases ({sum(drawn)} cells) "
+          f"in {time.time() - started:.1f}s")
+    return updated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build per-sequence thumbnail atlases")
+    parser.add_argument("--project", default="cinderella")
+    parser.add_argument("--comp", help="Comp root (default: server_comp_path from config)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_ATLAS_WORKERS)
+    parser.add_argument("--force", action="store_true", help="Redraw every atlas from scratch")
+    args = parser.parse_args(argv)
+
+    comp_path = args.comp
+    if not comp_path:
+        from ..config import get_project_config
+        comp_path = get_project_config(args.project).get("server_comp_path")
+    build_atlases(comp_path, args.workers, force=args.force, templates=get_path_templates(args.project))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+# SPDX-License-Identifier: Apache-2.0
+# thumbnails.py - Review movie thumbnails and their headless backfill
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+#
+# Publishing creates thumbnails for the published movie only. The backfill
+# catches up on every other movie in the comp tree:
+#     python -m scripts.core.thumbnails --project cinderella --workers 4
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .shot_scanner import list_subdirs, comp_dirs, MOV_VERSION_PATTERN
+from .thumbnail_atlas import build_atlases
+from .path_templates import default_templates, get_path_templates
+
+DEFAULT_BACKFILL_WORKERS = 4
+THUMB_DIR_NAME = ".thumb"  # next to movies outside the comp_mov_dir template, e.g. light precomp movies
+THUMB_SCALE = "scale=1024:429:force_original_aspect_ratio=decrease"
+
+# Cerebro takes up to three thumbnails per attachment. The middle frame keeps
+# the historic {movie}_thumb.jpg name, it is the one the Shot Manager previews.
+THUMB_SUFFIXES = (("first", "_thumb_first.jpg"), ("middle", "_thumb.jpg"), ("last", "_thumb_last.jpg"))
+
+
+def probe_ffmpeg(ffmpeg="ffmpeg", ffprobe="ffprobe"):
+    """True if both tools run. Call once per batch, not once per movie."""
+    try:
+        for tool in (ffmpeg, ffprobe):
+            if subprocess.run([tool, '-version'], capture_output=True).returncode != 0:
+                return False
+    except OSError:
+        return False
+    return True
+
+
+def thumbnail_paths(movie_path, templates=None):
+    """{"first"|"middle"|"last": path} of the thumbnails belonging to movie_path, in its thumb_dir."""
+    templates = templates or default_templates
+    name = os.path.splitext(os.path.basename(movie_path))[0]
+    movie_dir = os.path.dirname(movie_path)
+    context = templates.parse("comp_mov_dir", movie_dir)
+    thumb_dir = templates.format("thumb_dir", **context) if context else f"{movie_dir}/{THUMB_DIR_NAME}"
+    return {role: f"{thumb_dir}/{name}{suffix}" for role, suffix in THUMB_SUFFIXES}
+
+
+def thumbnails_up_to_date(movie_path, templates=None):
+    try:
+        movie_mtime = os.stat(movie_path).st_mtime
+        return all(os.stat(path).st_mtime >= movie_mtime
+                   for path in thumbnail_paths(movie_path, templates).values())
+    except OSError:
+        return False
+
+
+def frame_count(movie_path, ffprobe="ffprobe"):
+    """Frame count from the container header, counting packets (no decode) if the header has none."""
+    for extra in ([], ['-count_packets']):
+        entry = 'stream=nb_read_packets' if extra else 'stream=nb_frames'
+        result = subprocess.run([ffprobe, '-v', 'error', '-select_streams', 'v:0'] + extra +
+                                ['-show_entries', entry, '-of', 'default=noprint_wrappers=1:nokey=1', movie_path],
+                                capture_output=True, text=True)
+        try:
+            return int(result.stdout.strip().splitlines()[0])
+        except (ValueError, IndexError):
+            continue
+    return None
+
+
+def make_movie_thumbnails(movie_path, ffmpeg="ffmpeg", ffprobe="ffprobe", force=False, templates=None):
+    """
+    Writes the first, middle and last frame of movie_path to its .thumb folder in
+    a single ffmpeg decode pass. Returns the thumbnail paths in Cerebro order
+    (first, middle, last), or [] on failure. Up to date thumbnails are kept.
+    """
+    paths = thumbnail_paths(movie_path, templates)
+    ordered = [paths[role] for role, _ in THUMB_SUFFIXES]
+    if not force and thumbnails_up_to_date(movie_path, templates):
+        return ordered
+
+    frames = frame_count(movie_path, ffprobe)
+    if not frames:
+        print(f"Could not read frame count of {movie_path}")
+        return []
+
+    thumb_dir = os.path.dirname(ordered[0])
+    os.makedirs(thumb_dir, exist_ok=True)
+
+    indices = {"first": 0, "middle": frames // 2, "last": frames - 1}
+    selected = sorted(set(indices.values()))
+    select = "+".join(f"eq(n\\,{index})" for index in selected)
+    tmp_pattern = f"{thumb_dir}/.{os.path.basename(movie_path)}.{os.getpid()}.%d.jpg"
+
+    # ffmpeg numbers the selected frames from 1 in decode order
+    outputs = {index: tmp_pattern.replace("%d", str(number + 1)) for number, index in enumerate(selected)}
+    cmd = [ffmpeg, '-hide_banner', '-loglevel', 'error', '-i', movie_path,
+           '-vf', f"select='{select}',{THUMB_SCALE}",
+           '-fps_mode', 'passthrough', '-frames:v', str(len(selected)), '-y', tmp_pattern]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"ffmpeg failed for {movie_path}: {result.stderr.strip()}")
+            return []
+        for role, _ in THUMB_SUFFIXES:
+            shutil.copyfile(outputs[indices[role]], paths[role])
+    except OSError as e:
+        print(f"Thumbnails not created for {movie_path}: {e}")
+        ordered = []
+    finally:
+        for output in outputs.values():
+            if os.path.exists(output):
+                os.remove(output)
+    return ordered
+
+
+def find_movies(comp_path, templates=None):
+    """Yields every versioned review movie in the comp_mov_dir of every shot under comp_path."""
+    for ep in list_subdirs(comp_path, 'ep'):
+        for sq in list_subdirs(f"{comp_path}/{ep}", 'sq'):
+            for sh in list_subdirs(f"{comp_path}/{ep}/{sq}", 'sh'):
+                mov_dir = comp_dirs(comp_path, ep, sq, sh, templates)["mov"]
+                try:
+                    with os.scandir(mov_dir) as it:
+                        names = [entry.name for entry in it if MOV_VERSION_PATTERN.search(entry.name)]
+                except OSError:
+                    continue
+                for name in sorted(names):
+                    yield f"{mov_dir}/{name}"
+
+
+def backfill_thumbnails(comp_path, max_workers=DEFAULT_BACKFILL_WORKERS, force=False, dry_run=False, templates=None):
+    """Generates missing or outdated thumbnails for every movie. Returns (created, failed) counts."""
+    started = time.time()
+    if not dry_run and not probe_ffmpeg():
+        raise RuntimeError("ffmpeg/ffprobe not found. Please ensure ffmpeg is installed and in PATH.")
+
+    movies = [movie for movie in find_movies(comp_path, templates)
+              if force or not thumbnails_up_to_date(movie, templates)]
+    print(f"{len(movies)} movie(s) need thumbnails")
+    if dry_run:
+        for movie in movies:
+            print(f"  {movie}")
+        return 0, 0
+
+    created = failed = 0
+    # Each job is one ffmpeg process, the pool only bounds how many run at once
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(make_movie_thumbnails, movie, force=force, templates=templates): movie for movie in movies}
+        for future in as_completed(futures):
+            try:
+                ok = bool(future.result())
+            except Exception as e:
+                print(f"Error creating thumbnails for {futures[future]}: {e}")
+                ok = False
+            created += ok
+            failed += not ok
+
+    print(f"Created thumbnails for {created} movie(s), {failed} failed, in {time.time() - started:.1f}s")
+    return created, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create missing review movie thumbnails")
+    parser.add_argument("--project", default="cinderella")
+    parser.add_argument("--comp", help="Comp root (default: server_comp_path from config)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_BACKFILL_WORKERS, help="Parallel ffmpeg processes")
+    parser.add_argument("--force", action="store_true", help="Recreate thumbnails that are up to date")
+    parser.add_argument("--dry-run", action="store_true", help="Only list movies that need thumbnails")
+    parser.add_argument("--no-atlas", action="store_true", help="Don't update the sequence thumbnail atlases")
+    args = parser.parse_args(argv)
+
+    comp_path = args.comp
+    if not comp_path:
+        from ..config import get_project_config
+        comp_path = get_project_config(args.project).get("server_comp_path")
+    templates = get_path_templates(args.project)
+    _, failed = backfill_thumbnails(comp_path, args.workers, force=args.force, dry_run=args.dry_run,
+                                    templates=templates)
+    if not args.dry_run and not args.no_atlas:
+        # Only cells whose thumbnail changed are redrawn
+        build_atlases(comp_path, args.workers, templates=templates)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
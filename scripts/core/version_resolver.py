@@ -0,0 +1,144 @@
+# SPDX-License-Identifier: Apache-2.0
+# version_resolver.py - Latest version lookups over cached directory listings
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+
+# Scripts, movies and thumbnails carry _v## anywhere in the name, render layer
+# folders end with it.
+VERSION_PATTERN = re.compile(r'_v(\d+)')
+LAYER_VERSION_PATTERN = re.compile(r'(.+)_v(\d+)$')
+MOV_VERSION_PATTERN = re.compile(r'_v(\d+)\.mov$', re.IGNORECASE)
+THUMB_PATTERN = re.compile(r'(.+)_v(\d+).*\.(jpg|jpeg|png)', re.IGNORECASE)
+
+DEFAULT_REVALIDATE_AFTER = 2.0  # seconds a listing is trusted without a stat
+DEFAULT_CACHE_SIZE = 2048  # directories
+
+
+def parse_version(name, pattern=VERSION_PATTERN):
+    """Version number in name, or None if it has none."""
+    match = pattern.search(name)
+    return int(match.group(1)) if match else None
+
+
+def latest_of(names, extension=None, pattern=VERSION_PATTERN, versioned_only=False):
+    """
+    Returns (name, version) of the highest version among names, or None.
+    Versions compare as numbers (v10 > v9); unversioned names count as version 0
+    unless versioned_only. Equal versions are ordered by name.
+    """
+    latest = None
+    for name in names:
+        if extension and not name.lower().endswith(extension):
+            continue
+        version = parse_version(name, pattern)
+        if version is None:
+            if versioned_only:
+                continue
+            version = 0
+        if latest is None or (version, name) > latest:
+            latest = (version, name)
+    return (latest[1], latest[0]) if latest else None
+
+
+def split_layer_version(dir_name):
+    """("beauty", 3) for "beauty_v003", (dir_name, 0) for unversioned folders."""
+    match = LAYER_VERSION_PATTERN.match(dir_name)
+    return (match.group(1), int(match.group(2))) if match else (dir_name, 0)
+
+
+class VersionResolver(object):
+    """
+    Answers "latest version" questions from directory listings cached per session.
+
+    A listing is trusted for revalidate_after seconds without touching the
+    filesystem, after that a single stat decides whether it has to be listed
+    again (new files change the directory mtime). The cache_size most recently used
+    listings are kept. Safe to share between threads.
+    """
+
+    def __init__(self, revalidate_after=DEFAULT_REVALIDATE_AFTER, cache_size=DEFAULT_CACHE_SIZE):
+        self.revalidate_after = revalidate_after
+        self.cache_size = cache_size
+        self._listings = OrderedDict()  # directory -> (mtime, checked_at, [(name, is_dir)]), LRU
+        self._lock = threading.Lock()
+
+    def entries(self, directory):
+        """Returns [(name, is_dir)] of directory, [] if it can't be listed."""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._listings.get(directory)
+            if cached is not None:
+                self._listings.move_to_end(directory)
+        if cached is not None and now - cached[1] < self.revalidate_after:
+            return cached[2]
+
+        try:
+            mtime = os.stat(directory).st_mtime
+        except OSError:
+            self.invalidate(directory)
+            return []
+
+        if cached is not None and cached[0] == mtime:
+            entries = cached[2]
+        else:
+            try:
+                with os.scandir(directory) as it:
+                    entries = [(entry.name, entry.is_dir()) for entry in it]
+            except OSError:
+                return []
+
+        with self._lock:
+            self._listings[directory] = (mtime, now, entries)
+            self._listings.move_to_end(directory)
+            while len(self._listings) > self.cache_size:
+                self._listings.popitem(last=False)
+        return entries
+
+    def names(self, directory, dirs=False):
+        """File names (or folder names with dirs=True) in directory."""
+        return [name for name, is_dir in self.entries(directory) if is_dir == dirs]
+
+    def latest(self, directory, extension=None, pattern=VERSION_PATTERN, versioned_only=False, dirs=False):
+        """(name, version) of the latest file with extension in directory, or None."""
+        return latest_of(self.names(directory, dirs), extension, pattern, versioned_only)
+
+    def versions(self, directory, extension=None, pattern=VERSION_PATTERN, dirs=False):
+        """[(version, name)] of the versioned entries in directory, oldest first."""
+        found = []
+        for name in self.names(directory, dirs):
+            if extension and not name.lower().endswith(extension):
+                continue
+            version = parse_version(name, pattern)
+            if version is not None:
+                found.append((version, name))
+        return sorted(found)
+
+    def latest_layers(self, render_root):
+        """{layer: (version, dir_name)} with the latest version folder of every render layer."""
+        layers = {}
+        for dir_name in self.names(render_root, dirs=True):
+            layer, version = split_layer_version(dir_name)
+            if layer not in layers or (version, dir_name) > layers[layer]:
+                layers[layer] = (version, dir_name)
+        return layers
+
+    def invalidate(self, directory=None):
+        """Forgets one listing, or all of them. Call after writing into a directory."""
+        with self._lock:
+            if directory is None:
+                self._listings.clear()
+            else:
+                self._listings.pop(directory, None)
+
+
+_default_resolver = VersionResolver()
+
+
+def get_version_resolver():
+    """The resolver shared by all tools in this session."""
+    return _default_resolver
@@ -1 +1,4 @@
-from .submitter import main_submit
\ No newline at end of file
+def main_submit():
+    # submitter needs nuke, imported on use so web_service stays importable without it
+    from .submitter import main_submit
+    return main_submit()
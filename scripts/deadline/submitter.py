@@ -1,65 +1,112 @@
 import os
 import subprocess
+import tempfile
 import re
 import nuke
 import DeadlineNukeClient
 
+from .web_service import DeadlineError, get_web_service, submit_batch
+
+
 def get_deadline_command():
     return DeadlineNukeClient.GetDeadlineCommand()
 
-def submit_node(node, priority, dependency_ids=None, batch_name=1):
-    deadline_cmd = get_deadline_command()
+
+def node_job(node, priority, batch_name=True):
+    """
+    (job info, plugin info, aux files) of a render job for a Write node of the saved script. The
+    script goes along as an aux file, the farm renders the script as it was when it was submitted.
+    """
     script_path = nuke.root().name()
     job_name = f"{os.path.basename(script_path)} [{node.name()}]"
     start, end = int(nuke.root().firstFrame()), int(nuke.root().lastFrame())
-   
+
     chunk_size = 20
     if 'EXR' in node.name() and end <= 30:
         chunk_size = 10
     elif 'MOV' in node.name():
         chunk_size = end
 
-    job_info = [
-        f"Name={job_name}",
-        f"BatchName={os.path.basename(script_path) if batch_name else ''}",
-        "Plugin=Nuke",
-        f"Priority={priority}",
-        f"Frames={start}-{end}",
-        f"ChunkSize={chunk_size}",
-        "Pool=nuke", 
-        "Group=nuke"
-    ]
-    
-    if dependency_ids: 
-        job_info.append(f"JobDependencies={dependency_ids}")
-
-    plugin_info = [
-        f"SceneFile={script_path}",
-        "Version=14.0", 
-        "NukeX=True", 
-        "BatchMode=True",
-        f"WriteNode={node.name()}", 
-        "UseNodeRange=True"
-    ]
-
-    # Write files to System Temp
-    temp_dir = os.environ["TEMP"] 
-    job_file = os.path.join(temp_dir, f"nuke_job_{node.name()}.job")
-    plugin_file = os.path.join(temp_dir, f"nuke_plugin_{node.name()}.job")
-
-    with open(job_file, "w") as f: f.write("\n".join(job_info))
-    with open(plugin_file, "w") as f: f.write("\n".join(plugin_info))
-
-    cmd = [deadline_cmd, job_file, plugin_file, script_path]
-    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    stdout, stderr = process.communicate()
-    
+    job_info = {
+        "Name": job_name,
+        "BatchName": os.path.basename(script_path) if batch_name else '',
+        "Plugin": "Nuke",
+        "Priority": priority,
+        "Frames": f"{start}-{end}",
+        "ChunkSize": chunk_size,
+        "Pool": "nuke",
+        "Group": "nuke",
+    }
+
+    plugin_info = {
+        "SceneFile": script_path,
+        "Version": "14.0",
+        "NukeX": "True",
+        "BatchMode": "True",
+        "WriteNode": node.name(),
+        "UseNodeRange": "True",
+    }
+    return job_info, plugin_info, [script_path]
+
+
+def submit_command(job_info, plugin_info, aux_files=()):
+    """Submits one job with deadlinecommand, returns its ID."""
+    files = []
+    try:
+        # Unique names, two submissions at once don't overwrite each other's job files
+        for prefix, info in (("nuke_job_", job_info), ("nuke_plugin_", plugin_info)):
+            fd, path = tempfile.mkstemp(prefix=prefix, suffix=".job")
+            files.append(path)
+            with os.fdopen(fd, "w") as f:
+                f.write("\n".join(f"{key}={value}" for key, value in info.items()))
+
+        cmd = [get_deadline_command(), *files, *aux_files]
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        stdout, stderr = process.communicate()
+    finally:
+        for path in files:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
     if process.returncode != 0:
-        nuke.tprint(f"Error submitting {node.name()}: {stderr.decode()}")
+        raise DeadlineError(stderr.decode(errors="replace").strip() or f"deadlinecommand exited {process.returncode}")
+    match = re.search(r"JobID=([a-z0-9]+)", stdout.decode(errors="replace"))
+    if not match:
+        raise DeadlineError(f"no job ID in deadlinecommand output: {stdout.decode(errors='replace').strip()}")
+    return match.group(1)
+
+
+def submit_jobs(jobs):
+    """
+    Submits [(job_info, plugin_info, aux_files, dependencies)] as one batch through the Deadline Web Service,
+    or with deadlinecommand if the project has no web service or it can't be reached.
+    Returns the job IDs, or None after reporting the error.
+    """
+    try:
+        service = get_web_service()
+    except (ImportError, OSError, KeyError) as e:
+        nuke.tprint(f"Deadline Web Service not configured: {e}")
+        service = None
+
+    try:
+        if service is not None:
+            try:
+                return service.submit_batch(jobs)
+            except DeadlineError as e:
+                if not e.connection_failed:
+                    raise
+                nuke.tprint(f"Deadline Web Service unreachable, submitting with deadlinecommand: {e}")
+        return submit_batch(jobs, submit_command)
+    except DeadlineError as e:
+        names = [job[0]["Name"] for job in jobs]
+        submitted = "".join(f"\n{name}: {job_id}" for name, job_id in zip(names, e.submitted))
+        nuke.tprint(f"Error submitting {names[len(e.submitted)]}: {e}")
+        nuke.message(f"Deadline submission failed\n{names[len(e.submitted)]}: {e}"
+                     + (f"\n\nAlready submitted:{submitted}" if submitted else ""))
         return None
 
-    match = re.search(r"JobID=([a-z0-9]+)", stdout.decode())
-    return match.group(1) if match else None
 
 def main_submit():
     sel = nuke.selectedNodes('Write')
@@ -68,11 +115,11 @@ def main_submit():
 
     if len(sel) == 1 and exr:
         nuke.scriptSave()
-        exr_id = submit_node(exr, 100, batch_name=0)
-        if not exr_id:
+        ids = submit_jobs([(*node_job(exr, 100, batch_name=False), ())])
+        if not ids:
             return
-        nuke.tprint(f"EXR Submitted to Deadline: {exr_id}")
-        nuke.message(f"Job Submitted to Deadline\nEXR: {exr_id}")
+        nuke.tprint(f"EXR Submitted to Deadline: {ids[0]}")
+        nuke.message(f"Job Submitted to Deadline\nEXR: {ids[0]}")
         return
 
     if not exr or not mov:
@@ -91,16 +138,10 @@ def main_submit():
         nuke.message("MOV node is not connected to a Read node.")
         return
 
-    nuke.scriptSave()
-    exr_id = submit_node(exr, 99)
-    
-    if not exr_id:
-        return
-    nuke.tprint(f"EXR Submitted: {exr_id}")
-
+    # The MOV job reads the EXR job's output, point the Read at it before the script is saved for both
     exr_path = exr['file'].value()
     read_node['file'].setValue(exr_path)
-    
+
     start, end = nuke.root().firstFrame(), nuke.root().lastFrame()
     read_node['first'].setValue(start)
     read_node['last'].setValue(end)
@@ -108,11 +149,16 @@ def main_submit():
     read_node['origlast'].setValue(end)
     read_node['colorspace'].setValue("scene_linear")
 
-       
-    nuke.scriptSave() # CRITICAL: Save new path to disk for MOV job
+    nuke.scriptSave()
     nuke.tprint(f"Updated Read node to: {exr_path}")
 
-    mov_id = submit_node(mov, 100, dependency_ids=exr_id)
+    ids = submit_jobs([
+        (*node_job(exr, 99), ()),
+        (*node_job(mov, 100), (0,)),
+    ])
+    if not ids:
+        return
+    exr_id, mov_id = ids
+    nuke.tprint(f"EXR Submitted: {exr_id}")
     nuke.tprint(f"MOV Submitted: {mov_id}")
-    if mov_id:
-        nuke.message(f"Jobs Submitted to Deadline\nEXR: {exr_id}\nMOV: {mov_id}")
+    nuke.message(f"Jobs Submitted to Deadline\nEXR: {exr_id}\nMOV: {mov_id}")
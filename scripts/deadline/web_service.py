@@ -0,0 +1,186 @@
+# SPDX-License-Identifier: Apache-2.0
+# web_service.py - Job submission through the Deadline Web Service REST API
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+#
+# One keep-alive connection per web service, so a batch of jobs is a couple of
+# POSTs on an open socket instead of a deadlinecommand process per job:
+#     service = get_web_service("cinderella")
+#     exr_id, mov_id = service.submit_batch([(exr_job, exr_plugin, [scene], ()), (mov_job, mov_plugin, [scene], (0,))])
+
+import json
+import time
+import select
+import base64
+import threading
+import http.client
+from urllib.parse import urlsplit
+
+DEFAULT_TIMEOUT = 10
+IDLE_SECONDS = 60  # the web service drops idle connections, don't reuse one older than this
+
+
+class DeadlineError(RuntimeError):
+    """
+    A submission that failed. submitted holds the IDs of the jobs of the batch that went
+    through before it, connection_failed is set when the web service couldn't be reached.
+    """
+
+    def __init__(self, message, submitted=(), connection_failed=False):
+        super().__init__(message)
+        self.submitted = list(submitted)
+        self.connection_failed = connection_failed
+
+
+class DeadlineWebService(object):
+    """Client of one Deadline Web Service, http://host:8081. Safe to share between threads."""
+
+    def __init__(self, url, user=None, password=None, timeout=DEFAULT_TIMEOUT):
+        parts = urlsplit(url if "://" in url else f"http://{url}")
+        self.url = url
+        self.https = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.https else 8081)
+        self.base_path = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        if user:
+            token = base64.b64encode(f"{user}:{password or ''}".encode("utf-8")).decode("ascii")
+            self.headers["Authorization"] = f"Basic {token}"
+
+        self._connection = None
+        self._last_used = 0.0
+        self._lock = threading.RLock()
+
+    def __repr__(self):
+        return f"<DeadlineWebService {self.url}>"
+
+    @classmethod
+    def from_config(cls, config):
+        """The web service of a project's deadline block, or None if it has none."""
+        settings = config.get("deadline", {})
+        if not settings.get("web_service"):
+            return None
+        return cls(settings["web_service"], settings.get("user"), settings.get("password"),
+                   settings.get("timeout", DEFAULT_TIMEOUT))
+
+    def _connect(self):
+        connection_class = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        return connection_class(self.host, self.port, timeout=self.timeout)
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _dropped(self):
+        """True if the server closed the kept-alive connection while it was idle."""
+        sock = self._connection.sock
+        if sock is None:
+            return True
+        try:
+            # An idle connection has nothing to read, readable means closed (or garbage)
+            return bool(select.select([sock], [], [], 0)[0])
+        except (OSError, ValueError):
+            return True
+
+    def request(self, method, path, data=None):
+        """
+        Decoded JSON response of one request. Raises DeadlineError, with connection_failed set
+        only when the request never reached the server (it can't be reached, or the connection
+        broke while sending). A timeout or reset while waiting for the response is not retried,
+        the server may have acted on the request.
+        """
+        body = json.dumps(data).encode("utf-8") if data is not None else None
+        with self._lock:
+            if self._connection is not None and (time.monotonic() - self._last_used > IDLE_SECONDS
+                                                 or self._dropped()):
+                self.close()
+            for attempt in (0, 1):
+                if self._connection is None:
+                    self._connection = self._connect()
+                    try:
+                        self._connection.connect()
+                    except OSError as e:
+                        self.close()
+                        raise DeadlineError(f"{self.url}: {e}", connection_failed=True)
+                try:
+                    self._connection.request(method, self.base_path + path, body, self.headers)
+                except (OSError, http.client.HTTPException) as e:
+                    # Not sent completely, the server can't have acted on it
+                    self.close()
+                    if attempt:
+                        raise DeadlineError(f"{self.url}: {e}", connection_failed=True)
+                    continue
+                try:
+                    response = self._connection.getresponse()
+                    payload = response.read()
+                except (OSError, http.client.HTTPException) as e:
+                    self.close()
+                    raise DeadlineError(f"{self.url}: no response to {method} {path} ({e or type(e).__name__}), "
+                                        f"it may have been carried out, check the Deadline Monitor")
+                break
+            self._last_used = time.monotonic()
+            if response.will_close:
+                self.close()
+
+        text = payload.decode("utf-8", "replace")
+        if response.status >= 400:
+            raise DeadlineError(f"{method} {path}: {response.status} {text.strip() or response.reason}")
+        try:
+            return json.loads(text) if text.strip() else None
+        except ValueError:
+            # Older web services answer some calls with plain text
+            return text
+
+    def submit_job(self, job_info, plugin_info, aux_files=()):
+        """Submits one job, returns its ID."""
+        result = self.request("POST", "/api/jobs", {
+            "JobInfo": {key: str(value) for key, value in job_info.items()},
+            "PluginInfo": {key: str(value) for key, value in plugin_info.items()},
+            "AuxFiles": list(aux_files),
+            "IdOnly": True,
+        })
+        job_id = result.get("_id") if isinstance(result, dict) else None
+        if not job_id:
+            raise DeadlineError(f"no job ID in the web service response: {result}")
+        return job_id
+
+    def submit_batch(self, jobs):
+        """
+        Submits [(job_info, plugin_info, aux_files, dependencies)] in order over one connection,
+        dependencies being indices of earlier jobs of the batch. Returns the job IDs. If a job fails,
+        the DeadlineError carries the IDs of the jobs submitted before it.
+        """
+        return submit_batch(jobs, self.submit_job, self._lock)
+
+
+def submit_batch(jobs, submit, lock=None):
+    """
+    Runs submit(job_info, plugin_info, aux_files) for [(job_info, plugin_info, aux_files, dependencies)]
+    in order, with JobDependencies set from the IDs of the earlier jobs they depend on.
+    """
+    ids = []
+    with lock or threading.Lock():
+        for job_info, plugin_info, aux_files, dependencies in jobs:
+            job_info = dict(job_info)
+            if dependencies:
+                job_info["JobDependencies"] = ",".join(ids[index] for index in dependencies)
+            try:
+                ids.append(submit(job_info, plugin_info, aux_files))
+            except DeadlineError as e:
+                raise DeadlineError(str(e), ids, e.connection_failed and not ids)
+    return ids
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_web_service(project="cinderella"):
+    """The web service of a project, built from its config once per process. None if it has none."""
+    with _services_lock:
+        if project not in _services:
+            from ..config import get_project_config
+            _services[project] = DeadlineWebService.from_config(get_project_config(project))
+        return _services[project]
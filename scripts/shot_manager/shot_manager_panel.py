@@ -6,7 +6,7 @@ from PySide2 import QtWidgets, QtCore, QtGui
 import os
 import sys
 import re
-import json
+import bisect
 import nuke
 import nukescripts
 import subprocess
@@ -20,82 +20,90 @@ from ..cerebro import (publish_shot_to_cerebro,
                         pref)
 from pycerebro import database, dbtypes, cargador
 from ..tools import import_tools
+from ..core.shot_scanner import (ShotScanner,
+                                 fast_check_renders,
+                                 thumbnail_versions,
+                                 thumb_version_number,
+                                 DEFAULT_SCAN_WORKERS)
+from ..core.shot_index import ShotIndex
+from ..core.version_resolver import get_version_resolver
+from ..core.script_version_up import version_up_precomp
+from ..core.sequences import file_name_list
+from ..core.project_index import ProjectIndex, default_index_path, DEFAULT_INDEX_MAX_AGE
+from ..core.script_inventory import ScriptInventory, default_inventory_path
+from ..core.render_watcher import RenderWatcher, DEFAULT_WATCH_INTERVAL
+from ..core.shot_cache import load_shot_cache, save_shot_cache, DEFAULT_CACHE_PATH
+from ..core.thumbnail_atlas import atlas_paths, load_atlas_table
+from ..core.path_templates import get_path_templates
+from .thumbnail_cache import ThumbnailCache, DEFAULT_THUMBNAIL_CACHE_MB
+
+PROJECT_NAME = "cinderella"
 
 _widget_instance = None
 
 
 class ShotScannerWorker(QtCore.QObject):
     """Background worker to scan shots without freezing the UI."""
-    finished = QtCore.Signal(list)
+    finished = QtCore.Signal(list, dict, dict)
     progress = QtCore.Signal(str)
+    shot_found = QtCore.Signal(str)
 
-    def __init__(self, render_path):
+    def __init__(self, render_path, max_workers=1, previous_tree=None,
+                 comp_path=None, camera_roots=(), previous_records=None, templates=None):
         super(ShotScannerWorker, self).__init__()
         self.render_path = render_path
-        self._is_cancelled = False
+        self.scanner = ShotScanner(render_path,
+                                   max_workers=max_workers,
+                                   on_shot=self._on_shot_found,
+                                   previous_tree=previous_tree,
+                                   comp_path=comp_path,
+                                   camera_roots=camera_roots,
+                                   previous_records=previous_records,
+                                   templates=templates)
 
     def run(self):
-        available_shots = []
-        
         if not os.path.exists(self.render_path):
-            self.finished.emit([])
+            self.finished.emit([], {}, {})
             return
 
-        try:
-            # Level 1: Episodes
-            with os.scandir(self.render_path) as ep_it:
-                for ep_entry in ep_it:
-                    if self._is_cancelled: break
-                    if not ep_entry.is_dir() or not ep_entry.name.startswith('ep'): continue
-
-                    # Level 2: Sequences
-                    path_ep = ep_entry.path
-                    with os.scandir(path_ep) as sq_it:
-                        for sq_entry in sq_it:
-                            if not sq_entry.is_dir() or not sq_entry.name.startswith('sq'): continue
-
-                            # Level 3: Shots
-                            path_sq = sq_entry.path
-                            with os.scandir(path_sq) as sh_it:
-                                for sh_entry in sh_it:
-                                    if not sh_entry.is_dir() or not sh_entry.name.startswith('sh'): continue
-                                    
-                                    # Level 4: Render folder
-                                    render_root = os.path.join(sh_entry.path, "render")
-                                    if not os.path.exists(render_root): continue
-
-                                    # Check for any .exr efficiently
-                                    if self.fast_check_renders(render_root):
-                                        shot_name = f"{ep_entry.name}_{sq_entry.name}_{sh_entry.name}"
-                                        available_shots.append(shot_name)
-                                        self.progress.emit(f"Found: {shot_name}")
+        available_shots = self.scanner.scan()
+        self.finished.emit(available_shots, self.scanner.tree, self.scanner.records)
 
-        except Exception as e:
-            print(f"Scan error: {e}")
-
-        available_shots.sort()
-        self.finished.emit(available_shots)
+    def _on_shot_found(self, shot_name):
+        # Called from this worker thread, signals are queued to the UI thread.
+        self.shot_found.emit(shot_name)
+        self.progress.emit(f"Found: {shot_name}")
 
     def fast_check_renders(self, render_root):
-        """
-        Checks for EXRs using an iterator. 
-        Returns True immediately on the first EXR found.
-        """
-        try:
-            with os.scandir(render_root) as layers:
-                for layer in layers:
-                    if not layer.is_dir(): continue
-                    
-                    with os.scandir(layer.path) as files:
-                        for f in files:
-                            if f.name.lower().endswith('.exr'):
-                                return True
-        except OSError:
-            pass
-        return False
+        return fast_check_renders(render_root)
 
     def cancel(self):
-        self._is_cancelled = True
+        self.scanner.cancel()
+
+
+class RenderWatcherBridge(QtCore.QObject):
+    """Forwards RenderWatcher callbacks from its thread to the UI thread."""
+    shots_changed = QtCore.Signal(list, list, list, list, dict, dict)
+
+    def __init__(self, render_path, comp_path, camera_roots, interval, max_workers, templates=None):
+        super(RenderWatcherBridge, self).__init__()
+        self.watcher = RenderWatcher(render_path,
+                                     on_change=self._on_change,
+                                     comp_path=comp_path,
+                                     camera_roots=camera_roots,
+                                     interval=interval,
+                                     max_workers=max_workers,
+                                     templates=templates)
+
+    def _on_change(self, added, changed, removed, shots, tree, records):
+        self.shots_changed.emit(added, changed, removed, shots, tree, records)
+
+    def start(self, shots, tree, records):
+        self.watcher.reset(shots, tree, records)
+        self.watcher.start()
+
+    def stop(self):
+        self.watcher.stop()
 
 
 class ShotManagerWidget(QtWidgets.QWidget):
@@ -107,26 +115,43 @@ class ShotManagerWidget(QtWidgets.QWidget):
 
         self.is_initialized = False
 
-        self.config = get_project_config()
+        self.config = get_project_config(PROJECT_NAME)
 
         # Base paths
         self.render_path = self.config.get("server_render_path")
         self.prj_comp_path = self.config.get("server_comp_path")
         self.prj_cache_path_old = self.config.get("cache_path_old")
         self.prj_cache_path_new = self.config.get("cache_path_new")
+        self.templates = get_path_templates(PROJECT_NAME)
         self.comp_template_path = self.config.get("tools", {}).get("comp_template_path")
         self.precomp_template_path = self.config.get("tools", {}).get("precomp_template_path")
+        self.scan_workers = self.config.get("shot_manager", {}).get("scan_workers", DEFAULT_SCAN_WORKERS)
+        self.index_path = default_index_path(self.config)
+        self.index_max_age = self.config.get("shot_manager", {}).get("index_max_age", DEFAULT_INDEX_MAX_AGE)
+        self.inventory_path = default_inventory_path(self.config)
+        self.watch_enabled = self.config.get("shot_manager", {}).get("watch", False)
+        self.watch_interval = self.config.get("shot_manager", {}).get("watch_interval", DEFAULT_WATCH_INTERVAL)
+        self.thumbnail_cache_mb = self.config.get("shot_manager", {}).get("thumbnail_cache_mb",
+                                                                           DEFAULT_THUMBNAIL_CACHE_MB)
 
         # Cache and State
-        self.cache_file = os.path.join(os.path.expanduser("~"), ".nuke", "shot_manager_cache.json")
-        self.all_shots = []
-        self.shot_data = {}
+        self.cache_file = DEFAULT_CACHE_PATH
+        self.shot_index = ShotIndex()
+        self.shots_before_scan = frozenset()  # the list as it was before a scan streamed shots into it
+        self.scan_tree = {}
+        self.shot_records = {}
         self.current_shot_thumbs = {}
         self.current_shot_index = 0
+        self.thumbnail_cache = ThumbnailCache(self.thumbnail_cache_mb, self)
+        self.versions = get_version_resolver()
+        self.preview_token = None
+        self.atlas_table = None
+        self.atlas_table_path = None
         self.shot_context = None
 
         self.thread = None
         self.worker = None
+        self.watcher = None
         self.loading_label = QtWidgets.QLabel("Scanning...")
 
         self.setup_ui()
@@ -184,8 +209,11 @@ class ShotManagerWidget(QtWidgets.QWidget):
         self.image_label = QtWidgets.QLabel("Select a shot to preview")
         self.image_label.setAlignment(QtCore.Qt.AlignCenter)
         self.image_label.setMinimumSize(400, 300)
+        self.image_label.installEventFilter(self)
         # self.image_label.setStyleSheet("background-color: #2a2a2a; border: 1px solid #555;")
-        self.pixmap = QtGui.QPixmap()
+        self.preview_image = QtGui.QImage()
+        self.preview_path = None
+        self.preview_mtime = None
 
         self.scroll_area = QtWidgets.QScrollArea()
         self.scroll_area.setWidget(self.image_label)
@@ -199,6 +227,9 @@ class ShotManagerWidget(QtWidgets.QWidget):
         self.version_dropdown.setMaximumWidth(100)
         version_layout.addWidget(self.version_dropdown)
         version_layout.addStretch()
+        self.overview_checkbox = QtWidgets.QCheckBox("Sequence Overview")
+        self.overview_checkbox.setToolTip("Show the latest thumbnails of every shot in the sequence, click one to open it")
+        version_layout.addWidget(self.overview_checkbox)
 
         image_layout.addWidget(self.shot_info_label)
         image_layout.addWidget(self.scroll_area)
@@ -247,13 +278,24 @@ class ShotManagerWidget(QtWidgets.QWidget):
 
         buttons_layout = QtWidgets.QHBoxLayout()
         self.refresh_btn = QtWidgets.QPushButton("Force Refresh")
-        self.refresh_btn.setToolTip("Force update shot list from server (ignores 24-hour cache)")
+        self.refresh_btn.setToolTip("Force update shot list from server.\n"
+                                    "Only changed folders are rescanned, Shift+Click for a full rescan.")
 
         self.set_as_current_btn = QtWidgets.QPushButton("Set Current")
         self.set_as_current_btn.setToolTip("Set initially opened script as current shot context in Shot Manager")
 
+        self.watch_checkbox = QtWidgets.QCheckBox("Watch")
+        self.watch_checkbox.setToolTip("Keep the shot list in sync with new renders while the panel is open")
+        self.watch_checkbox.setChecked(bool(self.watch_enabled))
+
+        self.find_in_scripts_btn = QtWidgets.QPushButton("Find in Scripts")
+        self.find_in_scripts_btn.setToolTip("Find the shot scripts that read a render layer or file,\n"
+                                            "or use a node class or gizmo (from the script inventory)")
+
         buttons_layout.addWidget(self.refresh_btn, 1)
         buttons_layout.addWidget(self.set_as_current_btn, 1)
+        buttons_layout.addWidget(self.find_in_scripts_btn, 1)
+        buttons_layout.addWidget(self.watch_checkbox)
 
         filter_layout.addLayout(buttons_layout)
 
@@ -317,6 +359,8 @@ class ShotManagerWidget(QtWidgets.QWidget):
         self.sequence_dropdown.currentTextChanged.connect(self.on_sequence_changed)
         self.shot_dropdown.currentTextChanged.connect(self.on_shot_changed)
         self.version_dropdown.currentTextChanged.connect(self.on_version_changed)
+        self.overview_checkbox.toggled.connect(self.update_preview)
+        self.thumbnail_cache.image_ready.connect(self.on_thumbnail_ready)
 
         # Connect navigation buttons
         self.prev_shot_btn.clicked.connect(self.go_to_previous_shot)
@@ -325,6 +369,8 @@ class ShotManagerWidget(QtWidgets.QWidget):
         # Connect action buttons
         self.set_as_current_btn.clicked.connect(self.set_as_current_shot)
         self.refresh_btn.clicked.connect(self.force_refresh)
+        self.watch_checkbox.toggled.connect(self.on_watch_toggled)
+        self.find_in_scripts_btn.clicked.connect(self.find_in_scripts)
         self.create_btn.clicked.connect(self.create_script)
         self.open_btn.clicked.connect(self.open_script)
         self.open_comp_dir_btn.clicked.connect(self.open_comp_dir)
@@ -336,12 +382,19 @@ class ShotManagerWidget(QtWidgets.QWidget):
         self.publish_to_cerebro_btn.clicked.connect(self.publish_shot)
 
     def initialize_data(self):
-        if not self.load_from_cache():
-            self.scan_shot_dirs() # This triggers the thread
-        else:
+        if self.load_from_index():
             self.set_initial_shot_context()
+            if self.watch_checkbox.isChecked():
+                self.start_watcher()
+        elif self.load_from_cache():
+            # Show the cached list right away and revalidate it in the background,
+            # the scan result is applied as a diff (the watcher starts once it finishes)
+            self.set_initial_shot_context()
+            self.scan_shot_dirs()
+        else:
+            self.scan_shot_dirs() # This triggers the thread (the watcher starts once it finishes)
 
-    def scan_shot_dirs(self):
+    def scan_shot_dirs(self, full_scan=False):
         # 1. Check if a scan is already running or cleaning up
         if hasattr(self, 'thread') and self.thread is not None:
             if self.thread.isRunning():
@@ -358,12 +411,24 @@ class ShotManagerWidget(QtWidgets.QWidget):
         
         # 3. Setup Thread (Standard Qt Pattern)
         self.thread = QtCore.QThread()
-        self.worker = ShotScannerWorker(self.render_path)
+        # Unchanged directories are reused from the last scan unless a full crawl is requested
+        previous_tree = {} if full_scan else self.scan_tree
+        previous_records = {} if full_scan else self.shot_records
+        self.worker = ShotScannerWorker(self.render_path,
+                                        max_workers=self.scan_workers,
+                                        previous_tree=previous_tree,
+                                        comp_path=self.prj_comp_path,
+                                        camera_roots=(self.prj_cache_path_new, self.prj_cache_path_old),
+                                        previous_records=previous_records,
+                                        templates=self.templates)
         self.worker.moveToThread(self.thread)
 
         # 4. Connect Signals
         self.thread.started.connect(self.worker.run)
         
+        # Shots stream into the dropdowns while the scan is running
+        self.worker.shot_found.connect(self.on_shot_found)
+
         # CEnsure data is passed cleanly before cleanup
         self.worker.finished.connect(self.on_scan_finished)
         
@@ -373,30 +438,41 @@ class ShotManagerWidget(QtWidgets.QWidget):
         self.thread.finished.connect(self.thread.deleteLater)
 
         # 5. Start
+        self.shots_before_scan = frozenset(self.shot_index.names)
         self.thread.start()
 
-    def on_scan_finished(self, found_shots):
+    def on_scan_finished(self, found_shots, scan_tree, shot_records):
         """
         Called when the background thread finishes. 
         Runs on the Main Thread automatically via Qt Signal/Slot.
+        New shots were already streamed into the dropdowns, so only the
+        difference to the list on screen is applied here.
         """
         try:
-            self.all_shots = found_shots
-            
+            found = set(found_shots)
+            removed = [shot for shot in self.shot_index if shot not in found]
+            # Streamed shots are in the index already, what's new is told by the list before the scan
+            added = [shot for shot in found_shots if shot not in self.shots_before_scan]
+            changed = [shot for shot in found_shots if shot_records.get(shot) != self.shot_records.get(shot)]
+
             # Re-enable UI
             self.refresh_btn.setEnabled(True)
             self.refresh_btn.setText("Force Refresh")
-            
+
             # Update Data
-            self.build_shot_hierarchy()
-            self.update_episode_dropdown()
-            self.save_to_cache(found_shots)
+            self.apply_shot_diff(added, changed, removed, found_shots, scan_tree, shot_records)
+
+            if self.watcher is not None:
+                self.watcher.watcher.reset(found_shots, scan_tree, shot_records)
+            elif self.watch_checkbox.isChecked():
+                self.start_watcher()
             
             # Handle initialization logic
             if not self.is_initialized:
                  self.set_initial_shot_context()
             
-            nuke.tprint(f"Scan complete. Found {len(found_shots)} shots.")
+            nuke.tprint(f"Scan complete. Found {len(found_shots)} shots "
+                        f"({len(added)} new, {len(removed)} removed).")
 
         except Exception as e:
             nuke.tprint(f"Error updating UI after scan: {e}")
@@ -404,6 +480,121 @@ class ShotManagerWidget(QtWidgets.QWidget):
             self.refresh_btn.setEnabled(True)
             self.refresh_btn.setText("Force Refresh")
 
+    def on_shot_found(self, shot_name):
+        """
+        Adds a single shot streamed from the scanner. Dropdowns are updated in place
+        so the current selection survives.
+        """
+        was_empty = not self.shot_index
+        added = self.shot_index.add(shot_name)
+        if added is None:
+            return
+
+        if was_empty:
+            self.update_episode_dropdown()
+            return
+
+        index, new_ep, new_sq = added
+        ep, sq, sh = self.shot_index.parts(index)
+        if new_ep:
+            self._insert_sorted_item(self.episode_dropdown, ep)
+        elif self.episode_dropdown.currentText() == ep:
+            if new_sq:
+                self._insert_sorted_item(self.sequence_dropdown, sq)
+            elif self.sequence_dropdown.currentText() == sq:
+                self._insert_sorted_item(self.shot_dropdown, sh)
+
+        self.update_current_shot_index()
+        self.update_navigation_buttons()
+        self.update_shot_info()
+
+    def _insert_sorted_item(self, dropdown, text):
+        items = [dropdown.itemText(i) for i in range(dropdown.count())]
+        dropdown.blockSignals(True)
+        dropdown.insertItem(bisect.bisect_left(items, text), text)
+        dropdown.blockSignals(False)
+
+    def start_watcher(self):
+        if self.watcher is not None or not self.render_path:
+            return
+        self.watcher = RenderWatcherBridge(self.render_path,
+                                           self.prj_comp_path,
+                                           (self.prj_cache_path_new, self.prj_cache_path_old),
+                                           self.watch_interval,
+                                           self.scan_workers,
+                                           self.templates)
+        self.watcher.shots_changed.connect(self.on_watched_changes)
+        self.watcher.start(self.shot_index.names, self.scan_tree, self.shot_records)
+        nuke.tprint("Shot Manager: watching render tree for new shots")
+
+    def stop_watcher(self):
+        if self.watcher is None:
+            return
+        self.watcher.stop()
+        self.watcher.deleteLater()
+        self.watcher = None
+
+    def on_watch_toggled(self, checked):
+        if checked:
+            self.start_watcher()
+        else:
+            self.stop_watcher()
+
+    def on_watched_changes(self, added, changed, removed, shots, tree, records):
+        self.apply_shot_diff(added, changed, removed, shots, tree, records)
+        nuke.tprint(f"Shot Manager: {len(added)} new, {len(changed)} updated, {len(removed)} removed shot(s)")
+
+    def apply_shot_diff(self, added, changed, removed, shots, tree, records):
+        """Applies a scan or watcher diff in place, the dropdowns are never rebuilt."""
+        self.scan_tree = tree
+        self.shot_records = records
+
+        for shot_name in added:
+            self.on_shot_found(shot_name)
+        for shot_name in removed:
+            self.remove_shot(shot_name)
+
+        if changed:
+            self.atlas_table_path = None  # Re-read the overview offsets, thumbnails may have moved on
+
+        if self.shot_context in changed:
+            # New thumbnails or versions for the shot on screen
+            selected_version = self.version_dropdown.currentText()
+            self.scan_for_thumbnails()
+            index = self.version_dropdown.findText(selected_version)
+            if index >= 0:
+                self.version_dropdown.setCurrentIndex(index)
+            self.update_preview()
+
+        self.save_to_cache(shots, tree, records)
+
+    def remove_shot(self, shot_name):
+        removed = self.shot_index.remove(shot_name)
+        if removed is None:
+            return
+
+        # Only drop dropdown items that became empty, the selection moves on by itself
+        ep, sq, sh, ep_emptied, sq_emptied = removed
+        if self.episode_dropdown.currentText() == ep and self.sequence_dropdown.currentText() == sq:
+            self._remove_item(self.shot_dropdown, sh)
+        if sq_emptied and self.episode_dropdown.currentText() == ep:
+            self._remove_item(self.sequence_dropdown, sq)
+        if ep_emptied:
+            self._remove_item(self.episode_dropdown, ep)
+
+        self.update_current_shot_index()
+        self.update_navigation_buttons()
+        self.update_shot_info()
+
+    def _remove_item(self, dropdown, text):
+        index = dropdown.findText(text)
+        if index >= 0:
+            dropdown.removeItem(index)
+
+    def closeEvent(self, event):
+        self.stop_watcher()
+        super(ShotManagerWidget, self).closeEvent(event)
+
     def on_scan_progress(self, msg):
         # Optional: Update status bar or log
         pass 
@@ -416,11 +607,11 @@ class ShotManagerWidget(QtWidgets.QWidget):
             match = re.search(r'(ep\d+_sq\d+_sh\d+)', script_path)
             if match:
                 shot_name_from_script = match.group(1)
-                if shot_name_from_script in self.all_shots:
+                if shot_name_from_script in self.shot_index:
                     shot_name = shot_name_from_script
 
-        if not shot_name and self.all_shots:
-            shot_name = self.all_shots[0]
+        if not shot_name and self.shot_index:
+            shot_name = self.shot_index[0]
 
         if shot_name:
             self.navigate_to_shot_by_name(shot_name)
@@ -428,83 +619,72 @@ class ShotManagerWidget(QtWidgets.QWidget):
             self.update_shot_info()
             self.update_navigation_buttons()
 
-    def load_from_cache(self):
-        if not os.path.exists(self.cache_file):
-            return False
+    def load_from_index(self):
+        """Reads the shot list from the shared project index if the indexer keeps it up to date."""
+        with ProjectIndex(self.index_path) as index:
+            if not index.is_fresh(self.render_path, self.index_max_age):
+                return False
+            shots = index.shots()
+            records = index.records()
+            tree = index.tree()
 
-        try:
-            with open(self.cache_file, 'r') as f:
-                cache_data = json.load(f)
+        if not shots:
+            return False
 
-            cache_time = datetime.strptime(cache_data.get('timestamp', ''), "%Y-%m-%d %H:%M:%S")
-            current_time = datetime.now()
+        self.shot_index = ShotIndex(shots)
+        # The indexer's directory mtimes make the first watcher or refresh pass incremental
+        self.scan_tree = tree
+        self.shot_records = records
+        self.update_episode_dropdown()
+        nuke.tprint(f"Loaded {len(shots)} shots from shared index: {self.index_path}")
+        return True
 
-            if (current_time - cache_time).total_seconds() < 86400:  # 24 hours
-                self.all_shots = cache_data.get('shots', [])
-                self.build_shot_hierarchy()
-                self.update_episode_dropdown()
-                return True
+    def load_from_cache(self):
+        """Shows the cached shot list regardless of its age, the caller revalidates it."""
+        cache_data = load_shot_cache(self.cache_file, self.render_path, PROJECT_NAME)
+        if cache_data is None:
             return False
 
-        except Exception as e:
-            print(f"Error loading cache: {e}")
+        # Directory mtimes make the revalidation an incremental scan
+        self.scan_tree = cache_data['tree']
+        self.shot_records = cache_data['records']
+        if not cache_data['shots']:
             return False
 
-    def save_to_cache(self, shots):
-        try:
-            cache_dir = os.path.dirname(self.cache_file)
-            if not os.path.exists(cache_dir):
-                os.makedirs(cache_dir)
-
-            cache_data = {
-                'shots': shots,
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-
-            with open(self.cache_file, 'w') as f:
-                json.dump(cache_data, f, indent=2)
+        self.shot_index = ShotIndex(cache_data['shots'])
+        self.update_episode_dropdown()
+        saved_at = datetime.fromtimestamp(cache_data['saved_at']).strftime("%Y-%m-%d %H:%M:%S")
+        nuke.tprint(f"Loaded {len(self.shot_index)} shots from cache saved {saved_at}, revalidating...")
+        return True
 
-        except Exception as e:
+    def save_to_cache(self, shots, tree=None, records=None):
+        try:
+            save_shot_cache(self.cache_file, shots, tree, records, self.render_path, PROJECT_NAME)
+        except OSError as e:
             print(f"Error saving cache: {e}")
 
     def force_refresh(self):
-        nuke.tprint("Forcing refresh of shot list...")
+        # Shift+Click crawls the whole render tree, ignoring cached directory mtimes
+        full_scan = bool(QtWidgets.QApplication.keyboardModifiers() & QtCore.Qt.ShiftModifier)
+        nuke.tprint("Forcing full rescan of shot list..." if full_scan else "Forcing refresh of shot list...")
         self.refresh_btn.setEnabled(False)
         QtWidgets.QApplication.processEvents()  # Allow UI to update
 
         try:
-            self.scan_shot_dirs()
+            self.scan_shot_dirs(full_scan=full_scan)
             self.set_initial_shot_context()
             nuke.tprint("Shot list refreshed successfully.")
         finally:
             self.refresh_btn.setEnabled(True)
 
-    def build_shot_hierarchy(self):
-        self.shot_data = {}
-
-        for shot in self.all_shots:
-            match = re.match(r'ep(\d+)_sq(\d+)_sh(\d+)', shot)
-            if not match:
-                continue
-
-            ep, sq, sh = match.groups()
-
-            if ep not in self.shot_data:
-                self.shot_data[ep] = {}
-            if sq not in self.shot_data[ep]:
-                self.shot_data[ep][sq] = []
-
-            self.shot_data[ep][sq].append(sh)
-
     def update_episode_dropdown(self):
         self.episode_dropdown.blockSignals(True)
         self.episode_dropdown.clear()
 
-        if not self.shot_data:
+        if not self.shot_index:
             self.episode_dropdown.addItem("No episodes found")
         else:
-            episodes = sorted(self.shot_data.keys())
-            self.episode_dropdown.addItems(episodes)
+            self.episode_dropdown.addItems(self.shot_index.episodes())
 
         self.episode_dropdown.blockSignals(False)
         if self.episode_dropdown.count() > 0:
@@ -515,9 +695,8 @@ class ShotManagerWidget(QtWidgets.QWidget):
         self.sequence_dropdown.blockSignals(True)
         self.sequence_dropdown.clear()
 
-        selected_ep = self.episode_dropdown.currentText()
-        if selected_ep and selected_ep in self.shot_data:
-            sequences = sorted(self.shot_data[selected_ep].keys())
+        sequences = self.shot_index.sequences(self.episode_dropdown.currentText())
+        if sequences:
             self.sequence_dropdown.addItems(sequences)
         else:
             self.sequence_dropdown.addItem("Select Sequence")
@@ -531,13 +710,8 @@ class ShotManagerWidget(QtWidgets.QWidget):
         self.shot_dropdown.blockSignals(True)
         self.shot_dropdown.clear()
 
-        selected_ep = self.episode_dropdown.currentText()
-        selected_sq = self.sequence_dropdown.currentText()
-
-        if (selected_ep and selected_sq and
-                selected_ep in self.shot_data and
-                selected_sq in self.shot_data[selected_ep]):
-            shots = sorted(self.shot_data[selected_ep][selected_sq])
+        shots = self.shot_index.shots(self.episode_dropdown.currentText(), self.sequence_dropdown.currentText())
+        if shots:
             self.shot_dropdown.addItems(shots)
         else:
             self.shot_dropdown.addItem("Select Shot")
@@ -560,53 +734,48 @@ class ShotManagerWidget(QtWidgets.QWidget):
         self.update_preview()
         self.update_navigation_buttons()
         self.update_shot_info()
+        self.prefetch_neighbour_thumbnails()
 
     def on_version_changed(self):
         self.update_preview()
 
     def update_current_shot_index(self):
-        if self.shot_context and self.shot_context in self.all_shots:
-            self.current_shot_index = self.all_shots.index(self.shot_context)
-        else:
-            self.current_shot_index = 0
+        index = self.shot_index.index_of(self.shot_context) if self.shot_context else -1
+        self.current_shot_index = max(index, 0)
 
     def update_navigation_buttons(self):
-        self.prev_shot_btn.setEnabled(self.current_shot_index > 0)
-        self.next_shot_btn.setEnabled(self.current_shot_index < len(self.all_shots) - 1)
+        self.prev_shot_btn.setEnabled(self.shot_index.previous_index(self.current_shot_index) is not None)
+        self.next_shot_btn.setEnabled(self.shot_index.next_index(self.current_shot_index) is not None)
 
     def update_shot_info(self):
         if self.shot_context:
             shot_num = self.current_shot_index + 1
-            total_shots = len(self.all_shots)
+            total_shots = len(self.shot_index)
             self.shot_info_label.setText(f"{self.shot_context} ({shot_num}/{total_shots})")
         else:
             self.shot_info_label.setText("Select a shot")
 
     def go_to_previous_shot(self):
-        if self.current_shot_index > 0:
-            self.current_shot_index -= 1
-            self.navigate_to_shot_by_index(self.current_shot_index)
+        index = self.shot_index.previous_index(self.current_shot_index)
+        if index is not None:
+            self.navigate_to_shot_by_index(index)
 
     def go_to_next_shot(self):
-        if self.current_shot_index < len(self.all_shots) - 1:
-            self.current_shot_index += 1
-            self.navigate_to_shot_by_index(self.current_shot_index)
+        index = self.shot_index.next_index(self.current_shot_index)
+        if index is not None:
+            self.navigate_to_shot_by_index(index)
 
     def navigate_to_shot_by_name(self, shot_name):
-        if shot_name in self.all_shots:
-            index = self.all_shots.index(shot_name)
+        index = self.shot_index.index_of(shot_name)
+        if index >= 0:
             self.navigate_to_shot_by_index(index)
 
     def navigate_to_shot_by_index(self, index):
-        if not (0 <= index < len(self.all_shots)):
-            return
-
-        target_shot = self.all_shots[index]
-        match = re.match(r'ep(\d+)_sq(\d+)_sh(\d+)', target_shot)
-        if not match:
+        if not (0 <= index < len(self.shot_index)):
             return
 
-        ep, sq, sh = match.groups()
+        self.current_shot_index = index
+        ep, sq, sh = self.shot_index.parts(index)
 
         self.episode_dropdown.blockSignals(True)
         self.sequence_dropdown.blockSignals(True)
@@ -646,6 +815,44 @@ class ShotManagerWidget(QtWidgets.QWidget):
     def set_as_current_shot(self):
         self.set_initial_shot_context()
 
+    def find_in_scripts(self):
+        """Looks a render layer, file name, node class or gizmo up in the script inventory."""
+        text, ok = QtWidgets.QInputDialog.getText(self, "Find in Scripts",
+                                                  "Render layer, file name, node class or gizmo:")
+        text = text.strip()
+        if not ok or not text:
+            return
+
+        with ScriptInventory(self.inventory_path) as inventory:
+            if not inventory.indexed_at:
+                nuke.message(f"No script inventory found at {self.inventory_path}.\n"
+                             "Run: python -m scripts.core.script_inventory")
+                return
+            reads = inventory.reading(text)
+            uses = inventory.using(text)
+            indexed_at = datetime.fromtimestamp(inventory.indexed_at).strftime("%Y-%m-%d %H:%M")
+
+        dialog = QtWidgets.QDialog(self)
+        dialog.setWindowTitle(f"Find in Scripts: {text}")
+        dialog.resize(900, 400)
+        layout = QtWidgets.QVBoxLayout(dialog)
+        layout.addWidget(QtWidgets.QLabel(f"{len(reads)} file path(s), {len(uses)} script(s) with such nodes. "
+                                          f"Inventory from {indexed_at}, double click opens the shot."))
+
+        results = QtWidgets.QListWidget()
+        for shot, script, node, file_path in reads:
+            item = QtWidgets.QListWidgetItem(f"{shot}  {os.path.basename(script)}  {node}: {file_path}")
+            item.setData(QtCore.Qt.UserRole, shot)
+            results.addItem(item)
+        for shot, script, count in uses:
+            item = QtWidgets.QListWidgetItem(f"{shot}  {os.path.basename(script)}  {count} x {text}")
+            item.setData(QtCore.Qt.UserRole, shot)
+            results.addItem(item)
+        results.itemDoubleClicked.connect(
+            lambda item: self.navigate_to_shot_by_name(item.data(QtCore.Qt.UserRole)))
+        layout.addWidget(results)
+        dialog.show()
+
     def get_shot_paths(self, selected_shot=None, show_message=False):
         if selected_shot is None:
             selected_shot = self.shot_context
@@ -655,31 +862,26 @@ class ShotManagerWidget(QtWidgets.QWidget):
                 nuke.message("No shot selected.")
             return None
 
-        match = re.match(r'ep(\d+)_sq(\d+)_sh(\d+)', selected_shot)
-        if not match:
+        paths = self.templates.shot_paths(selected_shot)
+        if paths is None:
             if show_message:
                 nuke.message(f"Invalid shot format: {selected_shot}")
             return None
 
-        ep, sq, sh = match.groups()
-        shot_comp_path = f"{self.prj_comp_path}/ep{ep}/sq{sq}/sh{sh}/comp"
-        shot_precomp_path = f"{self.prj_comp_path}/ep{ep}/sq{sq}/sh{sh}/light_precomp"
-        shot_cam_path = f"{self.prj_cache_path_new}/ep{ep}/sq{sq}/sh{sh}/src/shot_camera.abc"
-
-        if not os.path.exists(shot_cam_path):
-            shot_cam_path = f"{self.prj_cache_path_old}/ep{ep}/sq{sq}/sh{sh}/src/shot_camera.abc"
-
-        return {
-            "shot_name": selected_shot,
-            "ep": ep, "sq": sq, "sh": sh,
-            "comp_dir": shot_comp_path,
-            "precomp_dir": shot_precomp_path,
-            "cam_dir": shot_cam_path,
-            "nk_dir": os.path.join(shot_comp_path, "nk"),
-            "exr_dir": os.path.join(shot_comp_path, "exr"),
-            "mov_dir": os.path.join(shot_comp_path, "mov"),
-            "thumb_dir": os.path.join(shot_comp_path, "mov/.thumb"),
-        }
+        # Camera location is known from the scan, only probe the cache servers for unknown shots
+        record = self.shot_records.get(selected_shot, {})
+        shot_cam_path = record.get("camera")
+        if not shot_cam_path:
+            shot_cam_path = paths["camera"]
+            if (record or not shot_cam_path or not os.path.exists(shot_cam_path)) and self.prj_cache_path_old:
+                shot_cam_path = self.templates.format("camera", cache_root=self.prj_cache_path_old,
+                                                      ep=paths["ep"], sq=paths["sq"], sh=paths["sh"])
+        paths["cam_dir"] = shot_cam_path
+        return paths
+
+    def sorted_thumb_versions(self):
+        """Version keys of the current shot's thumbnails, latest first, compared as numbers."""
+        return sorted(self.current_shot_thumbs, key=thumb_version_number, reverse=True)
 
     def scan_for_thumbnails(self):
         self.current_shot_thumbs = {}
@@ -693,25 +895,30 @@ class ShotManagerWidget(QtWidgets.QWidget):
             return
 
         thumb_dir = shot_paths["thumb_dir"]
+        record = self.shot_records.get(shot_paths["shot_name"])
+        if record is not None:
+            # Thumbnails were listed by the scanner, no need to touch the share
+            for version_key, file_name in record.get("thumbs", {}).items():
+                self.current_shot_thumbs[version_key] = os.path.join(thumb_dir, file_name)
+            if self.current_shot_thumbs:
+                self.version_dropdown.addItems(self.sorted_thumb_versions())
+                self.version_dropdown.setCurrentIndex(0)
+            else:
+                self.version_dropdown.addItem("No thumbnails")
+            self.version_dropdown.blockSignals(False)
+            return
+
         if not os.path.exists(thumb_dir):
             self.version_dropdown.addItem("No thumbnails")
             self.version_dropdown.blockSignals(False)
             return
 
         try:
-            files = os.listdir(thumb_dir)
-            thumb_pattern = re.compile(r'(.+)_v(\d+).*\.(jpg|jpeg|png)', re.IGNORECASE)
-
-            for f in files:
-                match = thumb_pattern.match(f)
-                if match:
-                    base_name, version, ext = match.groups()
-                    version_key = f"v{version.zfill(2)}"
-                    self.current_shot_thumbs[version_key] = os.path.join(thumb_dir, f)
+            for version_key, file_name in thumbnail_versions(thumb_dir).items():
+                self.current_shot_thumbs[version_key] = os.path.join(thumb_dir, file_name)
 
             if self.current_shot_thumbs:
-                versions = sorted(self.current_shot_thumbs.keys(), reverse=True)
-                self.version_dropdown.addItems(versions)
+                self.version_dropdown.addItems(self.sorted_thumb_versions())
                 self.version_dropdown.setCurrentIndex(0)
             else:
                 self.version_dropdown.addItem("No thumbnails")
@@ -724,9 +931,11 @@ class ShotManagerWidget(QtWidgets.QWidget):
 
     def update_preview(self):
         if not self.shot_context:
-            self.image_label.clear()
-            self.pixmap = QtGui.QPixmap()
-            self.image_label.setText("Select a shot to preview")
+            self.clear_preview("Select a shot to preview")
+            return
+
+        if self.overview_checkbox.isChecked():
+            self.load_sequence_overview()
             return
 
         selected_version = self.version_dropdown.currentText()
@@ -734,35 +943,130 @@ class ShotManagerWidget(QtWidgets.QWidget):
             thumb_path = self.current_shot_thumbs[selected_version]
             self.load_thumb_preview(thumb_path)
         else:
-            self.image_label.clear()
-            self.pixmap = QtGui.QPixmap()
-            self.image_label.setText(f"No preview available for:\n{self.shot_context}")
+            self.clear_preview(f"No preview available for:\n{self.shot_context}")
+
+    def clear_preview(self, text):
+        # A thumbnail still loading for the previous selection must not show up later
+        if self.preview_token is not None:
+            self.thumbnail_cache.cancel(self.preview_token)
+            self.preview_token = None
+        self.image_label.clear()
+        self.preview_image = QtGui.QImage()
+        self.preview_path = self.preview_mtime = None
+        self.image_label.setText(text)
 
     def load_thumb_preview(self, thumb_path):
-        try:
-            self.pixmap = QtGui.QPixmap(thumb_path)
-            if self.pixmap.isNull():
-                self.image_label.setText(f"Could not load:\n{thumb_path}")
-                return
-            QtCore.QTimer.singleShot(0, self._update_scaled_pixmap)
-        except Exception as e:
-            self.image_label.setText(f"Error loading image:\n{str(e)}")
+        """Shows the cached decode right away if there is one, the file is read on a pool thread."""
+        if self.preview_token is not None:
+            self.thumbnail_cache.cancel(self.preview_token)
+        self.preview_token, image, mtime = self.thumbnail_cache.request(thumb_path)
+
+        if image is not None:
+            self.show_preview(thumb_path, mtime, image)
+        elif self.preview_path != thumb_path:
+            self.image_label.clear()
+            self.preview_image = QtGui.QImage()
+            self.image_label.setText("Loading preview...")
+
+    def on_thumbnail_ready(self, token, thumb_path, mtime, image):
+        if token != self.preview_token:
+            return  # The artist has moved on to another shot or version
+        self.preview_token = None
+
+        if image.isNull():
+            self.preview_image = QtGui.QImage()
+            self.image_label.setText(f"Could not load:\n{thumb_path}")
+        elif (thumb_path, mtime) != (self.preview_path, self.preview_mtime) or self.preview_image.isNull():
+            self.show_preview(thumb_path, mtime, image)
+
+    def load_sequence_overview(self):
+        """Shows the sequence atlas, a single image instead of one thumbnail per shot."""
+        shot_paths = self.get_shot_paths()
+        image_path, table_path = atlas_paths(self.prj_comp_path, shot_paths['ep'], shot_paths['sq'], self.templates)
+        if table_path != self.atlas_table_path:
+            self.atlas_table = load_atlas_table(table_path)
+            self.atlas_table_path = table_path
+
+        if self.atlas_table is None:
+            self.clear_preview(f"No thumbnail atlas for:\n{shot_paths['ep']}_{shot_paths['sq']}")
+            return
+        self.load_thumb_preview(image_path)
+
+    def overview_shot_at(self, pos):
+        """Name of the shot under pos in the displayed atlas, or None."""
+        pixmap = self.image_label.pixmap()
+        if self.atlas_table is None or pixmap is None or pixmap.isNull():
+            return None
+        scale = self.atlas_table["size"][0] / pixmap.width()
+        x, y = pos.x() * scale, pos.y() * scale
+        for shot_name, entry in self.atlas_table["shots"].items():
+            left, top, width, height = entry["rect"]
+            if left <= x < left + width and top <= y < top + height:
+                return shot_name
+        return None
+
+    def eventFilter(self, obj, event):
+        if (obj is self.image_label and event.type() == QtCore.QEvent.MouseButtonPress
+                and self.overview_checkbox.isChecked()):
+            shot_name = self.overview_shot_at(event.pos())
+            if shot_name in self.shot_index:
+                self.navigate_to_shot_by_name(shot_name)
+                return True
+        return super(ShotManagerWidget, self).eventFilter(obj, event)
+
+    def _highlight_overview_cell(self, pixmap):
+        entry = self.atlas_table["shots"].get(self.shot_context) if self.atlas_table else None
+        if entry is None:
+            return pixmap
+        scale = pixmap.width() / self.atlas_table["size"][0]
+        left, top, width, height = (value * scale for value in entry["rect"])
+
+        highlighted = pixmap.copy()  # The scaled pixmap is shared through the cache
+        painter = QtGui.QPainter(highlighted)
+        painter.setPen(QtGui.QPen(QtGui.QColor("#f0c040"), 2))
+        painter.drawRect(QtCore.QRectF(left + 1, top + 1, width - 2, height - 2))
+        painter.end()
+        return highlighted
+
+    def show_preview(self, thumb_path, mtime, image):
+        self.preview_image, self.preview_path, self.preview_mtime = image, thumb_path, mtime
+        QtCore.QTimer.singleShot(0, self._update_scaled_pixmap)
+
+    def latest_thumb_path(self, shot_name):
+        """Latest version thumbnail known from the scan, or None. Never lists the share."""
+        thumbs = self.shot_records.get(shot_name, {}).get("thumbs")
+        shot_paths = self.get_shot_paths(shot_name) if thumbs else None
+        if not shot_paths:
+            return None
+        # Keys are zero padded to two digits only, v100 has to beat v99
+        return os.path.join(shot_paths["thumb_dir"], thumbs[max(thumbs, key=thumb_version_number)])
+
+    def prefetch_neighbour_thumbnails(self):
+        """Decodes the previous and next shots' thumbnails in the background so the arrows switch instantly."""
+        if not self.shot_context:
+            return
+        neighbours = (self.shot_index.previous_index(self.current_shot_index),
+                      self.shot_index.next_index(self.current_shot_index))
+        self.thumbnail_cache.prefetch([self.latest_thumb_path(self.shot_index[index])
+                                       for index in neighbours if index is not None])
 
     def scaledPixmap(self):
         available_size = self.scroll_area.viewport().size()
         if available_size.width() <= 0 or available_size.height() <= 0:
             available_size = QtCore.QSize(self.image_label.width(), self.image_label.height())
-        return self.pixmap.scaled(available_size, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+        return self.thumbnail_cache.scaled(self.preview_path, self.preview_mtime, self.preview_image, available_size)
 
     def resizeEvent(self, event):
         super(ShotManagerWidget, self).resizeEvent(event)
-        if self.image_label.isVisible() and not self.pixmap.isNull():
+        if self.image_label.isVisible() and not self.preview_image.isNull():
             self._update_scaled_pixmap()
 
     def _update_scaled_pixmap(self):
-        if not self.pixmap.isNull():
+        if not self.preview_image.isNull():
             scaled = self.scaledPixmap()
             if not scaled.isNull():
+                if self.overview_checkbox.isChecked():
+                    scaled = self._highlight_overview_cell(scaled)
                 self.image_label.setPixmap(scaled)
                 self.image_label.resize(scaled.size())
 
@@ -780,8 +1084,9 @@ class ShotManagerWidget(QtWidgets.QWidget):
         # script_name = f"{paths['shot_name']}_{ver}.nk"
         # script_path = os.path.join(nk_dir, script_name)
 
-        script_name = f"{paths['shot_name']}_v01.nk"
-        script_path = os.path.join(paths["nk_dir"], script_name)
+        script_path = self.templates.format("comp_script", ep=paths["ep"], sq=paths["sq"], sh=paths["sh"],
+                                            version="v01")
+        script_name = os.path.basename(script_path)
 
         if os.path.exists(script_path):
             if not nuke.ask(f"Script '{script_name}' exists. Overwrite?"):
@@ -799,23 +1104,11 @@ class ShotManagerWidget(QtWidgets.QWidget):
             return
 
         nk_dir = paths["nk_dir"]
-        try:
-            nk_files = [f for f in os.listdir(nk_dir) if f.endswith('.nk')]
-        except FileNotFoundError:
-            nuke.message("No Nuke scripts found for this shot.")
-            return
-
-        if not nk_files:
+        recent_script = self._latest_script(paths["shot_name"], "nk", nk_dir)
+        if not recent_script:
             nuke.message("No Nuke scripts found for this shot.")
             return
 
-        recent_script = max(nk_files,
-                            key=lambda f: (int(re.search(r'_v(\d+)', f).group(1)) if re.search(r'_v(\d+)', f) else 0,
-                                           f))
-
-        if not recent_script:
-            recent_script = nk_files[0]
-
         recent_script_path = os.path.join(nk_dir, recent_script)
 
         self.update_cerebro_status_to_inprogress(paths['shot_name'])
@@ -827,6 +1120,26 @@ class ShotManagerWidget(QtWidgets.QWidget):
             nuke.tprint(f"Error opening script: {e}")
             return None
 
+    def _latest_script(self, shot_name, kind, nk_dir):
+        """
+        Latest script file name from the scan record. A single stat confirms the folder
+        hasn't changed since the scan, otherwise it is listed again.
+        """
+        record = self.shot_records.get(shot_name)
+        try:
+            mtime = os.stat(nk_dir).st_mtime
+        except OSError:
+            return None
+
+        if record is not None and record.get("mtimes", {}).get(kind) == mtime:
+            latest = record.get(kind)
+        else:
+            latest = self.versions.latest(nk_dir, '.nk')
+            if record is not None:
+                record[kind] = latest
+                record.setdefault("mtimes", {})[kind] = mtime
+        return latest[0] if latest else None
+
     def update_cerebro_status_to_inprogress(self, shot_name):
         """
         Updates the shot status in Cerebro to 'in progress' if it is currently 
@@ -907,23 +1220,17 @@ class ShotManagerWidget(QtWidgets.QWidget):
         if not paths:
             return
 
-        precomp_nk_dir = os.path.join(paths["precomp_dir"], "nk")
-        if not os.path.exists(precomp_nk_dir) or not os.listdir(precomp_nk_dir):
+        precomp_nk_dir = self.templates.format("precomp_nk_dir", ep=paths["ep"], sq=paths["sq"], sh=paths["sh"])
+        if not os.path.exists(precomp_nk_dir):
             nuke.message("No precomp scripts found for this shot. Use 'Create Precomp' first.")
             return
 
-        nk_files = [f for f in os.listdir(precomp_nk_dir) if f.endswith('.nk')]
-        if not nk_files:
+        # Latest versioned script, unversioned ones sort below any version
+        latest_script = self._latest_script(paths["shot_name"], "precomp", precomp_nk_dir)
+        if not latest_script:
             nuke.message("No precomp scripts found for this shot.")
             return
 
-        # Find latest (prefer versioned, then fall back to alphabetical)
-        versioned = [f for f in nk_files if re.search(r'_v(\d+)', f)]
-        if versioned:
-            latest_script = max(versioned, key=lambda f: (int(re.search(r'_v(\d+)', f).group(1)), f))
-        else:
-            latest_script = max(nk_files, key=lambda f: f)
-
         script_path = os.path.join(precomp_nk_dir, latest_script).replace('\\', '/')
         try:
             nuke.scriptOpen(script_path)
@@ -936,53 +1243,52 @@ class ShotManagerWidget(QtWidgets.QWidget):
         """
         Centralized Creation and Versioning:
         1. If none exist: Create v01 with Read layers and Template.
-        2. If exists: Increment version from latest and copy.
+        2. If exists: Increment version from latest and copy the file (the
+           script is not loaded, only its versioned paths are rewritten).
         """
         paths = self.get_shot_paths(show_message=True)
         if not paths:
             return
 
-        selected_shot = paths["shot_name"]
-        precomp_nk_dir = os.path.join(paths["precomp_dir"], "nk")
-        
+        shot = {"ep": paths["ep"], "sq": paths["sq"], "sh": paths["sh"]}
+        precomp_nk_dir = self.templates.format("precomp_nk_dir", **shot)
+
         # Ensure directories exist
         precomp_base = paths["precomp_dir"]
-        for d in ["nk", "exr", "mov"]:
-            p = os.path.join(precomp_base, d)
+        for name in ["precomp_nk_dir", "precomp_exr_dir", "precomp_mov_dir"]:
+            p = self.templates.format(name, **shot)
             if not os.path.exists(p):
                 os.makedirs(p)
 
-        existing_scripts = [f for f in os.listdir(precomp_nk_dir) if f.endswith('.nk')] if os.path.exists(precomp_nk_dir) else []
+        # About to write a new version, never trust a cached listing here
+        self.versions.invalidate(precomp_nk_dir)
+        latest = self.versions.latest(precomp_nk_dir, '.nk')
 
         # --- BRANCH A: INCREMENT VERSION ---
-        if existing_scripts:
-            # Find latest to increment from
-            def get_version(filename):
-                m = re.search(r'_v(\d+)', filename)
-                return int(m.group(1)) if m else 1
-
-            latest_script = max(existing_scripts, key=lambda f: (get_version(f), f))
-            latest_ver = get_version(latest_script)
-            
-            new_ver = latest_ver + 1
-            new_script_name = f"{selected_shot}_precomp_v{new_ver:02d}.nk"
-            new_script_path = os.path.join(precomp_nk_dir, new_script_name).replace('\\', '/')
+        if latest:
+            # Find latest to increment from, an unversioned script counts as v01
+            latest_script, latest_ver = latest
+            new_ver = max(latest_ver, 1) + 1
+            new_script_path = self.templates.format("precomp_script", version=f"v{new_ver:02d}", **shot)
+            new_script_name = os.path.basename(new_script_path)
             latest_script_path = os.path.join(precomp_nk_dir, latest_script).replace('\\', '/')
 
             try:
-                # Open latest and save as new version
-                nuke.scriptOpen(latest_script_path)
-                nuke.scriptSaveAs(new_script_path)
+                version_up_precomp(latest_script_path, new_script_path, new_ver)
                 nuke.tprint(f"Incremented precomp to v{new_ver:02d}: {new_script_path}")
                 # self.update_cerebro_status_to_inprogress(selected_shot)
             except Exception as e:
                 nuke.message(f"Failed to increment precomp version:\n{e}")
+                return
+            finally:
+                self.versions.invalidate(precomp_nk_dir)
+
+            if nuke.ask(f"Created {new_script_name}.\n\nOpen it now?"):
+                nuke.scriptOpen(new_script_path)
             return
 
         # --- BRANCH B: INITIAL CREATION (v01) ---
-        ep, sq, sh = paths["ep"], paths["sq"], paths["sh"]
-        script_name = f"{selected_shot}_precomp_v01.nk"
-        script_path = os.path.join(precomp_nk_dir, script_name)
+        script_path = self.templates.format("precomp_script", version="v01", **shot)
 
         nuke.scriptClear()
         project_root_settings()
@@ -991,7 +1297,7 @@ class ShotManagerWidget(QtWidgets.QWidget):
         if self.precomp_template_path and os.path.exists(self.precomp_template_path):
             nuke.nodePaste(self.precomp_template_path)
 
-        shot_render_path = f"{self.render_path}/ep{ep}/sq{sq}/sh{sh}/render"
+        shot_render_path = paths["render_dir"]
         if not os.path.exists(shot_render_path):
             nuke.message(f"No renders found at: {shot_render_path}")
             nuke.scriptSaveAs(script_path)
@@ -1004,7 +1310,7 @@ class ShotManagerWidget(QtWidgets.QWidget):
             for layer in render_layers:
                 if layer in file_path:
                     layer_dir = os.path.join(shot_render_path, layer).replace('\\', '/')
-                    sequence = nuke.getFileNameList(layer_dir)
+                    sequence = file_name_list(layer_dir)
                     if sequence:
                         new_path = os.path.join(layer_dir, sequence[0]).replace('\\', '/')
                         node['file'].fromUserText(new_path)
@@ -1014,9 +1320,9 @@ class ShotManagerWidget(QtWidgets.QWidget):
         for node in nuke.allNodes('Write'):
             name = node.name()
             if 'EXR' in name:
-                write_path = os.path.join(precomp_base, "exr", f"{selected_shot}_precomp.%04d.exr").replace('\\', '/')
+                write_path = self.templates.format("precomp_exr", **shot)
             elif 'MOV' in name:
-                write_path = os.path.join(precomp_base, "mov", f"{selected_shot}_precomp_v01.mov").replace('\\', '/')
+                write_path = self.templates.format("precomp_mov", version="v01", **shot)
             else:
                 continue
             node['file'].setValue(write_path)
@@ -0,0 +1,164 @@
+# SPDX-License-Identifier: Apache-2.0
+# thumbnail_cache.py - Decoded thumbnail LRU with background loading for the Shot Manager
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+
+import os
+from collections import OrderedDict
+
+from PySide2 import QtCore, QtGui
+
+DEFAULT_THUMBNAIL_CACHE_MB = 256
+MAX_SCALED_PIXMAPS = 32
+LOADER_THREADS = 3
+REQUEST_PRIORITY = 1  # a thumbnail the artist is waiting for jumps ahead of prefetches
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+class _LoaderSignals(QtCore.QObject):
+    # path, mtime, QImage (None when the cached decode is still current)
+    loaded = QtCore.Signal(str, object, object)
+
+
+class _ImageLoader(QtCore.QRunnable):
+    """Reads and decodes one thumbnail on a pool thread. QImage, unlike QPixmap, is safe off the UI thread."""
+
+    def __init__(self, path, known_mtime, signals):
+        super(_ImageLoader, self).__init__()
+        self.path = path
+        self.known_mtime = known_mtime
+        self.signals = signals
+
+    def run(self):
+        mtime = _mtime(self.path)
+        if mtime is None:
+            image = QtGui.QImage()
+        elif mtime == self.known_mtime:
+            image = None
+        else:
+            image = QtGui.QImage(self.path)
+        self.signals.loaded.emit(self.path, mtime, image)
+
+
+class ThumbnailCache(QtCore.QObject):
+    """
+    Size-bounded LRU of decoded thumbnails plus a small LRU of scaled pixmaps.
+
+    One decode is kept per path together with the file mtime it was read at, so
+    a thumbnail regenerated by a publish is decoded again. Scaled pixmaps are keyed
+    by (path, mtime, width, height), which makes resizing back and forth and
+    revisiting a shot free.
+
+    Nothing is read on the calling (UI) thread. request() hands out a token and
+    loads the file on a pool thread, image_ready(token, path, mtime, image) is
+    emitted on the UI thread once it is decoded; callers drop results whose token
+    is no longer the one they wait for. prefetch() warms the cache the same way
+    without emitting anything.
+    """
+    image_ready = QtCore.Signal(int, str, object, QtGui.QImage)
+
+    def __init__(self, max_mb=DEFAULT_THUMBNAIL_CACHE_MB, parent=None):
+        super(ThumbnailCache, self).__init__(parent)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._images = OrderedDict()
+        self._scaled = OrderedDict()
+        self._bytes = 0
+        self._pending = set()
+        self._wanted = {}
+        self._last_token = 0
+
+        self._pool = QtCore.QThreadPool(self)
+        self._pool.setMaxThreadCount(LOADER_THREADS)
+        self._signals = _LoaderSignals()
+        self._signals.loaded.connect(self._on_loaded)
+
+    def request(self, path):
+        """
+        Starts loading path for display and returns (token, cached QImage or None, mtime).
+        The cached decode can be shown right away, image_ready follows with the
+        current one after the file was checked on a pool thread.
+        """
+        self._last_token += 1
+        token = self._last_token
+        self._wanted[path] = token
+
+        cached = self._images.get(path)
+        if cached is not None:
+            self._images.move_to_end(path)
+        if path not in self._pending:
+            self._start(path, cached[0] if cached else None, REQUEST_PRIORITY)
+        return (token,) + ((cached[1], cached[0]) if cached else (None, None))
+
+    def cancel(self, token):
+        """Forgets a request, its result only warms the cache."""
+        for path, wanted in list(self._wanted.items()):
+            if wanted == token:
+                del self._wanted[path]
+
+    def scaled(self, path, mtime, image, size):
+        """Returns image scaled to fit size as a QPixmap, smooth scaling only runs once per size."""
+        key = (path, mtime, size.width(), size.height())
+        pixmap = self._scaled.get(key)
+        if pixmap is not None:
+            self._scaled.move_to_end(key)
+            return pixmap
+
+        scaled_image = image.scaled(size, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+        pixmap = QtGui.QPixmap.fromImage(scaled_image)
+        self._scaled[key] = pixmap
+        while len(self._scaled) > MAX_SCALED_PIXMAPS:
+            self._scaled.popitem(last=False)
+        return pixmap
+
+    def prefetch(self, paths):
+        """Decodes paths in the background unless they are cached or already loading."""
+        for path in paths:
+            if not path or path in self._pending or path in self._images:
+                continue
+            self._start(path, None)
+
+    def clear(self):
+        self._images.clear()
+        self._scaled.clear()
+        self._bytes = 0
+
+    def _start(self, path, known_mtime, priority=0):
+        self._pending.add(path)
+        self._pool.start(_ImageLoader(path, known_mtime, self._signals), priority)
+
+    def _on_loaded(self, path, mtime, image):
+        self._pending.discard(path)
+        if image is None:
+            cached = self._images.get(path)
+            if cached is None or cached[0] != mtime:
+                # Evicted or replaced while the file was checked, decode it for real
+                if path in self._wanted:
+                    self._start(path, None, REQUEST_PRIORITY)
+                return
+            image = cached[1]
+        elif mtime is not None:
+            self._store(path, mtime, image)
+
+        token = self._wanted.pop(path, None)
+        if token is not None:
+            self.image_ready.emit(token, path, mtime, image)
+
+    def _store(self, path, mtime, image):
+        if image.isNull():
+            return
+
+        # A decode of an older version of the file can't be requested again
+        previous = self._images.pop(path, None)
+        if previous is not None:
+            self._bytes -= previous[1].byteCount()
+
+        self._images[path] = (mtime, image)
+        self._bytes += image.byteCount()
+        while self._bytes > self.max_bytes and len(self._images) > 1:
+            _, (_, evicted) = self._images.popitem(last=False)
+            self._bytes -= evicted.byteCount()
@@ -1,16 +1,19 @@
 import nuke
 import os
-import re
+import time
 import nukescripts
 
 from ..config.config_loader import get_project_config
+from ..core.sequences import file_name_list, latest_layer_sequences
+from ..core.path_mapper import get_path_mapper
+from ..core.path_templates import get_path_templates
 
 PROD_PATH = get_project_config().get("server_prod_path")
 RENDER_PATH = get_project_config().get("server_render_path")
 COMP_PATH = get_project_config().get("server_comp_path")
-CACHE_PATH_OLD = get_project_config().get("cache_path_old")
 CACHE_PATH_NEW = get_project_config().get("cache_path_new")
 COMP_TEMPLATE_PATH = get_project_config().get("tools", {}).get("comp_template_path")
+TEMPLATES = get_path_templates("cinderella")
 
 def _get_shot_info():
     script_path = nuke.root().name()
@@ -18,18 +21,12 @@ def _get_shot_info():
         nuke.message("Please save the script first or provide a shot name.")
         return None
 
-    script_name = os.path.basename(script_path)
-    match = re.match(r"(ep\d+)_?(sq\d+)_?(sh\d+)(_light_precomp|_precomp)?(?:_(v\d+))?", script_name, re.IGNORECASE)
-    if not match:
+    shot = TEMPLATES.shot_context(os.path.basename(script_path))
+    if not shot:
         nuke.message("Script name doesn't match expected pattern (ep##_sq##_sh##_v##).")
         return None
 
-    ep = match.group(1) 
-    sq = match.group(2)
-    sh = match.group(3) 
-    
-    shot_name = f"{ep}_{sq}_{sh}"
-    return ep, sq, sh, shot_name
+    return shot["ep"], shot["sq"], shot["sh"], TEMPLATES.format("shot", **shot)
 
 def import_camera(shot_name=None):
     shot_info = _get_shot_info()
@@ -40,17 +37,12 @@ def import_camera(shot_name=None):
         nuke.message("Shot name is empty")
         return None
 
-    camera_filename = "shot_camera.abc"
-    camera_path = f"{CACHE_PATH_NEW}/{ep}/{sq}/{sh}/src/{camera_filename}"
-    if not os.path.exists(camera_path):
-        try:
-            camera_path = f"{CACHE_PATH_OLD}/{ep}/{sq}/{sh}/src/{camera_filename}"
-        except FileNotFoundError:
-            nuke.message(f"Camera not found: {camera_path}")
-            return None
-
-    if not camera_path:
-        nuke.message(f"No camera file found for {shot_name} in {camera_path}")
+    # The knob keeps the server path, Nuke maps it through the filename filter. The mapped
+    # path, which falls back from cache_path_new to cache_path_old, is only checked here.
+    camera_path = TEMPLATES.format("camera", ep=ep, sq=sq, sh=sh)
+    mapped_path = get_path_mapper().map(camera_path)
+    if not os.path.exists(mapped_path):
+        nuke.message(f"No camera file found for {shot_name} in {mapped_path}")
         return None
 
     cam = nuke.createNode("Camera2", inpanel=False)
@@ -66,40 +58,22 @@ def import_render_layers():
         return None
     ep, sq, sh, shot_name = shot_info
 
-    shot_render_path = f"{RENDER_PATH}/{ep}/{sq}/{sh}/render"
-    if not os.path.exists(shot_render_path):
-        nuke.message(f"Shot render path not found: {shot_render_path}")
+    # Reads keep the server path, Nuke maps it through the filename filter
+    shot_render_path = TEMPLATES.format("render_dir", ep=ep, sq=sq, sh=sh)
+    local_render_path = get_path_mapper().map(shot_render_path)
+    if not os.path.exists(local_render_path):
+        nuke.message(f"Shot render path not found: {local_render_path}")
         return
 
-    all_layer_dirs = [d for d in os.listdir(shot_render_path) if os.path.isdir(os.path.join(shot_render_path, d))]
-    if not all_layer_dirs:
-        nuke.message(f"No render layer directories found in {shot_render_path}")
-        return
-
-    layer_groups = {}
-    for dir_name in sorted(all_layer_dirs):
-        match = re.match(r'(.+)_v\d+$', dir_name)
-        base_name = match.group(1) if match else dir_name
-
-        if base_name not in layer_groups:
-            layer_groups[base_name] = []
-        layer_groups[base_name].append(dir_name)
-
-    render_layers_to_import = [versions[-1] for versions in layer_groups.values()]
+    # Latest version folder and EXR sequence of every layer, compared numerically (v10 > v9).
+    # The folders are listed on a thread pool, only the nodes are created here.
+    started = time.perf_counter()
+    layer_sequences = latest_layer_sequences(local_render_path)
+    discovered = time.perf_counter()
 
     nodes_created = []
-    for layer in render_layers_to_import:
-        layer_dir = os.path.join(shot_render_path, layer)
-        sequences = nuke.getFileNameList(layer_dir)
-        if not sequences:
-            continue
-
-        exr_sequences = [s for s in sequences if s.lower().split(' ')[0].endswith('.exr')]
-        if not exr_sequences:
-            continue
-
-        target_sequence = exr_sequences[-1]
-        full_path = os.path.join(layer_dir, target_sequence).replace("\\", "/")
+    for _, dir_name, sequence in layer_sequences:
+        full_path = f"{shot_render_path}/{dir_name}/{sequence}"
 
         read_node = nuke.createNode("Read", inpanel=False)
         read_node['file'].fromUserText(full_path)
@@ -125,6 +99,9 @@ def import_render_layers():
         backdrop['bdheight'].setValue(backdrop['bdheight'].value() + 60)
         backdrop['bdwidth'].setValue(backdrop['bdwidth'].value() + 20)
 
+    nuke.tprint(f"Imported {len(layer_sequences)} render layer(s) of {shot_name} in "
+                f"{time.perf_counter() - started:.2f}s (discovery {discovered - started:.2f}s)")
+
 def import_template():
     if not COMP_TEMPLATE_PATH or not os.path.exists(COMP_TEMPLATE_PATH):
         nuke.message(f"Template not found at: {COMP_TEMPLATE_PATH}")
@@ -139,12 +116,12 @@ def import_comp_exr():
         return None
     ep, sq, sh, shot_name = shot_info
 
-    exr_dir = f"{COMP_PATH}/{ep}/{sq}/{sh}/comp/exr"
+    exr_dir = TEMPLATES.format("comp_exr_dir", ep=ep, sq=sq, sh=sh)
     if not os.path.exists(exr_dir):
         nuke.message(f"Render directory not found: {exr_dir}")
         return None
 
-    file_list = nuke.getFileNameList(exr_dir)
+    file_list = file_name_list(exr_dir)
     if not file_list:
         nuke.message(f"No sequences found in {exr_dir}")
         return None
@@ -184,7 +161,7 @@ def import_from_selected_write():
         nuke.message(f"Directory does not exist: {file_dir}")
         return None
 
-    file_list = nuke.getFileNameList(file_dir)
+    file_list = file_name_list(file_dir)
     allowed_extensions = ('.exr', '.mov', '.png', '.jpg', '.jpeg')
     valid_media_paths = []
 
@@ -1,43 +1,87 @@
 import nuke
 
+from ..core.path_mapper import get_path_mapper
 
-def update_old_paths():
-    old_paths = ["//192.168.99.25/", "//192.168.99.202/"]
-    new_path = "//192.168.99.203/"
+# Hidden root knob with the migration table version the script was last checked against
+PATH_EPOCH_KNOB = "path_epoch"
+
+# Class -> names of its file knobs. Groups carry their own user knobs, so they are looked at one by one.
+_file_knobs = {}
+_PER_NODE_CLASSES = ("Group", "LiveGroup")
+
+
+def _file_knob_names(node):
+    node_class = node.Class()
+    names = _file_knobs.get(node_class)
+    if names is None:
+        names = tuple(name for name, knob in node.knobs().items() if isinstance(knob, nuke.File_Knob))
+        if node_class not in _PER_NODE_CLASSES:
+            _file_knobs[node_class] = names
+    return names
+
+
+def _path_epoch():
+    knob = nuke.root().knob(PATH_EPOCH_KNOB)
+    return knob.value() if knob is not None else None
+
+
+def _stamp_path_epoch(version, keep_modified=False):
+    root = nuke.root()
+    was_modified = root.modified()
+    knob = root.knob(PATH_EPOCH_KNOB)
+    if knob is None:
+        knob = nuke.String_Knob(PATH_EPOCH_KNOB, "path epoch")
+        knob.setFlag(nuke.INVISIBLE)
+        root.addKnob(knob)
+    knob.setValue(version)
+    if keep_modified:
+        # Only the stamp changed, don't ask to save a script nobody touched
+        root.setModified(was_modified)
 
-    nodes_to_update = []
-    for node in nuke.allNodes(recurseGroups=True):
-        if node.Class() in ('Read', 'Write'):
-            current_path = node['file'].value()
-            if not current_path:
-                continue
 
-            for old in old_paths:
-                if current_path.startswith(old):
-                    nodes_to_update.append((node, old))
-                    break
+def update_old_paths(force=False):
+    """
+    Rewrites old server prefixes in every file knob (Read, Write, ReadGeo, Camera, DeepRead, gizmos...)
+    in one undo step. The script is stamped with the migration table version, updated or declined, so
+    later loads skip the walk until the table changes. force checks a stamped script anyway.
+    """
+    mapper = get_path_mapper()
+    pattern = mapper.migration_pattern
+    if pattern is None:
+        return
+    if not force and _path_epoch() == mapper.migration_version:
+        return
+
+    to_update = []
+    for node in nuke.allNodes(recurseGroups=True):
+        for name in _file_knob_names(node):
+            value = node[name].value()
+            if value and pattern.match(value):
+                to_update.append((node, name, value))
 
-    display_list = [f"{node.name()}: {node['file'].value()}" for node, old in nodes_to_update]
-    formatted_list = "\n".join(display_list)
+    if not to_update:
+        _stamp_path_epoch(mapper.migration_version, keep_modified=True)
+        return
 
+    formatted_list = "\n".join(f"{node.fullName()}.{name}: {value}" for node, name, value in to_update)
     message = (
-        f"Found {len(nodes_to_update)} nodes with old paths. Would you like to update them?\n\n"
+        f"Found {len(to_update)} paths on old servers. Would you like to update them?\n\n"
         f"{formatted_list}"
     )
-    if len(nodes_to_update) == 0:
-        return
     if not nuke.ask(message):
+        # Declined, don't ask again on every load. force (the menu command) still offers the update.
+        _stamp_path_epoch(mapper.migration_version, keep_modified=True)
         return
 
-    updated_count = 0
-    for node, old_path_matched in nodes_to_update:
-        current_path = node['file'].value()
-        updated_path = current_path.replace(old_path_matched, new_path, 1)
-
-        node['file'].setValue(updated_path)
-        nuke.tprint(f"Updated node '{node.name()}': path changed to '{updated_path}'")
-        updated_count += 1
-
-    nuke.message(f"Successfully updated {updated_count} node(s).")
+    undo = nuke.Undo()
+    undo.begin("Update Old Server Paths")
+    try:
+        for node, name, value in to_update:
+            updated_path = mapper.migrate(value)
+            node[name].setValue(updated_path)
+            nuke.tprint(f"Updated '{node.fullName()}.{name}': path changed to '{updated_path}'")
+        _stamp_path_epoch(mapper.migration_version)
+    finally:
+        undo.end()
 
-nuke.addOnScriptLoad(update_old_paths)
\ No newline at end of file
+    nuke.message(f"Successfully updated {len(to_update)} path(s).")
@@ -2,6 +2,8 @@
 import nuke
 from PySide2 import QtCore
 from .write_path import update_write_path
+from ..core.frame_validator import validate_sequence, format_report, is_complete, get_check_cache, PRINTF_PATTERN, HASH_PATTERN, frame_path
+from ..core.exr_header import ExrError, read_exr_header, exr_layers
 
 
 def reload_read_nodes():
@@ -20,11 +22,49 @@ def reload_read_nodes():
                 node.knob("reload").execute()
 
 
+def validate_frames():
+    """Checks the frames of the selected Read/Write nodes (all Reads if none is selected) for missing,
+    zero byte and truncated files."""
+    nodes = [n for n in nuke.selectedNodes() if n.Class() in ("Read", "Write")] or nuke.allNodes("Read")
+
+    cache = get_check_cache()
+    cache.load()
+    reports = []
+    for node in nodes:
+        pattern = nuke.filename(node)
+        if not pattern or not (PRINTF_PATTERN.search(pattern) or HASH_PATTERN.search(pattern)):
+            continue
+        if node.Class() == "Read" or node['use_limit'].value():
+            first, last = int(node['first'].value()), int(node['last'].value())
+        else:
+            first, last = int(nuke.root()['first_frame'].value()), int(nuke.root()['last_frame'].value())
+        report = validate_sequence(pattern, first, last, cache=cache)
+        report["layer"] = node.name()
+        reports.append(report)
+    cache.save()
+
+    if not reports:
+        nuke.message("No image sequences to check.")
+        return
+    broken = sum(1 for report in reports if not is_complete(report))
+    title = f"{broken} of {len(reports)} sequence(s) have bad frames" if broken else "All frames OK"
+    nuke.message(f"{title}\n\n{format_report(reports)}")
+
+
+def _read_layers(node):
+    """Layer names of a Read from its EXR header, falls back to asking Nuke (which opens the file)."""
+    if node.Class() == "Read" and node['file'].value().lower().endswith(".exr"):
+        path = frame_path(nuke.filename(node), int(node['first'].value()))
+        try:
+            return sorted(exr_layers(read_exr_header(path)))
+        except (OSError, ExrError) as e:
+            nuke.tprint(f"Could not read the EXR header of {node.name()}: {e}")
+    return sorted(set(c.split('.')[0] for c in node.channels()))
+
+
 def extract_lgt_passes():
     read_node = nuke.selectedNode()
-    channels = read_node.channels()
-
-    layers = list(set([c.split('.')[0] for c in channels]))
+    layers = _read_layers(read_node)
     light_passes = [lgt for lgt in layers if lgt.startswith('lgt_')]
     print(light_passes)
 
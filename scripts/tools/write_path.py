@@ -1,9 +1,9 @@
 import nuke
 import os
-import re
 
 
 from ..config.config_loader import get_project_config
+from ..core.path_templates import get_path_templates, write_file_path
 
 RENDER_PATH = get_project_config().get("server_render_path")
 COMP_PATH = get_project_config().get("server_comp_path")
@@ -38,30 +38,11 @@ def update_write_path(node=None):
         nuke.message("Please save the script first.")
         return
 
-    script_name = os.path.basename(script_path)
-    if script_name.endswith('.nk'):
-        script_name = script_name[:-3]
-    match = re.match(r"(ep\d+)_?(sq\d+)_?(sh\d+)(_light_precomp|_precomp)?(?:_(v\d+))?", script_name, re.IGNORECASE)
-    if not match:
-        nuke.message("Script name doesn't match expected pattern (ep##_sq##_sh###).")
+    new_full_path = write_file_path(COMP_PATH, os.path.basename(script_path), format, get_path_templates("cinderella"))
+    if not new_full_path:
+        nuke.message("Script name doesn't match expected pattern (ep##_sq##_sh###_v###).")
         return
 
-    ep, sq, sh, precomp, ver = match.groups()
-
-    if precomp:
-        base_path = f"{COMP_PATH}/{ep}/{sq}/{sh}/light_precomp/{format}"
-        if format == 'exr':
-            new_full_path = f"{base_path}/{ep}_{sq}_{sh}_precomp.%04d.exr"
-        elif format == 'mov':
-            new_full_path = f"{base_path}/{ep}_{sq}_{sh}_precomp_{ver}.mov"
-    else:
-        new_base_path = f"{COMP_PATH}/{ep}/{sq}/{sh}/comp/{format}"
-        if format == 'exr':
-            new_filename = f"{ep}_{sq}_{sh}.%04d.exr"
-        elif format == 'mov':
-            new_filename = f"{ep}_{sq}_{sh}_{ver}.mov"
-        new_full_path = os.path.join(new_base_path, new_filename).replace("\\","/")
-
     # Set values
     write.setName(format.upper())
     write['file'].setValue(new_full_path)
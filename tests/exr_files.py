@@ -0,0 +1,73 @@
+# SPDX-License-Identifier: Apache-2.0
+# exr_files.py - Minimal uncompressed scanline OpenEXR files built with struct, for the tests
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+
+import struct
+
+MAGIC = b'\x76\x2f\x31\x01'
+MULTIPART_FLAG = 0x1000
+HALF = 1
+
+
+def _attribute(name, type_name, value):
+    return name.encode() + b'\0' + type_name.encode() + b'\0' + struct.pack('<i', len(value)) + value
+
+
+def _chlist(channels):
+    # Sorted by name like every writer does
+    return b"".join(name.encode() + b'\0' + struct.pack('<iB3xii', HALF, 0, 1, 1)
+                    for name in sorted(channels)) + b'\0'
+
+
+def _header(channels, height, name=None):
+    window = struct.pack('<4i', 0, 0, 0, height - 1)
+    attributes = [
+        _attribute("channels", "chlist", _chlist(channels)),
+        _attribute("compression", "compression", b'\0'),
+        _attribute("dataWindow", "box2i", window),
+        _attribute("displayWindow", "box2i", window),
+        _attribute("lineOrder", "lineOrder", b'\0'),
+        _attribute("pixelAspectRatio", "float", struct.pack('<f', 1.0)),
+        _attribute("screenWindowCenter", "v2f", struct.pack('<2f', 0.0, 0.0)),
+        _attribute("screenWindowWidth", "float", struct.pack('<f', 1.0)),
+    ]
+    if name is not None:
+        attributes += [
+            _attribute("name", "string", name.encode()),
+            _attribute("type", "string", b"scanlineimage"),
+            _attribute("chunkCount", "int", struct.pack('<i', height)),
+        ]
+    return b"".join(attributes) + b'\0'
+
+
+def exr_bytes(parts, height=2):
+    """
+    A complete EXR, one pixel wide and height lines high. parts is [(part name, [channel])],
+    a single part with the name None is a single-part file.
+    """
+    multipart = len(parts) > 1 or parts[0][0] is not None
+    data = MAGIC + struct.pack('<I', 2 | (MULTIPART_FLAG if multipart else 0))
+    data += b"".join(_header(channels, height, name if multipart else None) for name, channels in parts)
+    if multipart:
+        data += b'\0'
+
+    # Offset tables first, the chunks follow them in part order
+    chunks, offset = [], len(data) + 8 * height * len(parts)
+    tables = []
+    for index, (_, channels) in enumerate(parts):
+        table = []
+        for y in range(height):
+            pixels = b'\0\0' * len(channels)
+            chunk = (struct.pack('<i', index) if multipart else b"") + struct.pack('<ii', y, len(pixels)) + pixels
+            table.append(offset)
+            chunks.append(chunk)
+            offset += len(chunk)
+        tables.append(struct.pack(f'<{height}Q', *table))
+    return data + b"".join(tables) + b"".join(chunks)
+
+
+def write_exr(path, parts=((None, ("R", "G", "B", "A")),), height=2):
+    data = exr_bytes(list(parts), height)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return data
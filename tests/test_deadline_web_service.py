@@ -0,0 +1,172 @@
+# SPDX-License-Identifier: Apache-2.0
+# test_deadline_web_service.py - Deadline Web Service client against a local stand-in server
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+
+import json
+import time
+import socket
+import threading
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from scripts.deadline.web_service import DeadlineError, DeadlineWebService, submit_batch
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        server.connections.add(self.client_address)
+        data = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.jobs.append(data)
+            job_id = f"job{len(server.jobs)}"
+        time.sleep(server.delay)
+
+        status = server.statuses.get(data["JobInfo"]["Name"], 200)
+        body = json.dumps({"_id": job_id}).encode() if status == 200 else b"Error: job rejected"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        # Like a web service dropping kept-alive connections, without telling the client
+        self.close_connection = server.close_after_response
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.jobs = []
+        self.connections = set()
+        self.statuses = {}
+        self.delay = 0
+        self.close_after_response = False
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+SCENE_FILE = "//192.168.99.203/prj/cinderella/comp/sh010_v003.nk"
+
+
+def job(name, dependencies=()):
+    return {"Name": name, "Plugin": "Nuke"}, {"SceneFile": SCENE_FILE, "WriteNode": name}, [SCENE_FILE], dependencies
+
+
+class DeadlineWebServiceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StandInServer()
+        self.service = DeadlineWebService(self.server.url, timeout=2)
+
+    def tearDown(self):
+        self.service.close()
+        self.server.stop()
+
+    def test_batch_chains_dependencies_over_one_connection(self):
+        ids = self.service.submit_batch([job("EXR"), job("MOV", (0,))])
+
+        self.assertEqual(ids, ["job1", "job2"])
+        exr, mov = self.server.jobs
+        self.assertNotIn("JobDependencies", exr["JobInfo"])
+        self.assertEqual(mov["JobInfo"]["JobDependencies"], "job1")
+        self.assertEqual(mov["PluginInfo"], {"SceneFile": SCENE_FILE, "WriteNode": "MOV"})
+        self.assertTrue(exr["IdOnly"])
+        self.assertEqual(len(self.server.connections), 1)
+
+    def test_script_is_sent_as_an_aux_file(self):
+        self.service.submit_batch([job("EXR"), job("MOV", (0,))])
+
+        # The farm renders this snapshot, not whatever the script is when a task starts
+        self.assertEqual([data["AuxFiles"] for data in self.server.jobs], [[SCENE_FILE], [SCENE_FILE]])
+
+    def test_values_are_sent_as_strings(self):
+        self.service.submit_job({"Name": "EXR", "Priority": 99, "ChunkSize": 10}, {})
+        self.assertEqual(self.server.jobs[0]["JobInfo"]["Priority"], "99")
+
+    def test_stale_keep_alive_connection_is_replaced(self):
+        self.server.close_after_response = True
+        self.assertEqual(self.service.submit_job(*job("EXR")[:3]), "job1")
+        time.sleep(0.1)
+        self.assertEqual(self.service.submit_job(*job("MOV")[:3]), "job2")
+
+        self.assertEqual(len(self.server.jobs), 2)
+        self.assertEqual(len(self.server.connections), 2)
+
+    def test_client_error_is_reported_with_the_submitted_jobs(self):
+        self.server.statuses["MOV"] = 400
+        with self.assertRaises(DeadlineError) as raised:
+            self.service.submit_batch([job("EXR"), job("MOV", (0,))])
+
+        self.assertIn("400", str(raised.exception))
+        self.assertIn("job rejected", str(raised.exception))
+        self.assertEqual(raised.exception.submitted, ["job1"])
+        self.assertFalse(raised.exception.connection_failed)
+
+    def test_server_error_is_not_a_connection_failure(self):
+        self.server.statuses["EXR"] = 500
+        with self.assertRaises(DeadlineError) as raised:
+            self.service.submit_batch([job("EXR")])
+
+        self.assertIn("500", str(raised.exception))
+        self.assertEqual(raised.exception.submitted, [])
+        self.assertFalse(raised.exception.connection_failed)
+
+    def test_timeout_after_sending_is_not_retried_or_a_connection_failure(self):
+        self.server.delay = 1.5
+        service = DeadlineWebService(self.server.url, timeout=0.5)
+        with self.assertRaises(DeadlineError) as raised:
+            service.submit_batch([job("EXR")])
+        service.close()
+
+        # The server created the job, falling back to deadlinecommand would submit it twice
+        self.assertFalse(raised.exception.connection_failed)
+        time.sleep(1.2)
+        self.assertEqual(len(self.server.jobs), 1)
+
+    def test_unreachable_service_is_a_connection_failure(self):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        service = DeadlineWebService(f"http://127.0.0.1:{port}", timeout=1)
+        with self.assertRaises(DeadlineError) as raised:
+            service.submit_batch([job("EXR"), job("MOV", (0,))])
+
+        self.assertTrue(raised.exception.connection_failed)
+        self.assertEqual(raised.exception.submitted, [])
+
+    def test_failure_after_a_submitted_job_is_not_a_connection_failure(self):
+        def submit(job_info, plugin_info, aux_files):
+            if job_info["Name"] == "MOV":
+                raise DeadlineError("unreachable", connection_failed=True)
+            return "job1"
+
+        with self.assertRaises(DeadlineError) as raised:
+            submit_batch([job("EXR"), job("MOV", (0,))], submit)
+        # The EXR job exists, resubmitting the batch elsewhere would duplicate it
+        self.assertFalse(raised.exception.connection_failed)
+        self.assertEqual(raised.exception.submitted, ["job1"])
+
+    def test_config_without_web_service(self):
+        self.assertIsNone(DeadlineWebService.from_config({}))
+        service = DeadlineWebService.from_config({"deadline": {"web_service": "deadline:8082/base", "user": "nuke"}})
+        self.assertEqual((service.host, service.port, service.base_path), ("deadline", 8082, "/base"))
+        self.assertTrue(service.headers["Authorization"].startswith("Basic "))
+
+
+if __name__ == "__main__":
+    unittest.main()
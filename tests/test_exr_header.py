@@ -0,0 +1,86 @@
+# SPDX-License-Identifier: Apache-2.0
+# test_exr_header.py - Header parsing and Nuke layer naming of single and multi-part EXRs
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from scripts.core import channel_manifest
+from scripts.core.exr_header import ExrError, read_exr_header, exr_layers, channel_layer
+from exr_files import write_exr
+
+
+class ExrHeaderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "beauty.1001.exr")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_single_part(self):
+        write_exr(self.path, [(None, ("R", "G", "B", "A", "diffuse.R", "diffuse.G", "diffuse.B", "Z"))], height=4)
+        parts = read_exr_header(self.path)
+
+        self.assertEqual(len(parts), 1)
+        part = parts[0]
+        self.assertIsNone(part.name)
+        self.assertEqual(part.type, "scanlineimage")
+        self.assertEqual(part.data_window, (0, 0, 0, 3))
+        self.assertEqual(part.compression, "none")
+        self.assertEqual({channel[1] for channel in part.channels}, {"half"})
+        self.assertEqual(exr_layers(parts), {"rgba": ["A", "B", "G", "R"], "depth": ["Z"],
+                                             "diffuse": ["B", "G", "R"]})
+
+    def test_multi_part(self):
+        write_exr(self.path, [("rgba", ("R", "G", "B", "A")), ("specular", ("R", "G", "B")),
+                              ("crypto", ("crypto.R", "crypto.G"))])
+        parts = read_exr_header(self.path)
+
+        self.assertEqual([part.name for part in parts], ["rgba", "specular", "crypto"])
+        self.assertEqual([part.custom() for part in parts], [{}, {}, {}])
+        # Undotted channels of a multi-part file belong to their part
+        self.assertEqual(exr_layers(parts), {"rgba": ["A", "B", "G", "R"], "specular": ["B", "G", "R"],
+                                             "crypto": ["G", "R"]})
+
+    def test_undotted_channels_are_rgba(self):
+        for channel in ("R", "G", "B", "A"):
+            self.assertEqual(channel_layer(channel), ("rgba", channel))
+        self.assertEqual(channel_layer("Z"), ("depth", "Z"))
+        self.assertEqual(channel_layer("mask"), ("other", "mask"))
+        self.assertEqual(channel_layer("a.b.R"), ("a_b", "R"))
+
+    def test_header_bigger_than_the_first_read(self):
+        write_exr(self.path, [(None, tuple(f"aov{index:03d}.R" for index in range(200)))])
+        parts = read_exr_header(self.path, read_size=256)
+
+        self.assertEqual(len(parts[0].channels), 200)
+
+    def test_not_an_exr(self):
+        with open(self.path, 'wb') as f:
+            f.write(b"\0" * 64)
+        with self.assertRaises(ExrError):
+            read_exr_header(self.path)
+
+    def test_frame_summaries_are_bounded(self):
+        paths = []
+        for frame in range(3):
+            paths.append(os.path.join(self.tmp, f"beauty.{frame:04d}.exr"))
+            write_exr(paths[-1])
+        channel_manifest.clear_manifest_cache()
+        size = channel_manifest.HEADER_CACHE_SIZE
+        channel_manifest.HEADER_CACHE_SIZE = 2
+        try:
+            for path in paths:
+                self.assertEqual(channel_manifest.frame_summary(path)["layers"], {"rgba": ["A", "B", "G", "R"]})
+            self.assertEqual(list(channel_manifest._header_cache), paths[1:])
+        finally:
+            channel_manifest.HEADER_CACHE_SIZE = size
+            channel_manifest.clear_manifest_cache()
+
+
+if __name__ == "__main__":
+    unittest.main()
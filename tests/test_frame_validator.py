@@ -0,0 +1,138 @@
+# SPDX-License-Identifier: Apache-2.0
+# test_frame_validator.py - Structural EXR checks, frame paths and the check cache
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+
+import os
+import json
+import shutil
+import struct
+import tempfile
+import unittest
+
+from scripts.core.frame_validator import (FrameCheckCache, check_exr, check_frame, frame_path, validate_sequence,
+                                          FRAME_OK, FRAME_CORRUPT, FRAME_EMPTY, FRAME_MISSING)
+from exr_files import exr_bytes, write_exr
+
+
+class CheckExrTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "beauty.1001.exr")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _write(self, data):
+        with open(self.path, 'wb') as f:
+            f.write(data)
+
+    def test_good(self):
+        write_exr(self.path)
+        self.assertIsNone(check_exr(self.path))
+
+    def test_good_multipart(self):
+        write_exr(self.path, [("rgba", ("R", "G", "B", "A")), ("diffuse", ("R", "G", "B"))])
+        self.assertIsNone(check_exr(self.path))
+
+    def test_truncated(self):
+        data = exr_bytes([(None, ("R", "G", "B"))])
+        for cut in (3, 8):
+            with self.subTest(cut=cut):
+                self._write(data[:-cut])
+                self.assertIn("truncated", check_exr(self.path))
+
+    def test_truncated_offset_table(self):
+        data = exr_bytes([(None, ("R", "G", "B"))], height=4)
+        self._write(data[:data.index(b"screenWindowWidth") + 40])
+        self.assertIn("truncated", check_exr(self.path))
+
+    def test_zero_offset(self):
+        data = bytearray(exr_bytes([(None, ("R", "G", "B"))], height=2))
+        table = len(data) - 2 * (8 + 6) - 16
+        struct.pack_into('<Q', data, table + 8, 0)
+        self._write(bytes(data))
+        self.assertIn("unwritten chunk", check_exr(self.path))
+
+    def test_bad_magic(self):
+        self._write(b"\x89PNG\r\n\x1a\n" + exr_bytes([(None, ("R",))])[8:])
+        self.assertEqual(check_exr(self.path), "bad magic number")
+
+    def test_check_frame_statuses(self):
+        self.assertEqual(check_frame(self.path, FrameCheckCache()), (FRAME_MISSING, None))
+        self._write(b"")
+        self.assertEqual(check_frame(self.path, FrameCheckCache()), (FRAME_EMPTY, None))
+        self._write(b"not an exr")
+        self.assertEqual(check_frame(self.path, FrameCheckCache())[0], FRAME_CORRUPT)
+
+    def test_validate_sequence(self):
+        pattern = os.path.join(self.tmp, "beauty.%04d.exr")
+        for frame in (1001, 1002, 1004):
+            write_exr(frame_path(pattern, frame))
+        with open(frame_path(pattern, 1002), 'r+b') as f:
+            f.truncate(100)
+
+        report = validate_sequence(pattern, 1001, 1004, cache=FrameCheckCache())
+        self.assertEqual(report["ok"], 2)
+        self.assertEqual(report["missing"], [1003])
+        self.assertEqual([frame for frame, _ in report["corrupt"]], [1002])
+
+
+class FramePathTest(unittest.TestCase):
+
+    def test_printf(self):
+        self.assertEqual(frame_path("/r/beauty.%04d.exr", 1001), "/r/beauty.1001.exr")
+        self.assertEqual(frame_path("/r/beauty.%04d.exr", 7), "/r/beauty.0007.exr")
+        self.assertEqual(frame_path("/r/beauty.%d.exr", 7), "/r/beauty.7.exr")
+
+    def test_hashes(self):
+        self.assertEqual(frame_path("/r/beauty.####.exr", 1001), "/r/beauty.1001.exr")
+        self.assertEqual(frame_path("/r/beauty.####.exr", 7), "/r/beauty.0007.exr")
+        self.assertEqual(frame_path("/r/beauty.#.exr", 12), "/r/beauty.12.exr")
+
+    def test_only_the_frame_token_is_replaced(self):
+        self.assertEqual(frame_path("/r/sh010_v002/beauty.%04d.exr", 1001), "/r/sh010_v002/beauty.1001.exr")
+        self.assertEqual(frame_path("/r/a/b.####.####.exr", 5), "/r/a/b.0005.####.exr")
+
+
+class FrameCheckCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "frame_check_cache.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_result_needs_same_size_and_mtime(self):
+        cache = FrameCheckCache()
+        cache.put("/r/a.exr", 10, 1.5, FRAME_OK, None)
+
+        self.assertEqual(cache.get("/r/a.exr", 10, 1.5), (FRAME_OK, None))
+        self.assertIsNone(cache.get("/r/a.exr", 11, 1.5))
+        self.assertIsNone(cache.get("/r/a.exr", 10, 2.5))
+
+    def test_save_keeps_the_most_recently_used(self):
+        cache = FrameCheckCache(max_entries=2)
+        for name in ("a", "b", "c"):
+            cache.put(f"/r/{name}.exr", 10, 1.0, FRAME_OK, None)
+        cache._results["/r/a.exr"][4] += 10
+        cache.save(self.path)
+
+        loaded = FrameCheckCache()
+        loaded.load(self.path)
+        self.assertEqual(sorted(loaded._results), ["/r/a.exr", "/r/c.exr"])
+
+    def test_save_drops_old_results(self):
+        cache = FrameCheckCache(max_age_days=30)
+        cache.put("/r/old.exr", 10, 1.0, FRAME_OK, None)
+        cache.put("/r/new.exr", 10, 1.0, FRAME_OK, None)
+        cache._results["/r/old.exr"][4] -= 31 * 86400
+        cache.save(self.path)
+
+        with open(self.path) as f:
+            self.assertEqual(list(json.load(f)["results"]), ["/r/new.exr"])
+
+
+if __name__ == "__main__":
+    unittest.main()
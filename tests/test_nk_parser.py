@@ -0,0 +1,162 @@
+# SPDX-License-Identifier: Apache-2.0
+# test_nk_parser.py - Round trips and stack replayed connections of the headless .nk parser
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+
+import os
+import glob
+import unittest
+
+from scripts.core.nk_parser import parse_nk, parse_nk_string, nk_quote, nk_unquote
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+
+BRANCHED_SCRIPT = """\
+Read {
+ inputs 0
+ file /renders/beauty_v001/beauty.%04d.exr
+ name Read1
+}
+set N1 [stack 0]
+Grade {
+ white 1.2
+ name Grade1
+}
+push $N1
+Blur {
+ size 4
+ name Blur1
+}
+Merge2 {
+ inputs 2
+ name Merge1
+}
+Write {
+ file "/comp/ep01 sq010/out.%04d.exr"
+ name Write1
+}
+"""
+
+GROUP_SCRIPT = """\
+Read {
+ inputs 0
+ file a.exr
+ name Read1
+}
+Group {
+ name Group1
+}
+ Input {
+  inputs 0
+  name Input1
+ }
+ Blur {
+  name Blur1
+ }
+ Output {
+  name Output1
+ }
+end_group
+Write {
+ name Write1
+}
+"""
+
+
+def _read(path):
+    with open(path, 'r', encoding='utf-8', errors='surrogateescape', newline='') as f:
+        return f.read()
+
+
+class RoundTripTest(unittest.TestCase):
+
+    def test_templates_write_back_unchanged(self):
+        paths = glob.glob(os.path.join(TEMPLATES_DIR, "*.nk"))
+        self.assertTrue(paths)
+        for path in paths:
+            with self.subTest(path=os.path.basename(path)):
+                script = parse_nk(path)
+                self.assertTrue(script.nodes)
+                self.assertEqual(script.to_string(), _read(path))
+
+    def test_templates_reserialized_from_knobs_unchanged(self):
+        for path in glob.glob(os.path.join(TEMPLATES_DIR, "*.nk")):
+            with self.subTest(path=os.path.basename(path)):
+                script = parse_nk(path)
+                for node in script.nodes + [script.root]:
+                    node._raw = None
+                self.assertEqual(script.to_string(), _read(path))
+
+    def test_one_knob_edit_only_changes_its_line(self):
+        script = parse_nk_string(BRANCHED_SCRIPT)
+        script.by_name("Blur1").set_knob("size", 8)
+
+        self.assertEqual(script.to_string(), BRANCHED_SCRIPT.replace(" size 4\n", " size 8\n"))
+        self.assertFalse(script.by_name("Grade1").dirty)
+        self.assertTrue(script.by_name("Blur1").dirty)
+
+    def test_template_knob_edit(self):
+        path = sorted(glob.glob(os.path.join(TEMPLATES_DIR, "*.nk")))[0]
+        original = _read(path)
+        script = parse_nk(path)
+        node = script.nodes[0]
+        name = node.name
+        node.set_knob("name", name + "_edited")
+
+        edited = script.to_string()
+        self.assertNotEqual(edited, original)
+        self.assertEqual(edited.replace(name + "_edited", name, 1), original)
+        self.assertEqual(parse_nk_string(edited).nodes[0].name, name + "_edited")
+
+    def test_blank_line_inside_node(self):
+        text = "Read {\n file x\n\n name Read1\n}\n"
+        script = parse_nk_string(text)
+
+        self.assertEqual(script.nodes[0].name, "Read1")
+        self.assertEqual(script.to_string(), text)
+        script.nodes[0]._raw = None
+        self.assertEqual(script.to_string(), text)
+
+    def test_quoting(self):
+        self.assertEqual(nk_quote("plain"), "plain")
+        self.assertEqual(nk_quote("a b"), '"a b"')
+        self.assertEqual(nk_unquote(nk_quote('say "hi"\n')), 'say "hi"\n')
+        self.assertEqual(nk_unquote("{1 2}"), "1 2")
+
+
+class GraphTest(unittest.TestCase):
+
+    def test_branched_inputs(self):
+        script = parse_nk_string(BRANCHED_SCRIPT)
+        read, grade, blur, merge, write = (script.by_name(name) for name in
+                                           ("Read1", "Grade1", "Blur1", "Merge1", "Write1"))
+
+        self.assertEqual(read.inputs, [])
+        self.assertEqual(grade.inputs, [read])
+        self.assertEqual(blur.inputs, [read])
+        # The top of the stack is input 0
+        self.assertEqual(merge.inputs, [blur, grade])
+        self.assertEqual(write.inputs, [merge])
+        self.assertEqual(write.value("file"), "/comp/ep01 sq010/out.%04d.exr")
+        self.assertEqual(len(list(script.edges())), 5)
+
+    def test_group_inputs_and_children(self):
+        script = parse_nk_string(GROUP_SCRIPT)
+        read, group, write = script.by_name("Read1"), script.by_name("Group1"), script.by_name("Write1")
+        blur = script.by_name("Group1.Blur1")
+
+        self.assertEqual(group.inputs, [read])
+        self.assertEqual([child.name for child in group.children], ["Input1", "Blur1", "Output1"])
+        self.assertIs(blur.parent, group)
+        self.assertEqual(script.by_name("Group1.Input1").inputs, [])
+        self.assertEqual(blur.inputs, [script.by_name("Group1.Input1")])
+        self.assertEqual(script.by_name("Group1.Output1").inputs, [blur])
+        # After end_group the group itself is on the stack
+        self.assertEqual(write.inputs, [group])
+        self.assertIsNone(write.parent)
+
+        start, end = script.block_range(group)
+        self.assertEqual(script.statements[end - 1].strip(), "end_group")
+
+
+if __name__ == "__main__":
+    unittest.main()
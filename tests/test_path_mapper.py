@@ -0,0 +1,104 @@
+# SPDX-License-Identifier: Apache-2.0
+# test_path_mapper.py - Prefix rules, fallback roots and migrations of the path mapper
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from scripts.core.path_mapper import PathMapper, PrefixTrie
+
+
+class PrefixTrieTest(unittest.TestCase):
+
+    def test_longest_prefix_wins(self):
+        trie = PrefixTrie([("//srv/prj", "short"), ("//srv/prj/cache", "long")])
+
+        self.assertEqual(trie.match("//srv/prj/cache/a.exr"), (len("//srv/prj/cache"), "long"))
+        self.assertEqual(trie.match("//srv/prj/comp/a.nk"), (len("//srv/prj"), "short"))
+
+    def test_whole_segments_only(self):
+        trie = PrefixTrie([("//srv/prj", "prj")])
+
+        self.assertIsNone(trie.match("//srv/prj2/a.exr"))
+        self.assertEqual(trie.match("//SRV/Prj/a.exr")[1], "prj")
+
+    def test_longest_migration_wins(self):
+        mapper = PathMapper({"//old": "//new", "//old/cache": "//cache_server"}, os_name="linux")
+
+        self.assertEqual(mapper.map("//old/cache/sh010/a.exr"), "//cache_server/sh010/a.exr")
+        self.assertEqual(mapper.map("//old/comp/sh010.nk"), "//new/comp/sh010.nk")
+
+
+class FallbackTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.new_root = os.path.join(self.tmp, "cache_new").replace("\\", "/")
+        self.old_root = os.path.join(self.tmp, "cache_old").replace("\\", "/")
+        self.shot_dir = "/ep01/sq010/sh010/beauty_v001"
+        os.makedirs(self.old_root + self.shot_dir)
+        os.makedirs(self.new_root)
+        for frame in (1001, 1002):
+            open(f"{self.old_root}{self.shot_dir}/beauty.{frame:04d}.exr", "wb").close()
+        self.mapper = PathMapper({}, fallbacks=[[self.new_root, self.old_root]], os_name="linux")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_missing_new_root_falls_back(self):
+        path = f"{self.new_root}{self.shot_dir}/beauty.1001.exr"
+
+        self.assertEqual(self.mapper.map(path), f"{self.old_root}{self.shot_dir}/beauty.1001.exr")
+
+    def test_pattern_probed_by_its_folder(self):
+        for pattern in ("beauty.%04d.exr", "beauty.####.exr"):
+            with self.subTest(pattern=pattern):
+                path = f"{self.new_root}{self.shot_dir}/{pattern}"
+                self.assertEqual(self.mapper.map(path), f"{self.old_root}{self.shot_dir}/{pattern}")
+
+    def test_existing_path_is_kept(self):
+        os.makedirs(self.new_root + self.shot_dir)
+        path = f"{self.new_root}{self.shot_dir}/beauty.1001.exr"
+
+        self.assertEqual(self.mapper.map(path), path)
+
+    def test_missing_everywhere_is_kept(self):
+        path = f"{self.new_root}/ep01/sq010/sh999/beauty.1001.exr"
+
+        self.assertEqual(self.mapper.map(path), path)
+
+    def test_frames_of_a_folder_share_one_entry(self):
+        for frame in (1001, 1002):
+            self.mapper.map(f"{self.new_root}{self.shot_dir}/beauty.{frame:04d}.exr")
+
+        self.assertEqual(list(self.mapper._resolved), [self.new_root + self.shot_dir])
+
+    def test_resolved_folders_are_bounded(self):
+        mapper = PathMapper({}, fallbacks=[[self.new_root, self.old_root]], os_name="linux", cache_size=2)
+        for shot in ("sh010", "sh020", "sh030"):
+            mapper.map(f"{self.new_root}/ep01/sq010/{shot}/beauty_v001/beauty.1001.exr")
+
+        self.assertEqual(len(mapper._resolved), 2)
+        self.assertNotIn(f"{self.new_root}/ep01/sq010/sh010/beauty_v001", mapper._resolved)
+
+
+class MigrateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.mapper = PathMapper({"//192.168.99.25": "//192.168.99.203", "//old/": "//new"}, os_name="linux")
+
+    def test_keeps_the_rest_of_the_path(self):
+        self.assertEqual(self.mapper.migrate("//192.168.99.25/prj/Comp Shots/sh010 v002.nk"),
+                         "//192.168.99.203/prj/Comp Shots/sh010 v002.nk")
+        self.assertEqual(self.mapper.migrate("//OLD/prj/a.%04d.exr"), "//new/prj/a.%04d.exr")
+
+    def test_prefix_must_end_at_a_segment(self):
+        self.assertEqual(self.mapper.migrate("//192.168.99.250/prj/a.exr"), "//192.168.99.250/prj/a.exr")
+        self.assertEqual(self.mapper.migrate("//old"), "//new")
+        self.assertEqual(self.mapper.migrate(""), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
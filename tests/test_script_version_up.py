@@ -0,0 +1,65 @@
+# SPDX-License-Identifier: Apache-2.0
+# test_script_version_up.py - File level precomp version-up
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from scripts.core.script_version_up import version_up_precomp
+
+PRECOMP_SCRIPT = """\
+#write_info MOV file:"/comp/ep01/sq010/sh010/precomp/mov/sh010_precomp_v01.mov" format:"1920 1080 1"
+Root {
+ inputs 0
+ name /comp/ep01/sq010/sh010/precomp/nk/sh010_precomp_v01.nk
+}
+Read {
+ file /renders/beauty_v001/sh010_precomp_v01.%04d.exr
+ name Read1
+}
+Write {
+ file /comp/ep01/sq010/sh010/precomp/mov/sh010_precomp_v01.mov
+ name MOV
+}
+"""
+
+
+class VersionUpPrecompTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.src = os.path.join(self.tmp, "sh010_precomp_v01.nk").replace("\\", "/")
+        self.dst = os.path.join(self.tmp, "sh010_precomp_v02.nk").replace("\\", "/")
+        with open(self.src, 'w', newline='') as f:
+            f.write(PRECOMP_SCRIPT)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_rewrites_only_versioned_tokens(self):
+        self.assertEqual(version_up_precomp(self.src, self.dst, 2), 3)
+
+        with open(self.dst, newline='') as f:
+            lines = f.read().splitlines()
+        self.assertIn("sh010_precomp_v02.mov", lines[0])
+        self.assertEqual(lines[3], f" name {self.dst}")
+        # Only the Write node's file is versioned with the script, a Read of the same name isn't
+        self.assertEqual(lines[6], " file /renders/beauty_v001/sh010_precomp_v01.%04d.exr")
+        self.assertEqual(lines[10], " file /comp/ep01/sq010/sh010/precomp/mov/sh010_precomp_v02.mov")
+        self.assertEqual(sorted(os.listdir(self.tmp)), ["sh010_precomp_v01.nk", "sh010_precomp_v02.nk"])
+
+    def test_existing_script_is_not_overwritten(self):
+        with open(self.dst, 'w') as f:
+            f.write("artist's work")
+
+        with self.assertRaises(FileExistsError):
+            version_up_precomp(self.src, self.dst, 2)
+        with open(self.dst) as f:
+            self.assertEqual(f.read(), "artist's work")
+        self.assertEqual(sorted(os.listdir(self.tmp)), ["sh010_precomp_v01.nk", "sh010_precomp_v02.nk"])
+
+
+if __name__ == "__main__":
+    unittest.main()
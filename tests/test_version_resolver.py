@@ -0,0 +1,65 @@
+# SPDX-License-Identifier: Apache-2.0
+# test_version_resolver.py - Numeric version ordering and the cached directory listings
+# Copyright © 2025 Maxim Maximov. All rights reserved.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from scripts.core.version_resolver import VersionResolver, MOV_VERSION_PATTERN, latest_of, split_layer_version
+
+
+class LatestOfTest(unittest.TestCase):
+
+    def test_versions_compare_as_numbers(self):
+        names = ["sh010_v9.nk", "sh010_v10.nk", "sh010_v099.nk", "sh010_v100.nk"]
+        self.assertEqual(latest_of(names, '.nk'), ("sh010_v100.nk", 100))
+
+    def test_versioned_only(self):
+        names = ["sh010_preview.mov", "sh010_v002.mov", "sh010_v003.mov.tmp"]
+        self.assertEqual(latest_of(names, '.mov', MOV_VERSION_PATTERN, versioned_only=True), ("sh010_v002.mov", 2))
+        self.assertIsNone(latest_of(["sh010_preview.mov"], '.mov', MOV_VERSION_PATTERN, versioned_only=True))
+
+    def test_layer_folders(self):
+        self.assertEqual(split_layer_version("beauty_v003"), ("beauty", 3))
+        self.assertEqual(split_layer_version("beauty"), ("beauty", 0))
+
+
+class VersionResolverTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _touch(self, directory, name):
+        os.makedirs(directory, exist_ok=True)
+        open(os.path.join(directory, name), 'w').close()
+
+    def test_invalidate_sees_a_new_file(self):
+        resolver = VersionResolver(revalidate_after=60)
+        self._touch(self.tmp, "sh010_v001.mov")
+        self.assertEqual(resolver.latest(self.tmp, '.mov', MOV_VERSION_PATTERN), ("sh010_v001.mov", 1))
+
+        self._touch(self.tmp, "sh010_v002.mov")
+        self.assertEqual(resolver.latest(self.tmp, '.mov', MOV_VERSION_PATTERN), ("sh010_v001.mov", 1))
+        resolver.invalidate(self.tmp)
+        self.assertEqual(resolver.latest(self.tmp, '.mov', MOV_VERSION_PATTERN), ("sh010_v002.mov", 2))
+
+    def test_listings_are_bounded(self):
+        resolver = VersionResolver(cache_size=2)
+        directories = [os.path.join(self.tmp, name) for name in ("a", "b", "c")]
+        for directory in directories:
+            self._touch(directory, "x_v001.nk")
+        resolver.names(directories[0])
+        resolver.names(directories[1])
+        resolver.names(directories[0])
+        resolver.names(directories[2])
+
+        self.assertEqual(list(resolver._listings), [directories[0], directories[2]])
+
+
+if __name__ == "__main__":
+    unittest.main()